@@ -9,7 +9,7 @@ from config.settings import strategy_toggles, VERBOSE_LOGGING
 from src.state_manager import bot_state
 from src.reconciler import reconcile_trades
 from config.symbols import symbols
-from config.client import client
+from src.rate_limiter import client
 
 # Silence Werkzeug/Flask HTTP request logs to keep terminal quiet
 log = logging.getLogger('werkzeug')
@@ -0,0 +1,215 @@
+"""
+Bar Store — on-disk kline cache for warm restarts.
+
+PURPOSE:
+    Kline buffers live in memory, so after a restart the first cycle used to
+    fetch the full history of every symbol and timeframe at once. The bar
+    store persists closed bars so a restart only backfills what was missed
+    while the bot was down.
+
+HOW IT WORKS:
+    1. One .npy file per (symbol, interval) holds a float64 array of shape
+       (columns, bars): each column is contiguous, and the file is opened
+       memory-mapped so only the tail that is needed is read.
+    2. fetch_klines writes the buffer's closed history through after updating
+       it, but only when a new bar has closed since the last save or more
+       history is buffered than was stored for the same newest bar (a 200-bar
+       read must not truncate the 250 bars another caller keeps for the same
+       series). The forming bar is never stored.
+    3. The first time a buffer is read, stored bars are merged into it; the
+       normal incremental fetch then backfills from the last stored bar.
+    4. Files whose newest bar closed more than BAR_STORE_MAX_AGE_HOURS ago are
+       treated as stale and deleted. When the store grows past BAR_STORE_MAX_MB
+       the least recently used files are evicted.
+
+    Prices and volumes are stored as float64 and restored as their shortest
+    round-trip strings, which is exact for values of up to 15 significant
+    digits (every price and base volume the exchange sends).
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import config.settings
+
+DEFAULT_STORE_DIR = 'logs/bar_store'
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_MAX_MB = 256
+
+# REST row indices persisted, in file column order; 'ignore' is dropped
+_COLUMNS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+_INT_COLUMNS = {0, 6, 8}
+
+_lock = threading.Lock()
+_saved_extents = {}      # (symbol, interval) -> (open time of the newest persisted bar, bars persisted)
+_warmed = set()
+_store_size = None
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+def is_enabled():
+    return _settings('ENABLE_BAR_STORE', True)
+
+
+def _store_dir():
+    return _settings('BAR_STORE_DIR', DEFAULT_STORE_DIR)
+
+
+def _path(symbol, interval):
+    # 'M' (monthly) would collide with 'm' (minutes) on case-insensitive filesystems
+    return os.path.join(_store_dir(), f"{symbol}_{interval.replace('M', 'mo')}.npy")
+
+
+def _rows_to_array(rows):
+    data = np.empty((len(_COLUMNS), len(rows)), dtype=np.float64)
+    for j, idx in enumerate(_COLUMNS):
+        data[j] = [row[idx] for row in rows]
+    return data
+
+
+def _array_to_rows(data):
+    columns = []
+    for j, idx in enumerate(_COLUMNS):
+        values = data[j].tolist()
+        columns.append([int(v) for v in values] if idx in _INT_COLUMNS else [repr(v) for v in values])
+    return [list(row) + ['0'] for row in zip(*columns)]
+
+
+def load_bars(symbol, interval, limit=None):
+    """
+    Returns up to `limit` newest stored rows for (symbol, interval), or None if
+    nothing usable is stored. Stale or unreadable files are deleted.
+    """
+    path = _path(symbol, interval)
+    if not os.path.exists(path):
+        return None
+    try:
+        data = np.load(path, mmap_mode='r')
+        if data.ndim != 2 or data.shape[0] != len(_COLUMNS) or data.shape[1] == 0:
+            raise ValueError(f"unexpected shape {data.shape}")
+        last_close_ms = float(data[6, -1])
+        if time.time() * 1000 - last_close_ms > _settings('BAR_STORE_MAX_AGE_HOURS', DEFAULT_MAX_AGE_HOURS) * 3600 * 1000:
+            del data
+            _remove(path)
+            return None
+        stored_bars = data.shape[1]
+        tail = np.array(data[:, -limit:] if limit else data)
+        del data
+        os.utime(path)  # Recency for LRU eviction
+    except Exception as e:
+        print(f"[Bar Store] Discarding unreadable {path}: {e}")
+        _remove(path)
+        return None
+
+    rows = _array_to_rows(tail)
+    with _lock:
+        _saved_extents[(symbol, interval)] = (rows[-1][0], stored_bars)
+    return rows
+
+
+def save_bars(symbol, interval, rows):
+    """
+    Writes the closed bars among `rows` if a new one closed since the last
+    save, or if they extend further back than the stored bars.
+    """
+    now_ms = time.time() * 1000
+    closed = [row for row in rows if int(row[6]) < now_ms]
+    if not closed:
+        return
+    key = (symbol, interval)
+    newest = int(closed[-1][0])
+    with _lock:
+        saved_newest, saved_bars = _saved_extents.get(key, (None, 0))
+        if saved_newest == newest and saved_bars >= len(closed):
+            return
+        _saved_extents[key] = (newest, len(closed))
+
+    path = _path(symbol, interval)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(_store_dir(), exist_ok=True)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        with open(tmp_path, 'wb') as f:
+            np.save(f, _rows_to_array(closed))
+        os.replace(tmp_path, path)
+        _track_size(os.path.getsize(path) - old_size)
+    except Exception as e:
+        print(f"[Bar Store] Could not write {path}: {e}")
+        with _lock:
+            _saved_extents.pop(key, None)
+
+
+def warm_buffer(symbol, interval, buffer, limit):
+    """Merges stored bars into a buffer the first time it is read in this process."""
+    key = (symbol, interval)
+    with _lock:
+        if key in _warmed:
+            return
+        _warmed.add(key)
+    rows = load_bars(symbol, interval, limit)
+    if rows:
+        buffer.merge(rows)
+
+
+def _remove(path):
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        _track_size(-size)
+    except OSError:
+        pass
+
+
+def _track_size(delta):
+    global _store_size
+    with _lock:
+        if _store_size is None:
+            _store_size = _scan_size()
+        else:
+            _store_size += delta
+        over_cap = _store_size > _settings('BAR_STORE_MAX_MB', DEFAULT_MAX_MB) * 1024 * 1024
+    if over_cap:
+        evict()
+
+
+def _scan_size():
+    directory = _store_dir()
+    if not os.path.isdir(directory):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith('.npy'))
+
+
+def evict():
+    """Deletes least recently used files until the store is at 90% of BAR_STORE_MAX_MB."""
+    global _store_size
+    directory = _store_dir()
+    if not os.path.isdir(directory):
+        return
+    target = _settings('BAR_STORE_MAX_MB', DEFAULT_MAX_MB) * 1024 * 1024 * 0.9
+    entries = sorted((e for e in os.scandir(directory) if e.name.endswith('.npy')), key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in entries)
+    evicted = set()
+    for entry in entries:
+        if total <= target:
+            break
+        try:
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            total -= size
+            evicted.add(os.path.abspath(entry.path))
+        except OSError:
+            continue
+    with _lock:
+        _store_size = total
+        # Evicted series must be rewritten in full if they are still in use
+        for key in [k for k in _saved_extents if os.path.abspath(_path(*k)) in evicted]:
+            _saved_extents.pop(key)
+    if evicted:
+        print(f"[Bar Store] Evicted {len(evicted)} file(s) to stay under {_settings('BAR_STORE_MAX_MB', DEFAULT_MAX_MB)} MB")
@@ -0,0 +1,203 @@
+"""
+Batch Indicators — one vectorized pass over the whole symbol universe.
+
+PURPOSE:
+    A scan cycle runs the same indicator code on 100+ separate 350-row frames.
+    At that size pandas spends more time dispatching each rolling/ewm call than
+    doing the arithmetic, so the per-symbol cost barely depends on the data.
+
+HOW IT WORKS:
+    1. stack_frames() stacks the OHLCV columns of frames with the same number
+       of bars into a panel: {column: 2D array of shape (symbols, bars)}.
+    2. The batch_* functions compute the indicators of data/indicators.py for
+       every row of the panel at once, with the same parameters, warm-up NaNs
+       and column names. Rolling windows use sliding-window views, the EWMs use
+       scipy.signal.lfilter along the bar axis, and ATR/ADX share the fused
+       kernel in data/indicators.py.
+    3. Each batch_* function returns {column: 2D array}; row i belongs to the
+       i-th stacked symbol. data/indicator_pipeline.py stores those rows in its
+       per-bar cache, so process_symbol picks them up as if it had computed
+       them on its own frame.
+
+    All helpers also work on 1D arrays (a single series).
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from data.indicators import PERIOD, K, D, atr_adx_kernel
+from data.bos_engine import ffill, recent_any
+
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def stack_frames(frames):
+    """Stacks the OHLCV columns of equally long frames into a panel of (symbols, bars) arrays."""
+    return {column: np.vstack([df[column].to_numpy(dtype=np.float64) for df in frames]) for column in BAR_COLUMNS}
+
+
+# --- Array helpers (time runs along the last axis) ---
+
+def _windowed(values, period, reduce):
+    """Applies `reduce` to each trailing window; the first period-1 values are NaN, as with rolling()."""
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= period:
+        result[..., period - 1:] = reduce(sliding_window_view(values, period, axis=-1), axis=-1)
+    return result
+
+
+def rolling_sum(values, period):
+    return _windowed(values, period, np.sum)
+
+
+def rolling_mean(values, period):
+    return _windowed(values, period, np.mean)
+
+
+def rolling_max(values, period):
+    return _windowed(values, period, np.max)
+
+
+def rolling_min(values, period):
+    return _windowed(values, period, np.min)
+
+
+def rolling_std(values, period):
+    return _windowed(values, period, lambda windows, axis: np.std(windows, axis=axis, ddof=1))
+
+
+def shift(values, periods=1):
+    result = np.full(values.shape, np.nan)
+    result[..., periods:] = values[..., :-periods]
+    return result
+
+
+def ewm(values, alpha):
+    """ewm(alpha=alpha, adjust=False).mean() of NaN-free series: y[t] = (1 - alpha) * y[t-1] + alpha * x[t], y[0] = x[0]."""
+    initial = (1 - alpha) * values[..., :1]
+    return lfilter([alpha], [1, alpha - 1], values, axis=-1, zi=initial)[0]
+
+
+def _safe_divide(numerator, denominator):
+    """numerator / denominator with a zero denominator giving NaN, as the batch functions' replace(0, np.nan)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / np.where(denominator == 0, np.nan, denominator)
+
+
+def wma(values, period):
+    """Weighted moving average, newest bar weighted most; NaN wherever the window contains a NaN."""
+    weights = np.arange(1, period + 1, dtype=np.float64)
+    return _windowed(values, period, lambda windows, axis: windows @ weights / weights.sum())
+
+
+# --- Indicators (same parameters and columns as data/indicators.py) ---
+
+def batch_atr(panel, period=10):
+    return {'atr': atr_adx_kernel(panel['high'], panel['low'], panel['close'], atr_period=period, adx_period=None)[0]}
+
+
+def batch_adx(panel, period=14):
+    return {'ADX': atr_adx_kernel(panel['high'], panel['low'], panel['close'], atr_period=None, adx_period=period)[1]}
+
+
+def batch_adx_atr(panel, adx_period=14, atr_period=10):
+    atr, adx = atr_adx_kernel(panel['high'], panel['low'], panel['close'], atr_period=atr_period, adx_period=adx_period)
+    return {'atr': atr, 'ADX': adx}
+
+
+def batch_rsi(panel, period=14):
+    delta = np.diff(panel['close'], axis=-1, prepend=np.nan)
+    with np.errstate(invalid='ignore'):
+        gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = rolling_mean(-np.where(delta < 0, delta, 0.0), period)
+    rs = _safe_divide(gain, loss)
+    rsi = 100 - 100 / (1 + np.where(np.isnan(rs), 0.0, rs))
+    return {'rsi': np.where(np.isnan(rsi), 50.0, rsi)}
+
+
+def batch_price_sma(panel, period=50):
+    return {f'price_sma_{period}': rolling_mean(panel['close'], period)}
+
+
+def batch_hull_moving_average(panel, period=10):
+    close = panel['close']
+    return {f'hma_{period}': wma(2 * wma(close, period // 2) - wma(close, period), int(np.sqrt(period)))}
+
+
+def batch_bollinger_bands(panel, period=14, std_dev=2):
+    mid = rolling_mean(panel['close'], period)
+    std = rolling_std(panel['close'], period)
+    return {'BB_Mid': mid, 'BB_Std': std, 'BB_Upper': mid + std * std_dev, 'BB_Lower': mid - std * std_dev}
+
+
+def batch_macd(panel, fast=12, slow=26, signal=9):
+    close = panel['close']
+    macd = ewm(close, 2 / (fast + 1)) - ewm(close, 2 / (slow + 1))
+    macd_signal = ewm(macd, 2 / (signal + 1))
+    return {'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd - macd_signal}
+
+
+def batch_ema(panel, span=21):
+    return {f'ema_{span}': ewm(panel['close'], 2 / (span + 1))}
+
+
+def batch_vwap(panel, period=288):
+    typical_price = (panel['high'] + panel['low'] + panel['close']) / 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = rolling_sum(typical_price * panel['volume'], period) / rolling_sum(panel['volume'], period)
+    return {'vwap': vwap}
+
+
+def batch_vol_sma(panel, period=20):
+    return {'vol_sma': rolling_mean(panel['volume'], period)}
+
+
+def batch_volume_anomaly(panel, multiplier=1.5):
+    """Needs vol_sma in the panel (batch_vol_sma)."""
+    with np.errstate(invalid='ignore'):
+        return {'volume_anomaly': panel['volume'] > panel['vol_sma'] * multiplier}
+
+
+def batch_stoch(panel, period=PERIOD, k=K, d=D):
+    lowest_low = rolling_min(panel['low'], period)
+    highest_high = rolling_max(panel['high'], period)
+    raw_k = 100 * _safe_divide(panel['close'] - lowest_low, highest_high - lowest_low)
+    raw_k = np.where(np.isnan(raw_k), 50.0, raw_k)
+    raw_k[..., :period - 1] = np.nan  # Preserve initial window lookback NaNs
+    stoch_k = rolling_mean(raw_k, k)
+    return {'stoch_k': stoch_k, 'stoch_d': rolling_mean(stoch_k, d)}
+
+
+def batch_bos(panel, period=192, retest_window=12, retest_proximity=0.003, retest_wick_threshold=0.30):
+    open_, high, low, close = panel['open'], panel['high'], panel['low'], panel['close']
+    # Highest high / lowest low of the PREVIOUS N periods
+    recent_high = shift(rolling_max(high, period))
+    recent_low = shift(rolling_min(low, period))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bullish_bos = close > recent_high
+        bearish_bos = close < recent_low
+
+        bos_level_long = ffill(np.where(bullish_bos, recent_high, np.nan), retest_window)
+        bos_level_short = ffill(np.where(bearish_bos, recent_low, np.nan), retest_window)
+        recent_bos_long = recent_any(bullish_bos, retest_window)
+        recent_bos_short = recent_any(bearish_bos, retest_window)
+
+        candle_range = high - low
+        near_level_long = ~np.isnan(bos_level_long) & recent_bos_long & ~bullish_bos & \
+            (np.abs(low - bos_level_long) / bos_level_long < retest_proximity)
+        wick_ok_long = (candle_range > 0) & ((np.minimum(open_, close) - low) / candle_range >= retest_wick_threshold)
+        bos_retest_long = near_level_long & wick_ok_long & (close > bos_level_long)
+
+        near_level_short = ~np.isnan(bos_level_short) & recent_bos_short & ~bearish_bos & \
+            (np.abs(high - bos_level_short) / bos_level_short < retest_proximity)
+        wick_ok_short = (candle_range > 0) & ((high - np.maximum(open_, close)) / candle_range >= retest_wick_threshold)
+        bos_retest_short = near_level_short & wick_ok_short & (close < bos_level_short)
+
+    return {
+        'recent_high': recent_high, 'recent_low': recent_low,
+        'bullish_bos': bullish_bos, 'bearish_bos': bearish_bos,
+        'bos_level_long': bos_level_long, 'bos_level_short': bos_level_short,
+        'recent_bos_long': recent_bos_long, 'recent_bos_short': recent_bos_short,
+        'bos_retest_long': bos_retest_long, 'bos_retest_short': bos_retest_short,
+    }
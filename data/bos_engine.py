@@ -0,0 +1,117 @@
+"""
+BOS Engine — Break of Structure levels from monotonic deques, evaluated on the tail.
+
+PURPOSE:
+    calculate_bos ran 192-bar rolling max/min, forward fills, rolling boolean
+    maxima and a dozen full-column masks over all 350 bars every cycle, while
+    the strategies only read the last retest window (bos_retest_* and
+    bos_level_* at iloc[-2], recent_high/low at iloc[-1], and the breakout
+    search over the last BOS_RETEST_WINDOW + 1 bars).
+
+HOW IT WORKS:
+    1. The structure levels (highest high / lowest low of the previous
+       `period` bars) come from one pass of a monotonic deque over the bars
+       the evaluated rows depend on: O(bars), independent of `period`.
+    2. A retest at row t depends on breakouts in the `retest_window` rows
+       before it, so evaluating the last `tail` rows needs the levels of
+       `tail + retest_window` rows and `period` bars of history before them.
+    3. evaluate_bos() returns the columns of calculate_bos for rows
+       start..end. With start = 0 it is the batch mode over a whole history
+       (historical miner, backtests); calculate_bos(df, tail=n) uses it for the
+       last n rows and leaves the earlier rows NaN / False.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from data.indicator_backend import compiled_kernels
+
+
+def rolling_extremes(values, period, first, sign=1):
+    """
+    Max (sign=1) or min (sign=-1) of the `period` values ending at each row from
+    `first` on, via a monotonic deque; NaN until a full window is available.
+    """
+    kernels = compiled_kernels()
+    if kernels is not None:
+        return kernels.rolling_extremes(np.ascontiguousarray(values, dtype=np.float64), period, first, sign)
+    result = np.full(len(values) - first, np.nan)
+    values = values.tolist()  # Python floats: scalar indexing into a numpy array dominates this loop otherwise
+    candidates = deque()  # indices whose values are strictly decreasing (after applying sign)
+    for i in range(max(0, first - period + 1), len(values)):
+        value = sign * values[i]
+        while candidates and sign * values[candidates[-1]] <= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - period:
+            candidates.popleft()
+        if i >= first and i >= period - 1:
+            result[i - first] = values[candidates[0]]
+    return result
+
+
+def _previous_extremes(values, period, first, sign):
+    """Extreme of the `period` bars before each row from `first` on (the row itself excluded), as shift(1).rolling()."""
+    if first == 0:
+        return np.concatenate(([np.nan], rolling_extremes(values[:-1], period, 0, sign)))[:len(values)]
+    return rolling_extremes(values[:-1], period, first - 1, sign)
+
+
+def ffill(values, limit):
+    """Forward-fills NaNs from the last valid value for at most `limit` bars, as Series.ffill(limit=limit)."""
+    positions = np.arange(values.shape[-1])
+    last_valid = np.maximum.accumulate(np.where(np.isnan(values), -1, positions), axis=-1)
+    filled = np.take_along_axis(values, np.maximum(last_valid, 0), axis=-1)
+    return np.where((last_valid >= 0) & (positions - last_valid <= limit), filled, np.nan)
+
+
+def recent_any(flags, window):
+    """True where any of the last `window` flags (including the current one) is set."""
+    counts = np.cumsum(flags, axis=-1)
+    counts[..., window:] -= counts[..., :-window].copy()
+    return counts > 0
+
+
+def evaluate_bos(open_, high, low, close, period=192, retest_window=12, retest_proximity=0.003,
+                 retest_wick_threshold=0.30, start=0):
+    """
+    The calculate_bos columns for rows start..len-1 of numpy OHLC arrays, as
+    {column: array of len - start}. Values equal calculate_bos on the full
+    frame for every evaluated row.
+    """
+    # Rows whose breakouts can still reach the first evaluated row through the retest window
+    lo = max(0, start - retest_window)
+    recent_high = _previous_extremes(high, period, lo, 1)
+    recent_low = _previous_extremes(low, period, lo, -1)
+    open_, high, low, close = open_[lo:], high[lo:], low[lo:], close[lo:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bullish_bos = close > recent_high
+        bearish_bos = close < recent_low
+        bos_level_long = ffill(np.where(bullish_bos, recent_high, np.nan), retest_window)
+        bos_level_short = ffill(np.where(bearish_bos, recent_low, np.nan), retest_window)
+        recent_bos_long = recent_any(bullish_bos, retest_window)
+        recent_bos_short = recent_any(bearish_bos, retest_window)
+
+        # Retest long: pull back to the broken resistance with a lower-wick rejection, closing above it
+        candle_range = high - low
+        near_level_long = ~np.isnan(bos_level_long) & recent_bos_long & ~bullish_bos & \
+            (np.abs(low - bos_level_long) / bos_level_long < retest_proximity)
+        wick_ok_long = (candle_range > 0) & ((np.minimum(open_, close) - low) / candle_range >= retest_wick_threshold)
+        bos_retest_long = near_level_long & wick_ok_long & (close > bos_level_long)
+
+        # Retest short: pull back to the broken support with an upper-wick rejection, closing below it
+        near_level_short = ~np.isnan(bos_level_short) & recent_bos_short & ~bearish_bos & \
+            (np.abs(high - bos_level_short) / bos_level_short < retest_proximity)
+        wick_ok_short = (candle_range > 0) & ((high - np.maximum(open_, close)) / candle_range >= retest_wick_threshold)
+        bos_retest_short = near_level_short & wick_ok_short & (close < bos_level_short)
+
+    columns = {
+        'recent_high': recent_high, 'recent_low': recent_low,
+        'bullish_bos': bullish_bos, 'bearish_bos': bearish_bos,
+        'bos_level_long': bos_level_long, 'bos_level_short': bos_level_short,
+        'recent_bos_long': recent_bos_long, 'recent_bos_short': recent_bos_short,
+        'bos_retest_long': bos_retest_long, 'bos_retest_short': bos_retest_short,
+    }
+    return {column: values[start - lo:] for column, values in columns.items()}
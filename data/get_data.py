@@ -2,15 +2,22 @@ from config.secrets import API_KEY, API_SECRET
 import pandas as pd
 from binance.client import Client
 from config.settings import *
+import sys
 import numpy as np
 from scipy.signal import argrelextrema
 import time
+import zlib
 from functools import lru_cache
+from decimal import Decimal, ROUND_DOWN
 
-from data.indicators import calculate_stoch, add_price_sma, calculate_macd, calculate_bollinger_bands, PERIOD, K, D
+from data.kline_buffer import get_kline_buffer, peek_kline_buffer, interval_to_ms, decode_klines
+from data.resampler import can_resample, resample_klines
+from data import bar_store
+from data.kline_stream import get_active_stream
 from src.state_manager import bot_state
+from src.market_snapshot import get_snapshot
 
-from config.client import client
+from src.rate_limiter import client
 
 def get_all_positions_and_balance():
     """
@@ -25,60 +32,117 @@ def get_all_positions_and_balance():
         print(f"Error fetching account data: {e}")
         return [], []
 
-def fetch_multi_timeframe_data(symbol, short_interval, mid_interval, long_interval):
+_HTF_FALLBACK_TTL = 14400  # For intervals without a fixed length (e.g. monthly)
+
+def _htf_cache_valid(symbol, interval, last_fetch_time, now):
+    """
+    True while no candle of `interval` has closed since last_fetch_time.
+    Each symbol refreshes a fixed, symbol-derived delay after the close (up to
+    HTF_REFRESH_JITTER_SECONDS) so the whole universe does not hit REST in the
+    same second.
+    """
+    if last_fetch_time is None:
+        return False
+    try:
+        interval_s = interval_to_ms(interval) / 1000
+    except ValueError:
+        return now - last_fetch_time <= _HTF_FALLBACK_TTL
+    max_jitter = getattr(sys.modules['config.settings'], 'HTF_REFRESH_JITTER_SECONDS', 20)
+    jitter = (zlib.crc32(f"{symbol}@{interval}".encode()) % 1000) / 1000 * min(max_jitter, interval_s / 2)
+    # Most recent refresh point: the last candle close plus this symbol's jitter
+    refresh_at = (now - jitter) // interval_s * interval_s + jitter
+    return last_fetch_time >= refresh_at
+
+def fetch_execution_frame(symbol, interval):
+    """Execution-timeframe klines; 350 bars are enough for VWAP and BOS calculations."""
+    df, _, _ = _fetch_live_klines(symbol, interval, lookback='350')
+    return df
+
+def fetch_strategy_frames(symbol, short_interval, long_interval):
+    """
+    Fetches the frames the strategies read: the execution timeframe, 1h (for the
+    stochastic confirmation, the EMA 21 trend filter and the ADX regime gate) and
+    the long timeframe with its support/resistance. Indicators are added by the
+    caller through data.indicator_pipeline, only for the strategies that run.
+    """
     current_time = time.time()
-    CACHE_DURATION_MID = 1800
-    CACHE_DURATION_LONG = 14400
-
-    # Use 350 bars for the short TF: enough for VWAP and BOS calculations
-    df_short, support_short, resistance_short = fetch_klines(symbol, short_interval, lookback='350')
-    df_short = calculate_macd(df_short)  # Add MACD for short timeframe
-    df_short = calculate_bollinger_bands(df_short)  # Add Bollinger Bands for mean-reversion guard
-
-    # Fetch 1h data for multi-timeframe stochastic confirmation
-    df_1h, _, _ = fetch_klines(symbol, '1h', lookback='150')
-    stoch_k_1h, stoch_d_1h = calculate_stoch(df_1h['high'], df_1h['low'], df_1h['close'], PERIOD, K, D)
-
-    if (symbol not in bot_state.last_fetch_time_mid or \
-        (current_time - bot_state.last_fetch_time_mid[symbol]) > CACHE_DURATION_MID):
-        df_mid, support_mid, resistance_mid = fetch_klines(symbol, mid_interval, lookback='250')  # Increased for SMA 200 safety margin
-        stoch_k_mid, stoch_d_mid = calculate_stoch(df_mid['high'], df_mid['low'], df_mid['close'], PERIOD, K, D)
-        df_mid = add_price_sma(df_mid, period=50)
-        df_mid = add_price_sma(df_mid, period=200)  # Add SMA 200 for trend filter
-        df_mid = calculate_macd(df_mid)  # Add MACD for mid timeframe
-        bot_state.cached_data_mid[symbol] = (df_mid, support_mid, resistance_mid, stoch_k_mid, stoch_d_mid)
-        bot_state.last_fetch_time_mid[symbol] = current_time
-    else:
-        df_mid, support_mid, resistance_mid, stoch_k_mid, stoch_d_mid = bot_state.cached_data_mid[symbol]
+    df_short = fetch_execution_frame(symbol, short_interval)
+    df_1h, _, _ = _fetch_htf_klines(symbol, '1h', lookback='150', base_interval=short_interval)
 
-    if (symbol not in bot_state.last_fetch_time_long or \
-        (current_time - bot_state.last_fetch_time_long[symbol]) > CACHE_DURATION_LONG):
-        df_long, support_long, resistance_long = fetch_klines(symbol, long_interval, lookback='250')
-        stoch_k_long, stoch_d_long = calculate_stoch(df_long['high'], df_long['low'], df_long['close'], PERIOD, K, D)
-        bot_state.cached_data_long[symbol] = (df_long, support_long, resistance_long, stoch_k_long, stoch_d_long)
+    # The long frame only changes when one of its candles closes
+    if not _htf_cache_valid(symbol, long_interval, bot_state.last_fetch_time_long.get(symbol), current_time):
+        df_long, support_long, resistance_long = _fetch_htf_klines(symbol, long_interval, lookback='250', base_interval=short_interval)  # Increased for SMA 200 safety margin
+        bot_state.cached_data_long[symbol] = (df_long, support_long, resistance_long)
         bot_state.last_fetch_time_long[symbol] = current_time
     else:
-        df_long, support_long, resistance_long, stoch_k_long, stoch_d_long = bot_state.cached_data_long[symbol]
+        df_long, support_long, resistance_long = bot_state.cached_data_long[symbol]
 
-    return df_short, support_short, resistance_short, df_mid, support_mid, resistance_mid, stoch_k_mid, stoch_d_mid, df_long, support_long, resistance_long, stoch_k_1h, stoch_d_1h, df_1h
+    return df_short, df_1h, df_long, support_long, resistance_long
 
 _exchange_info_cache = None
 _exchange_info_cache_time = 0
 _EXCHANGE_INFO_TTL = 21600  # Refresh exchange info every 6 hours
+_symbol_index = {}
+
+def _refresh_exchange_info():
+    """
+    Fetches exchange info and rebuilds the per-symbol metadata index.
+    Filters are parsed once here into Decimal tick/step sizes so rounding is a
+    single dict lookup plus one Decimal quantize per call.
+    """
+    global _exchange_info_cache, _exchange_info_cache_time, _symbol_index
+    exchange_info = client.futures_exchange_info()
+    index = {}
+    for s in exchange_info['symbols']:
+        meta = {'info': s, 'tick_size': None, 'step_size': None, 'min_qty': None, 'min_notional': 0.0}
+        for filt in s.get('filters', []):
+            if filt['filterType'] == 'PRICE_FILTER':
+                meta['tick_size'] = _make_quantizer(filt['tickSize'])
+            elif filt['filterType'] == 'LOT_SIZE':
+                meta['step_size'] = _make_quantizer(filt['stepSize'])
+                meta['min_qty'] = Decimal(filt['minQty'])
+            elif filt['filterType'] == 'MIN_NOTIONAL':
+                meta['min_notional'] = float(filt.get('notional', filt.get('minNotional', 0)))
+        index[s['symbol']] = meta
+    _exchange_info_cache = exchange_info
+    _symbol_index = index
+    _exchange_info_cache_time = time.time()
+
+def _make_quantizer(size):
+    """
+    Returns (size, is_power_of_ten) for a tick/step size string. Power-of-ten
+    sizes (0.001) round with a single quantize; others (0.05, 5) go through an
+    integer division first.
+    """
+    size = Decimal(size).normalize()
+    if size <= 0:
+        return None
+    return size, size.as_tuple().digits == (1,)
+
+def _quantize_down(value, quantizer):
+    size, is_power_of_ten = quantizer
+    value = Decimal(str(value))
+    if is_power_of_ten:
+        return value.quantize(size, rounding=ROUND_DOWN)
+    return (value / size).to_integral_value(rounding=ROUND_DOWN) * size
+
+def get_symbol_meta(symbol):
+    """
+    Returns the indexed metadata for a symbol: tick_size/step_size quantizers,
+    min_qty (Decimal), min_notional (float) and the raw exchange info under
+    'info'. Exchange info is cached globally with a 6-hour TTL.
+    """
+    if _exchange_info_cache is None or (time.time() - _exchange_info_cache_time) > _EXCHANGE_INFO_TTL:
+        _refresh_exchange_info()
+    return _symbol_index.get(symbol)
 
 def get_symbol_info(symbol):
     """
     Returns exchange info for a symbol. Cached globally with 6-hour TTL
     to avoid repeated exchange_info() API calls.
     """
-    global _exchange_info_cache, _exchange_info_cache_time
-    if _exchange_info_cache is None or (time.time() - _exchange_info_cache_time) > _EXCHANGE_INFO_TTL:
-        _exchange_info_cache = client.futures_exchange_info()
-        _exchange_info_cache_time = time.time()
-    for s in _exchange_info_cache['symbols']:
-        if s['symbol'] == symbol:
-            return s
-    return None
+    meta = get_symbol_meta(symbol)
+    return meta['info'] if meta else None
 
 def get_usdt_balance(balance_data):
     """
@@ -111,6 +175,16 @@ def get_position(symbol, all_positions):
             return position_amt, roi, unrealized_profit, margin_used, entry_price
     return 0, 0, 0, 0, 0
 def get_market_price(symbol):
+    # Within a cycle the shared snapshot serves mark prices for every symbol from one call
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        try:
+            price = snapshot.mark_price(symbol)
+            if price:
+                return price
+        except Exception as e:
+            if 'Too many requests' not in str(e):
+                print(f"Error refreshing mark prices from snapshot: {e}")
     try:
         price = float(client.futures_mark_price(symbol=symbol)['markPrice'])
         return price
@@ -120,36 +194,122 @@ def get_market_price(symbol):
         return None
 
 def round_quantity(symbol, quantity):
-    symbol_info = get_symbol_info( symbol )
-    if not symbol_info: return quantity
-    for filt in symbol_info['filters']:
-        if filt['filterType'] == 'LOT_SIZE':
-            min_qty, step_size = float(filt['minQty']), float(filt['stepSize'])
-            quantity = max(quantity, min_qty)
-            return round(quantity - (quantity % step_size), 8)
-    return quantity
+    meta = get_symbol_meta(symbol)
+    if not meta or meta['step_size'] is None: return quantity
+    quantity = max(Decimal(str(quantity)), meta['min_qty'])
+    return float(_quantize_down(quantity, meta['step_size']))
    
 def round_price(symbol, price):
-    symbol_info = get_symbol_info( symbol )
-    if not symbol_info: return price
-    for filt in symbol_info['filters']:
-        if filt['filterType'] == 'PRICE_FILTER':
-            tick_size = float(filt['tickSize'])
-            return round(price - (price % tick_size), 8)
-    return price
+    meta = get_symbol_meta(symbol)
+    if not meta or meta['tick_size'] is None: return price
+    return float(_quantize_down(price, meta['tick_size']))
 
 def fetch_klines(symbol, interval, lookback='100'):
+    """
+    Returns the last `lookback` klines as a DataFrame.
+    Bars live in a per-(symbol, interval) ring buffer: after the first full fetch,
+    only the bars since the last buffered open time are requested, which also
+    patches the previously forming candle. Holes (e.g. after downtime) are
+    backfilled the same way, and a full refetch only happens when the gap is
+    longer than the requested window. Closed bars are written through to the
+    on-disk bar store, which seeds the buffer after a restart.
+    """
+    limit = int(lookback)
+    buffer = get_kline_buffer(symbol, interval, limit)
+    store_enabled = bar_store.is_enabled()
+    if store_enabled and len(buffer) < limit:
+        # Warm restart: start from the bars persisted before shutdown
+        bar_store.warm_buffer(symbol, interval, buffer, limit)
+    try:
+        interval_ms = interval_to_ms(interval)
+    except ValueError:
+        interval_ms = None
+
+    start_time = buffer.resume_open_time(interval_ms) if (interval_ms and len(buffer)) else None
+    if start_time is not None:
+        missed_bars = int((time.time() * 1000 - start_time) // interval_ms) + 2
+        # Backfill only if the buffered bars plus the missed ones can fill the window
+        if missed_bars <= limit and len(buffer) + missed_bars - 2 >= limit:
+            klines = client.futures_klines(symbol=symbol, interval=interval, startTime=start_time, limit=missed_bars)
+            buffer.merge(klines)
+            if len(buffer) >= limit:
+                if store_enabled:
+                    # The whole buffer: other callers may keep a longer window of this series
+                    bar_store.save_bars(symbol, interval, buffer.tail(len(buffer)))
+                return klines_to_df(buffer.tail(limit))
+
     klines = client.futures_klines(symbol=symbol, interval=interval, limit=lookback)
-    df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_volume', 'trades', 'taker_base', 'taker_quote', 'ignore'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    buffer.reseed(klines)
+    if store_enabled:
+        bar_store.save_bars(symbol, interval, buffer.tail(len(buffer)))
+    return klines_to_df(buffer.tail(limit))
+
+def klines_to_df(klines):
+    df = decode_klines(klines)
     return df, df['low'].min(), df['high'].max()
 
+def _fetch_live_klines(symbol, interval, lookback):
+    """
+    Reads klines from the WebSocket-fed buffers when streaming mode is active,
+    otherwise falls back to fetch_klines. In streaming mode REST is only hit to
+    seed a buffer or backfill the gap left by a reconnect.
+    """
+    stream = get_active_stream()
+    if stream is None or not stream.is_subscribed(symbol, interval):
+        return fetch_klines(symbol, interval, lookback=lookback)
+
+    rows = stream.get_klines(symbol, interval, int(lookback))
+    if rows is None:
+        result = fetch_klines(symbol, interval, lookback=lookback)
+        stream.mark_backfilled(symbol, interval)
+        return result
+    return klines_to_df(rows)
+
+def _fetch_htf_klines(symbol, interval, lookback, base_interval):
+    """
+    Higher-timeframe klines derived from the base (execution) timeframe buffer.
+    REST only seeds the deep history of each series once; after that the
+    buckets covered by the base buffer are rebuilt locally and upserted, so the
+    1h/mid/long frames cost no request per cycle. Falls back to fetch_klines
+    when resampling is disabled, the interval cannot be rebuilt exactly, or the
+    base buffer does not reach back to the last stored bar.
+    """
+    if not getattr(sys.modules['config.settings'], 'ENABLE_HTF_RESAMPLING', True) or not can_resample(base_interval, interval):
+        return _fetch_live_klines(symbol, interval, lookback)
+
+    limit = int(lookback)
+    base = peek_kline_buffer(symbol, base_interval)
+    target = peek_kline_buffer(symbol, interval)
+    if base is None or len(base) == 0 or target is None or len(target) < limit:
+        return fetch_klines(symbol, interval, lookback=lookback)
+    if base.last_close_time < time.time() * 1000:
+        # Base bars were not refreshed since their last candle closed: top them up first
+        _fetch_live_klines(symbol, base_interval, lookback=str(len(base)))
+
+    last_open = target.last_open_time
+    base_rows = [row for row in base.tail(len(base)) if int(row[0]) >= last_open]
+    bars = resample_klines(base_rows, base_interval, interval)
+    if not bars or int(bars[0][0]) != last_open:
+        # The base buffer no longer covers the last stored bar: let REST close the gap
+        return fetch_klines(symbol, interval, lookback=lookback)
+
+    target.merge(bars)
+    if bar_store.is_enabled():
+        bar_store.save_bars(symbol, interval, target.tail(len(target)))
+    return klines_to_df(target.tail(limit))
+
 
 def get_all_funding_rates():
     """
-    Fetches the latest funding rates for all symbols in a single API call.
+    Fetches the latest funding rates for all symbols in a single API call,
+    or reads them from the current cycle's market snapshot.
     """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        try:
+            return snapshot.get_funding_rates()
+        except Exception as e:
+            print(f"Error refreshing funding rates from snapshot: {e}")
     try:
         premium_index = client.futures_mark_price()
         return {item['symbol']: float(item['lastFundingRate']) for item in premium_index if 'lastFundingRate' in item}
@@ -173,7 +333,7 @@ def get_funding_rate(symbol):
 def get_global_btc_trend():
     try:
         from data.indicators import add_price_sma, calculate_adx
-        df_btc, _, _ = fetch_klines('BTCUSDT', PRIMARY_TIMEFRAME, lookback='200')
+        df_btc, _, _ = _fetch_htf_klines('BTCUSDT', PRIMARY_TIMEFRAME, lookback='200', base_interval=EXECUTION_TIMEFRAME)
         df_btc = add_price_sma(df_btc, period=50)
         df_btc = add_price_sma(df_btc, period=200)
         df_btc = calculate_adx(df_btc)
@@ -0,0 +1,66 @@
+"""
+Indicator Backend — optional compiled kernels behind the indicator functions.
+
+PURPOSE:
+    The stochastic, RSI, ATR/ADX, VWAP, BOS structure levels and candlestick
+    patterns are the CPU hot path once the universe grows and the historical
+    miner replays months of bars. Their pandas / numpy versions are fast per
+    call but allocate a temporary per step; loop kernels compiled to machine
+    code do the same work in a single pass.
+
+HOW IT WORKS:
+    1. INDICATOR_BACKEND in settings selects the kernel set: 'numpy' (default)
+       or 'numba'. The functions in data/indicators.py and data/bos_engine.py
+       keep their signatures; each asks compiled_kernels() and, when a
+       compiled set is active, hands its numpy arrays to the matching kernel.
+    2. 'numpy' has no kernel set, so the existing pandas / numpy code runs. It
+       is the reference implementation and stays the fallback.
+    3. 'numba' imports data/indicator_kernels_numba.py, compiled on first call
+       (cache=True keeps the machine code on disk for later runs). Without
+       numba installed the backend logs once and falls back to 'numpy'.
+    4. scripts/indicator_backend_parity_check.py compares every kernel with
+       the reference on random-walk klines and times both.
+"""
+
+import sys
+import importlib
+
+# backend name -> module with the kernel set (None: the pandas / numpy reference)
+BACKENDS = {
+    'numpy': None,
+    'numba': 'data.indicator_kernels_numba',
+}
+
+_active = None  # (name, kernels) once resolved
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+def set_backend(name):
+    """Selects the kernel set by name; returns the backend actually in use."""
+    global _active
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown INDICATOR_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})")
+    kernels = None
+    if BACKENDS[name] is not None:
+        try:
+            kernels = importlib.import_module(BACKENDS[name])
+        except ImportError as e:
+            print(f"[Indicator Backend] '{name}' unavailable ({e}); using the numpy reference implementation")
+            name = 'numpy'
+    _active = (name, kernels)
+    return name
+
+
+def compiled_kernels():
+    """The active compiled kernel set, or None when the reference implementation should run."""
+    if _active is None:
+        set_backend(_settings('INDICATOR_BACKEND', 'numpy'))
+    return _active[1]
+
+
+def active_backend():
+    compiled_kernels()
+    return _active[0]
@@ -0,0 +1,234 @@
+"""
+Numba kernel set for data/indicator_backend.py.
+
+Loop versions of the hot-path indicators in data/indicators.py and
+data/bos_engine.py. They take and return float64 numpy arrays and reproduce
+the reference behaviour as-is: warm-up NaNs, the 50 of a flat stochastic
+range, the 0 RSI of a zero loss average, the unclipped directional movement
+and the undivided DX of a zero +DM/-DM total. Rolling windows cost O(1) per
+row, as in data/streaming_indicators.py: sums are kept running and re-added
+exactly once per `period` rows so long histories do not accumulate drift, and
+window extremes come from a monotonic deque of row indices.
+"""
+
+import numpy as np
+from numba import njit
+
+# error_model='numpy': x / 0 gives inf / NaN as in the reference instead of raising
+_jit = njit(cache=True, error_model='numpy')
+
+
+@_jit
+def _fmax(a, b):
+    """np.fmax: the larger value, ignoring a NaN operand."""
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a >= b else b
+
+
+@_jit
+def _fmin(a, b):
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a <= b else b
+
+
+@_jit
+def _rolling_sum(values, period):
+    """Sum of each trailing window; NaN for the first period-1 rows and for windows containing a NaN."""
+    n = len(values)
+    result = np.full(n, np.nan)
+    total = 0.0
+    nans = 0
+    nonzero = 0
+    for i in range(n):
+        value = values[i]
+        if value != value:
+            nans += 1
+        else:
+            total += value
+            if value != 0:
+                nonzero += 1
+        if i >= period:
+            dropped = values[i - period]
+            if dropped != dropped:
+                nans -= 1
+            else:
+                total -= dropped
+                if dropped != 0:
+                    nonzero -= 1
+        if i < period - 1:
+            continue
+        if (i + 1) % period == 0:
+            # Re-add the window so rounding error cannot accumulate
+            total = 0.0
+            for j in range(i - period + 1, i + 1):
+                if values[j] == values[j]:
+                    total += values[j]
+        if nans == 0:
+            # An all-zero window is exactly zero, as in pandas (RSI's loss average relies on it)
+            result[i] = total if nonzero else 0.0
+    return result
+
+
+@_jit
+def _rolling_extreme(values, period, sign):
+    """Max (sign=1) or min (sign=-1) of each trailing window, NaN as rolling().max() / min()."""
+    n = len(values)
+    result = np.full(n, np.nan)
+    candidates = np.empty(n, dtype=np.int64)  # row indices, sign * value strictly decreasing from head to tail
+    head = tail = 0
+    last_nan = -period
+    for i in range(n):
+        value = sign * values[i]
+        if value != value:
+            last_nan = i
+        else:
+            while tail > head and sign * values[candidates[tail - 1]] <= value:
+                tail -= 1
+            candidates[tail] = i
+            tail += 1
+        while tail > head and candidates[head] <= i - period:
+            head += 1
+        if i >= period - 1 and last_nan <= i - period:
+            result[i] = values[candidates[head]]
+    return result
+
+
+@_jit
+def stoch(high, low, close, period, k, d):
+    """(stoch_k, stoch_d) as calculate_stoch."""
+    lowest_low = _rolling_extreme(low, period, -1)
+    highest_high = _rolling_extreme(high, period, 1)
+    raw_k = np.full(len(close), np.nan)
+    for i in range(period - 1, len(close)):
+        diff = highest_high[i] - lowest_low[i]
+        value = 100 * (close[i] - lowest_low[i]) / diff if diff != 0 else np.nan
+        raw_k[i] = 50.0 if value != value else value
+    stoch_k = _rolling_sum(raw_k, k) / k
+    return stoch_k, _rolling_sum(stoch_k, d) / d
+
+
+@_jit
+def rsi(close, period):
+    """RSI on simple rolling means of gains and losses, as calculate_rsi."""
+    n = len(close)
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain[i] = delta
+        elif delta < 0:
+            loss[i] = -delta
+    avg_gain = _rolling_sum(gain, period) / period
+    avg_loss = _rolling_sum(loss, period) / period
+    result = np.empty(n)
+    for i in range(n):
+        rs = avg_gain[i] / avg_loss[i] if avg_loss[i] != 0 else np.nan
+        if rs != rs:
+            rs = 0.0
+        value = 100 - 100 / (1 + rs)
+        result[i] = 50.0 if value != value else value
+    return result
+
+
+@_jit
+def atr_adx(high, low, close, atr_period, adx_period):
+    """
+    atr_adx_kernel on (symbols, bars) arrays. A period of 0 skips that output,
+    which is then returned with zero rows.
+    """
+    rows, n = high.shape
+    atr = np.empty((rows if atr_period else 0, n))
+    adx = np.empty((rows if adx_period else 0, n))
+    alpha = 1 / atr_period if atr_period else 0.0
+    decay = 1 - 1 / adx_period if adx_period else 0.0
+    for r in range(rows):
+        previous_atr = 0.0
+        plus = minus = smoothed_dx = 0.0
+        for i in range(n):
+            tr = high[r, i] - low[r, i]
+            if i > 0:
+                tr = _fmax(tr, abs(high[r, i] - close[r, i - 1]))
+                tr = _fmax(tr, abs(low[r, i] - close[r, i - 1]))
+            if atr_period:
+                if i == 0:
+                    previous_atr = tr
+                previous_atr = alpha * tr + (1 - alpha) * previous_atr
+                atr[r, i] = previous_atr
+            if adx_period:
+                plus_dm = minus_dm = 0.0
+                if i > 0:
+                    up_move = high[r, i] - high[r, i - 1]
+                    down_move = low[r, i - 1] - low[r, i]
+                    if up_move > down_move:
+                        plus_dm = up_move
+                    if down_move > up_move:
+                        minus_dm = down_move
+                plus = plus_dm + decay * plus
+                minus = minus_dm + decay * minus
+                total = plus + minus
+                dx = abs(plus - minus) * 100
+                if total != 0:
+                    dx = dx / total
+                smoothed_dx = dx + decay * smoothed_dx
+                adx[r, i] = smoothed_dx / ((1 - decay ** (i + 1)) * adx_period)
+    return atr, adx
+
+
+@_jit
+def vwap(high, low, close, volume, period):
+    """Rolling VWAP over `period` bars of the typical price, as calculate_vwap."""
+    typical_volume = (high + low + close) / 3 * volume
+    return _rolling_sum(typical_volume, period) / _rolling_sum(volume, period)
+
+
+@_jit
+def rolling_extremes(values, period, first, sign):
+    """bos_engine.rolling_extremes with the deque held in a preallocated index array."""
+    n = len(values)
+    result = np.full(n - first, np.nan)
+    candidates = np.empty(n, dtype=np.int64)
+    head = tail = 0
+    for i in range(max(0, first - period + 1), n):
+        value = sign * values[i]
+        while tail > head and sign * values[candidates[tail - 1]] <= value:
+            tail -= 1
+        candidates[tail] = i
+        tail += 1
+        if candidates[head] <= i - period:
+            head += 1
+        if i >= first and i >= period - 1:
+            result[i - first] = values[candidates[head]]
+    return result
+
+
+@_jit
+def candlestick_patterns(open_, high, low, close):
+    """(bullish_pattern, bearish_pattern) as 0/1 arrays, as add_candlestick_patterns."""
+    n = len(close)
+    bullish = np.zeros(n, dtype=np.int64)
+    bearish = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        o, h, l, c = open_[i], high[i], low[i], close[i]
+        body = abs(c - o)
+        upper_wick = h - _fmax(c, o)
+        lower_wick = _fmin(c, o) - l
+        # A zero body never qualifies (the reference compares against body.replace(0, NaN))
+        hammer = body != 0 and lower_wick >= 2 * body and upper_wick <= 0.5 * body and c > o
+        shooting_star = body != 0 and upper_wick >= 2 * body and lower_wick <= 0.5 * body and c < o
+        bull_engulf = bear_engulf = False
+        if i > 0:
+            prev_o, prev_c = open_[i - 1], close[i - 1]
+            bull_engulf = c > o and prev_c < prev_o and c > prev_o and o < prev_c
+            bear_engulf = c < o and prev_c > prev_o and c < prev_o and o > prev_c
+        if hammer or bull_engulf:
+            bullish[i] = 1
+        if shooting_star or bear_engulf:
+            bearish[i] = 1
+    return bullish, bearish
@@ -0,0 +1,292 @@
+"""
+Indicator Pipeline — declared indicator needs, computed once per bar.
+
+PURPOSE:
+    process_symbol used to push every frame through a fixed series of
+    calculate_* calls each cycle, whatever the enabled strategies read: ADX and
+    the SMAs of the cached 4h frame and ADX of the 1h frame were recomputed on
+    unchanged bars, and fetch_multi_timeframe_data computed mid-timeframe
+    frames and stochastics that were thrown away.
+
+HOW IT WORKS:
+    1. INDICATORS maps each indicator name to the function that adds it, the
+       indicators it is computed from, and the columns it writes.
+    2. Strategies declare what they read per timeframe role ('execution',
+       'hourly', 'primary') in a REQUIRED_INDICATORS dict; merge_requirements()
+       combines the declarations of the strategies that are enabled.
+    3. compute_indicators() orders the requested names after their
+       dependencies and computes each one at most once per (symbol, interval,
+       bar state). Results are cached as column arrays, so an unchanged
+       higher-timeframe frame, or a second caller on the same bars, reuses them.
+
+    The bar state is the frame length, first and last open time, and the last
+    bar's OHLCV, so a tick of the forming bar invalidates the cache.
+
+BATCH MODE:
+    With ENABLE_BATCH_INDICATORS = True the main loop fetches every symbol's
+    frames before processing them and calls compute_indicators_batch(), which
+    computes the missing indicators of all symbols in one vectorized pass
+    (data/batch_indicators.py) and stores each symbol's rows in the same
+    cache. compute_indicators() in process_symbol then only attaches them.
+
+    The process-pool mode (data/indicator_pool.py) fills the cache the same
+    way: missing_indicators() names what a worker process has to compute,
+    compute_uncached() runs there, and store_indicators() caches the result.
+"""
+
+import sys
+import threading
+from functools import partial
+
+import pandas as pd
+
+import config.settings
+from data import batch_indicators as batch
+from data.indicators import (
+    PERIOD, K, D, calculate_atr, calculate_rsi, add_price_sma, calculate_hull_moving_average, calculate_adx, calculate_adx_atr,
+    calculate_vwap, calculate_bos, calculate_stoch, calculate_macd, calculate_bollinger_bands,
+)
+
+ROLES = ('execution', 'hourly', 'primary')
+
+BOS_COLUMNS = ('recent_high', 'recent_low', 'bullish_bos', 'bearish_bos', 'bos_level_long', 'bos_level_short',
+               'recent_bos_long', 'recent_bos_short', 'bos_retest_long', 'bos_retest_short')
+
+_BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+def _add_vol_sma(df):
+    df['vol_sma'] = df['volume'].rolling(window=_settings('VOLUME_ANOMALY_PERIOD', 20)).mean()
+    return df
+
+
+def _add_volume_anomaly(df):
+    # Same test as calculate_volume_anomaly, reusing the vol_sma column
+    df['volume_anomaly'] = df['volume'] > (df['vol_sma'] * _settings('VOLUME_ANOMALY_MULTIPLIER', 1.5))
+    return df
+
+
+def bos_tail_rows():
+    """Rows of the BOS columns the strategies read: the retest window plus the breakout bar before it and the forming bar."""
+    return _settings('BOS_RETEST_WINDOW', 12) + 2
+
+
+def _add_bos(df):
+    return calculate_bos(df, period=_settings('BOS_LOOKBACK_PERIOD', 192), retest_window=_settings('BOS_RETEST_WINDOW', 12),
+                         retest_proximity=_settings('BOS_RETEST_PROXIMITY_PCT', 0.003),
+                         retest_wick_threshold=_settings('BOS_RETEST_WICK_REJECTION', 0.30), tail=bos_tail_rows())
+
+
+def _add_stoch(df):
+    df['stoch_k'], df['stoch_d'] = calculate_stoch(df['high'], df['low'], df['close'], PERIOD, K, D)
+    return df
+
+
+def _add_ema_21(df):
+    df['ema_21'] = df['close'].ewm(span=21, adjust=False).mean()
+    return df
+
+
+# name -> (function(df) -> df, required indicator names, columns written)
+INDICATORS = {
+    'atr':            (calculate_atr,                                   (),          ('atr',)),
+    'rsi':            (calculate_rsi,                                   (),          ('rsi',)),
+    'price_sma_50':   (partial(add_price_sma, period=50),               (),          ('price_sma_50',)),
+    'price_sma_200':  (partial(add_price_sma, period=200),              (),          ('price_sma_200',)),
+    'hma_14':         (partial(calculate_hull_moving_average, period=14), (),        ('hma_14',)),
+    'adx':            (calculate_adx,                                   (),          ('ADX',)),
+    'vwap':           (partial(calculate_vwap, period=288),             (),          ('vwap',)),
+    'vol_sma':        (_add_vol_sma,                                    (),          ('vol_sma',)),
+    'volume_anomaly': (_add_volume_anomaly,                             ('vol_sma',), ('volume_anomaly',)),
+    'bos':            (_add_bos,                                        (),          BOS_COLUMNS),
+    'stoch':          (_add_stoch,                                      (),          ('stoch_k', 'stoch_d')),
+    'macd':           (calculate_macd,                                  (),          ('macd', 'macd_signal', 'macd_hist')),
+    'bollinger':      (calculate_bollinger_bands,                       (),          ('BB_Mid', 'BB_Std', 'BB_Upper', 'BB_Lower')),
+    'ema_21':         (_add_ema_21,                                     (),          ('ema_21',)),
+}
+
+
+# name -> function(panel) -> {column: (symbols, bars) array}, the vectorized twin of INDICATORS
+BATCH_INDICATORS = {
+    'atr':            batch.batch_atr,
+    'rsi':            batch.batch_rsi,
+    'price_sma_50':   partial(batch.batch_price_sma, period=50),
+    'price_sma_200':  partial(batch.batch_price_sma, period=200),
+    'hma_14':         partial(batch.batch_hull_moving_average, period=14),
+    'adx':            batch.batch_adx,
+    'vwap':           partial(batch.batch_vwap, period=288),
+    'vol_sma':        lambda panel: batch.batch_vol_sma(panel, period=_settings('VOLUME_ANOMALY_PERIOD', 20)),
+    'volume_anomaly': lambda panel: batch.batch_volume_anomaly(panel, multiplier=_settings('VOLUME_ANOMALY_MULTIPLIER', 1.5)),
+    'bos':            lambda panel: batch.batch_bos(panel, period=_settings('BOS_LOOKBACK_PERIOD', 192),
+                                                    retest_window=_settings('BOS_RETEST_WINDOW', 12),
+                                                    retest_proximity=_settings('BOS_RETEST_PROXIMITY_PCT', 0.003),
+                                                    retest_wick_threshold=_settings('BOS_RETEST_WICK_REJECTION', 0.30)),
+    'stoch':          batch.batch_stoch,
+    'macd':           batch.batch_macd,
+    'bollinger':      batch.batch_bollinger_bands,
+    'ema_21':         partial(batch.batch_ema, span=21),
+}
+
+
+# Indicators with a shared kernel, computed in one call when all of them are missing:
+# names -> (function(df) -> df, function(panel) -> columns). Members must not depend on other indicators.
+FUSED_INDICATORS = {
+    ('atr', 'adx'): (calculate_adx_atr, batch.batch_adx_atr),
+}
+
+
+def batch_enabled():
+    return _settings('ENABLE_BATCH_INDICATORS', False)
+
+
+def resolve(names):
+    """Returns `names` plus everything they depend on, each after its dependencies."""
+    order = []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Indicator dependency cycle: {' -> '.join(path + [name])}")
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        state[name] = 'visiting'
+        for dependency in INDICATORS[name][1]:
+            visit(dependency, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in sorted(names):
+        visit(name, [])
+    return order
+
+
+def _steps(order, missing):
+    """Groups the missing names of `order` into compute steps, fusing those that share a kernel."""
+    steps = []
+    for name in order:
+        if name not in missing or any(name in step for step in steps):
+            continue
+        fused = next((names for names in FUSED_INDICATORS if name in names and missing.issuperset(names)), None)
+        steps.append(fused or (name,))
+    return steps
+
+
+def merge_requirements(*declarations):
+    """Combines REQUIRED_INDICATORS declarations into {role: set of indicator names}."""
+    merged = {role: set() for role in ROLES}
+    for declaration in declarations:
+        for role, names in declaration.items():
+            merged[role].update(names)
+    return merged
+
+
+def _frame_signature(df):
+    if len(df) == 0:
+        return (0,)
+    timestamps = df['timestamp']
+    last_bar = tuple(float(df[column].iat[-1]) for column in _BAR_COLUMNS)
+    return (len(df), timestamps.iat[0], timestamps.iat[-1], last_bar)
+
+
+_cache = {}  # (symbol, interval) -> (signature, {name: {column: ndarray}})
+_cache_lock = threading.Lock()
+
+
+def _cache_entry(symbol, interval, df):
+    signature = _frame_signature(df)
+    with _cache_lock:
+        entry = _cache.get((symbol, interval))
+        if entry is None or entry[0] != signature:
+            entry = _cache[(symbol, interval)] = (signature, {})
+        return entry[1]
+
+
+def missing_indicators(symbol, interval, df, names):
+    """The names of `names` (and their dependencies) not yet cached for these bars, in compute order."""
+    results = _cache_entry(symbol, interval, df)
+    return [name for name in resolve(names) if name not in results]
+
+
+def store_indicators(symbol, interval, df, computed):
+    """Caches {name: {column: ndarray}} computed elsewhere for these bars."""
+    results = _cache_entry(symbol, interval, df)
+    for name, columns in computed.items():
+        results.setdefault(name, columns)
+
+
+def compute_uncached(df, names):
+    """Computes `names` and their dependencies on `df` without touching the cache; {name: {column: ndarray}}."""
+    order = resolve(names)
+    computed = {}
+    for step in _steps(order, set(order)):
+        compute = FUSED_INDICATORS[step][0] if len(step) > 1 else INDICATORS[step[0]][0]
+        df = compute(df)
+        for name in step:
+            computed[name] = {column: df[column].to_numpy() for column in INDICATORS[name][2]}
+    return computed
+
+
+def compute_indicators(symbol, interval, df, names):
+    """
+    Returns `df` with the columns of `names` (and their dependencies) added.
+    Indicators already computed for the same bars are taken from the cache.
+    """
+    order = resolve(names)
+    if not order:
+        return df
+    key = (symbol, interval)
+    signature = _frame_signature(df)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] != signature:
+            entry = _cache[key] = (signature, {})
+        results = entry[1]
+
+    # Attach cached results first so the missing indicators can read their dependencies
+    cached = {column: values for name in order if name in results for column, values in results[name].items()}
+    if cached:
+        existing = [column for column in cached if column in df.columns]
+        df = pd.concat([df.drop(columns=existing) if existing else df, pd.DataFrame(cached, index=df.index, copy=False)], axis=1)
+
+    for step in _steps(order, {name for name in order if name not in results}):
+        compute = FUSED_INDICATORS[step][0] if len(step) > 1 else INDICATORS[step[0]][0]
+        df = compute(df)
+        for name in step:
+            results[name] = {column: df[column].to_numpy(copy=True) for column in INDICATORS[name][2]}
+    return df
+
+
+def compute_indicators_batch(interval, frames, names):
+    """
+    Computes `names` (and their dependencies) for all frames of {symbol: df} in
+    one vectorized pass per frame length and caches each symbol's rows, so a
+    following compute_indicators() on the same bars only attaches them.
+    Symbols whose cache already holds every indicator are skipped.
+    """
+    order = resolve(names)
+    groups = {}  # frame length -> [(df, cached results)]
+    for symbol, df in frames.items():
+        if len(df) == 0:
+            continue
+        signature = _frame_signature(df)
+        with _cache_lock:
+            entry = _cache.get((symbol, interval))
+            if entry is None or entry[0] != signature:
+                entry = _cache[(symbol, interval)] = (signature, {})
+        if any(name not in entry[1] for name in order):
+            groups.setdefault(len(df), []).append((df, entry[1]))
+
+    for members in groups.values():
+        panel = batch.stack_frames([df for df, _ in members])
+        for step in _steps(order, set(order)):
+            columns = FUSED_INDICATORS[step][1](panel) if len(step) > 1 else BATCH_INDICATORS[step[0]](panel)
+            panel.update(columns)
+            for name in step:
+                for row, (_, results) in enumerate(members):
+                    results.setdefault(name, {column: columns[column][row] for column in INDICATORS[name][2]})
@@ -0,0 +1,208 @@
+"""
+Indicator Pool — indicator math in worker processes, frames in shared memory.
+
+PURPOSE:
+    process_symbol runs the pandas indicator computations on the event loop
+    thread; only the network calls go through asyncio.to_thread. With several
+    symbols in flight the loop is blocked by CPU work, order management for
+    open positions waits behind entry scans, and the GIL keeps the work on
+    one core.
+
+HOW IT WORKS:
+    1. With ENABLE_INDICATOR_PROCESS_POOL = True, process_symbol awaits
+       compute_indicators_pooled() instead of calling compute_indicators().
+       The pipeline cache is checked first; only the missing indicators are
+       sent out.
+    2. The timestamp and OHLCV columns of every frame of the job are written
+       into one shared-memory block (one row per column). A worker process of
+       a ProcessPoolExecutor (INDICATOR_POOL_WORKERS, default: CPU count)
+       attaches to it, rebuilds the frames and runs compute_uncached() from
+       data/indicator_pipeline.py, i.e. the same indicator functions and
+       INDICATOR_BACKEND kernels as in-process.
+    3. The worker writes the result columns into a second block that the
+       caller allocated from the indicator declarations. Only the job
+       description and the result dtypes cross the pipe; no DataFrame is
+       pickled either way.
+    4. The caller copies the columns out, unlinks both blocks and stores the
+       results in the pipeline cache. compute_indicators() then only
+       attaches them, so strategies, the 1H ADX regime gate and the position
+       logic read the same columns as in the in-process mode. Strategy
+       evaluation stays in the main process: it reads bot_state and the
+       per-symbol trackers.
+
+    Workers are started with the 'spawn' method: the bot runs threads (rate
+    limiter, kline stream) that must not be forked, and it is the only method
+    on Windows. Settings are read by the workers from config/settings.py at
+    start-up, so changes made at runtime in the main process do not reach
+    them.
+
+    A pool whose worker died (BrokenProcessPool) is shut down and dropped;
+    that call falls back to in-process computation and the next one starts
+    a fresh pool. A submit that loses the race with a shutdown (RuntimeError
+    'cannot schedule new futures after shutdown') falls back the same way.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from data.indicator_backend import active_backend, set_backend
+from data.indicator_pipeline import INDICATORS, compute_indicators, compute_uncached, missing_indicators, store_indicators
+
+# Frame columns the indicator functions read; 'timestamp' travels as its int64 milliseconds
+_FRAME_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+def is_enabled():
+    return _settings('ENABLE_INDICATOR_PROCESS_POOL', False)
+
+
+def _init_worker(backend):
+    set_backend(backend)
+
+
+def get_pool():
+    """The shared worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = _settings('INDICATOR_POOL_WORKERS', None) or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_init_worker, initargs=(active_backend(),))
+            print(f"[Indicator Pool] Started {workers} worker process(es)")
+        return _pool
+
+
+def shutdown_pool(broken=None):
+    """Stops the pool; with `broken`, only if it is still that pool (another caller may have replaced it)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (broken is None or _pool is broken):
+            _pool.shutdown(wait=broken is None, cancel_futures=True)
+            _pool = None
+
+
+def _columns_of(names):
+    return [(name, column) for name in names for column in INDICATORS[name][2]]
+
+
+def _compute_job(input_name, output_name, jobs):
+    """
+    Worker side. `jobs` is [(bars, names)] in block order; frame i occupies
+    len(_FRAME_COLUMNS) rows of `bars` values in the input block, and its
+    result columns follow those of frame i-1 in the output block (rows of
+    the longest frame's length). Returns the dtype of every result column.
+    """
+    input_block = SharedMemory(name=input_name)
+    output_block = SharedMemory(name=output_name)
+    try:
+        width = max(bars for bars, _ in jobs)
+        frames_in = np.ndarray((len(jobs) * len(_FRAME_COLUMNS), width), dtype=np.float64, buffer=input_block.buf)
+        output_rows = sum(len(_columns_of(names)) for _, names in jobs)
+        results_out = np.ndarray((output_rows, width), dtype=np.float64, buffer=output_block.buf)
+        dtypes = []
+        row = 0
+        for i, (bars, names) in enumerate(jobs):
+            # Copies: the frame must not keep views into a block that is closed below
+            block = frames_in[i * len(_FRAME_COLUMNS):(i + 1) * len(_FRAME_COLUMNS), :bars]
+            columns = {column: block[j].copy() for j, column in enumerate(_FRAME_COLUMNS)}
+            columns['timestamp'] = columns['timestamp'].view(np.int64).view('datetime64[ms]')
+            computed = compute_uncached(pd.DataFrame(columns, copy=False), names)
+            for name, column in _columns_of(names):
+                values = np.asarray(computed[name][column])
+                results_out[row, :bars] = values
+                dtypes.append(values.dtype.str)
+                row += 1
+        del frames_in, results_out, block
+        return dtypes
+    finally:
+        input_block.close()
+        output_block.close()
+
+
+def _run_in_pool(requests):
+    """
+    Blocking: computes what the cache misses for [(symbol, interval, df, names)]
+    in one worker job and stores it in the pipeline cache.
+    """
+    jobs = []
+    for symbol, interval, df, names in requests:
+        missing = missing_indicators(symbol, interval, df, names) if len(df) else []
+        if missing:
+            jobs.append((symbol, interval, df, missing))
+    if not jobs:
+        return
+
+    width = max(len(df) for _, _, df, _ in jobs)
+    output_rows = sum(len(_columns_of(missing)) for _, _, _, missing in jobs)
+    input_block = SharedMemory(create=True, size=len(jobs) * len(_FRAME_COLUMNS) * width * 8)
+    output_block = SharedMemory(create=True, size=max(output_rows, 1) * width * 8)
+    try:
+        frames_in = np.ndarray((len(jobs) * len(_FRAME_COLUMNS), width), dtype=np.float64, buffer=input_block.buf)
+        for i, (_, _, df, _) in enumerate(jobs):
+            for j, column in enumerate(_FRAME_COLUMNS):
+                values = df[column].to_numpy()
+                if column == 'timestamp':
+                    values = values.astype('datetime64[ms]').view(np.int64).view(np.float64)
+                frames_in[i * len(_FRAME_COLUMNS) + j, :len(df)] = values
+        del frames_in
+
+        pool = get_pool()
+        future = None
+        try:
+            future = pool.submit(_compute_job, input_block.name, output_block.name,
+                                 [(len(df), missing) for _, _, df, missing in jobs])
+            dtypes = future.result()
+        except BrokenProcessPool as e:
+            # compute_indicators() computes what is still missing in-process
+            print(f"[Indicator Pool] Worker pool broken ({e}); restarting it, computing in-process for now")
+            shutdown_pool(broken=pool)
+            return
+        except RuntimeError as e:
+            if future is not None:
+                raise  # raised by the job itself, not by the pool
+            # The pool was shut down between get_pool() and submit (exit, or another caller replacing it)
+            print(f"[Indicator Pool] Worker pool unavailable ({e}); computing in-process")
+            shutdown_pool(broken=pool)
+            return
+
+        results_out = np.ndarray((output_rows, width), dtype=np.float64, buffer=output_block.buf)
+        row = 0
+        for symbol, interval, df, missing in jobs:
+            computed = {}
+            for name, column in _columns_of(missing):
+                # astype copies out of the block and restores bool / int columns
+                computed.setdefault(name, {})[column] = results_out[row, :len(df)].astype(np.dtype(dtypes[row]))
+                row += 1
+            store_indicators(symbol, interval, df, computed)
+        del results_out
+    finally:
+        for block in (input_block, output_block):
+            block.close()
+            block.unlink()
+
+
+async def compute_indicators_pooled(symbol, requests):
+    """
+    compute_indicators() for several frames of one symbol, [(interval, df, names)],
+    with the computation in the worker pool. Returns the frames in request order.
+    Without ENABLE_INDICATOR_PROCESS_POOL the frames are computed in-process as before.
+    """
+    if is_enabled():
+        await asyncio.to_thread(_run_in_pool, [(symbol, interval, df, names) for interval, df, names in requests])
+    return [compute_indicators(symbol, interval, df, names) for interval, df, names in requests]
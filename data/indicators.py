@@ -1,7 +1,9 @@
 import numpy as np
 import pandas as pd
-from scipy.signal import find_peaks
+from scipy.signal import find_peaks, lfilter
 from config.settings import VERBOSE_LOGGING
+from data.bos_engine import evaluate_bos
+from data.indicator_backend import compiled_kernels
 
 PERIOD = 14
 K = 3
@@ -12,9 +14,18 @@ OVERBOUGHT = 80
 def calculate_wma(series, period):
     """
     Calculates the Weighted Moving Average.
+
+    Computed as one convolution over the whole series instead of a Python
+    callback per bar; the first period-1 values (and any window containing a
+    NaN) are NaN, as with rolling().
     """
-    weights = np.arange(1, period + 1)
-    return series.rolling(period).apply(lambda prices: np.dot(prices, weights) / weights.sum(), raw=True)
+    weights = np.arange(1, period + 1, dtype=np.float64)
+    values = series.to_numpy(dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        # np.convolve flips the kernel, so reverse the weights to weight the newest bar most
+        result[period - 1:] = np.convolve(values, weights[::-1], mode='valid') / weights.sum()
+    return pd.Series(result, index=series.index, name=series.name)
 
 def calculate_hull_moving_average(df, period=10):
     """
@@ -26,19 +37,41 @@ def calculate_hull_moving_average(df, period=10):
     )
     return df
 
+def swing_prominence(df):
+    """ATR-relative prominence for swing detection at the last row: adapts to each asset's volatility."""
+    atr_rel = (df['atr'].iloc[-1] / df['close'].iloc[-1]) if ('atr' in df.columns and df['close'].iloc[-1] != 0) else 0.005
+    return max(atr_rel, 0.002)  # Floor at 0.2% to avoid noise on flat markets
+
+def detect_swings(high, low, prominence, distance=5):
+    """Positions of swing highs and swing lows in the given high / low arrays (scipy find_peaks)."""
+    high_peaks, _ = find_peaks(high, distance=distance, prominence=prominence)
+    low_troughs, _ = find_peaks(-low, distance=distance, prominence=prominence)
+    return high_peaks, low_troughs
+
+def fib_retracements(swing_low_price, swing_high_price, trend='long'):
+    """Fibonacci retracement levels between a swing low and a swing high."""
+    diff = swing_high_price - swing_low_price
+    
+    fib_levels = {}
+    levels = [0.236, 0.382, 0.5, 0.618, 0.786]
+
+    for level in levels:
+        if trend == 'long':
+            fib_levels[str(level)] = swing_high_price - diff * level
+        else: # short
+            fib_levels[str(level)] = swing_low_price + diff * level
+            
+    return fib_levels
+
 def find_swing_points_and_fib(df, lookback=50, trend='long'):
     """
     Identifies swing points and calculates Fibonacci retracement levels.
     Uses ATR-relative prominence for accurate swing detection across all price levels.
+    Stateless; the live strategies use data/swing_tracker.py, which caches the
+    result of this detection per frame state.
     """
     subset = df.iloc[-lookback:]
-
-    # ATR-relative prominence: adapts to each asset's volatility
-    atr_rel = (df['atr'].iloc[-1] / df['close'].iloc[-1]) if ('atr' in df.columns and df['close'].iloc[-1] != 0) else 0.005
-    prominence = max(atr_rel, 0.002)  # Floor at 0.2% to avoid noise on flat markets
-
-    high_peaks, _ = find_peaks(subset['high'], distance=5, prominence=prominence)
-    low_troughs, _ = find_peaks(-subset['low'], distance=5, prominence=prominence)
+    high_peaks, low_troughs = detect_swings(subset['high'], subset['low'], swing_prominence(df))
 
     if len(low_troughs) == 0 or len(high_peaks) == 0:
         return None, None, None
@@ -54,21 +87,18 @@ def find_swing_points_and_fib(df, lookback=50, trend='long'):
 
     swing_low_price = df.loc[last_swing_low_idx, 'low']
     swing_high_price = df.loc[last_swing_high_idx, 'high']
-    
-    diff = swing_high_price - swing_low_price
-    
-    fib_levels = {}
-    levels = [0.236, 0.382, 0.5, 0.618, 0.786]
+    return swing_low_price, swing_high_price, fib_retracements(swing_low_price, swing_high_price, trend)
 
-    for level in levels:
-        if trend == 'long':
-            fib_levels[str(level)] = swing_high_price - diff * level
-        else: # short
-            fib_levels[str(level)] = swing_low_price + diff * level
-            
-    return swing_low_price, swing_high_price, fib_levels
+def _floats(*series):
+    """float64 numpy arrays of the given Series, as the compiled kernels take them."""
+    return [s.to_numpy(dtype=np.float64) for s in series]
 
 def calculate_stoch(high, low, close, PERIOD, K, D):
+    kernels = compiled_kernels()
+    if kernels is not None:
+        smoothed_k, stoch_d = kernels.stoch(*_floats(high, low, close), PERIOD, K, D)
+        return pd.Series(smoothed_k, index=close.index), pd.Series(stoch_d, index=close.index)
+
     lowest_low = low.rolling(PERIOD).min()
     highest_high = high.rolling(PERIOD).max()
     diff = highest_high - lowest_low
@@ -84,6 +114,11 @@ def calculate_stoch(high, low, close, PERIOD, K, D):
 
 def calculate_rsi(df, period=14):
     """Standard RSI with 14-period lookback (Wilder's original setting), fortified against division by zero."""
+    kernels = compiled_kernels()
+    if kernels is not None:
+        df['rsi'] = kernels.rsi(*_floats(df['close']), period)
+        return df
+
     delta = df['close'].diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
     loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
@@ -96,14 +131,67 @@ def calculate_rsi(df, period=14):
     df['rsi'] = rsi
     return df
 
+def atr_adx_kernel(high, low, close, atr_period=10, adx_period=14):
+    """
+    Fused true range / directional movement / ATR / ADX on numpy arrays (time
+    along the last axis, so a 2D array computes several symbols at once).
+
+    True range and +DM/-DM are computed once into preallocated buffers and the
+    EWMs run as linear filters. Pass atr_period or adx_period as None to skip
+    that output. Returns (atr, adx), matching the former pandas versions:
+    ATR is tr.ewm(alpha=1/atr_period, adjust=False); ADX smooths +DM, -DM and
+    DX with ewm(alpha=1/adx_period), where the adjust=True normalisation and
+    the smoothed true range cancel out of +DI/-DI and DX.
+    """
+    high, low, close = (np.asarray(values, dtype=np.float64) for values in (high, low, close))
+    shape = high.shape
+    kernels = compiled_kernels()
+    if kernels is not None:
+        rows = [np.ascontiguousarray(values.reshape(-1, shape[-1])) for values in (high, low, close)]
+        atr, adx = kernels.atr_adx(*rows, atr_period or 0, adx_period or 0)
+        return (atr.reshape(shape) if atr_period else None), (adx.reshape(shape) if adx_period else None)
+    if shape[-1] == 0:
+        return (np.empty(shape) if atr_period else None), (np.empty(shape) if adx_period else None)
+
+    # True range; the first bar has no previous close and fmax skips those NaN terms, as max(axis=1) did
+    tr = np.subtract(high, low)
+    scratch = np.empty(shape[:-1] + (shape[-1] - 1,))
+    for extreme in (high, low):
+        np.subtract(extreme[..., 1:], close[..., :-1], out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(tr[..., 1:], scratch, out=tr[..., 1:])
+
+    atr = None
+    if atr_period:
+        alpha = 1 / atr_period
+        atr = lfilter([alpha], [1, alpha - 1], tr, axis=-1, zi=(1 - alpha) * tr[..., :1])[0]
+
+    adx = None
+    if adx_period:
+        # +DM / -DM; directional movement is not clipped at zero
+        dm = np.zeros((2,) + shape)
+        up_move = np.subtract(high[..., 1:], high[..., :-1])
+        down_move = np.subtract(low[..., :-1], low[..., 1:], out=scratch)
+        np.copyto(dm[0][..., 1:], up_move, where=up_move > down_move)
+        np.copyto(dm[1][..., 1:], down_move, where=down_move > up_move)
+
+        decay = [1, 1 / adx_period - 1]
+        plus, minus = lfilter([1], decay, dm, axis=-1)
+        # DX = 100 * |+DI - -DI| / (+DI + -DI); 0 where both are 0 (the former fillna(0))
+        total = plus + minus
+        dx = np.abs(np.subtract(plus, minus, out=plus), out=plus)
+        np.multiply(dx, 100, out=dx)
+        np.divide(dx, total, out=dx, where=total != 0)
+
+        # ewm(adjust=True) of DX: the filtered sum divided by the sum of the weights so far
+        weights = (1 - (1 - 1 / adx_period) ** np.arange(1, shape[-1] + 1)) * adx_period
+        adx = lfilter([1], decay, dx, axis=-1)
+        np.divide(adx, weights, out=adx)
+    return atr, adx
+
 def calculate_atr(df, period=10):
-    high_low = df['high'] - df['low']
-    high_close = np.abs(df['high'] - df['close'].shift())
-    low_close = np.abs(df['low'] - df['close'].shift())
-    
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = tr.ewm(alpha=1/period, adjust=False).mean()
-    df['atr'] = atr
+    df['atr'] = atr_adx_kernel(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                               atr_period=period, adx_period=None)[0]
     return df
 
 def add_price_sma(df, period=50):
@@ -119,23 +207,15 @@ def add_short_term_sma(df, period=9):
     return df
 
 def calculate_adx(df, period=14):
-    """Standard ADX with 14-period lookback (Wilder's original setting)."""
-    df['H-L'] = df['high'] - df['low']
-    df['H-PC'] = abs(df['high'] - df['close'].shift(1))
-    df['L-PC'] = abs(df['low'] - df['close'].shift(1))
-    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
-    
-    df['+DM'] = np.where((df['high'] - df['high'].shift(1)) > (df['low'].shift(1) - df['low']), df['high'] - df['high'].shift(1), 0)
-    df['-DM'] = np.where((df['low'].shift(1) - df['low']) > (df['high'] - df['high'].shift(1)), df['low'].shift(1) - df['low'], 0)
-    
-    df['+DI'] = 100 * (df['+DM'].ewm(alpha=1/period).mean() / df['TR'].ewm(alpha=1/period).mean())
-    df['-DI'] = 100 * (df['-DM'].ewm(alpha=1/period).mean() / df['TR'].ewm(alpha=1/period).mean())
-    
-    di_sum = df['+DI'] + df['-DI']
-    df['DX'] = 100 * abs(df['+DI'] - df['-DI']) / di_sum.replace(0, np.nan)
-    df['DX'] = df['DX'].fillna(0)
-    df['ADX'] = df['DX'].ewm(alpha=1/period).mean()
-    
+    """Standard ADX with 14-period lookback (Wilder's original setting). Adds only the 'ADX' column."""
+    df['ADX'] = atr_adx_kernel(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                               atr_period=None, adx_period=period)[1]
+    return df
+
+def calculate_adx_atr(df, adx_period=14, atr_period=10):
+    """calculate_adx and calculate_atr in one pass over the shared true range."""
+    df['atr'], df['ADX'] = atr_adx_kernel(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                                          atr_period=atr_period, adx_period=adx_period)
     return df
 
 def calculate_bollinger_bands(df, period=14, std_dev=2):
@@ -150,6 +230,12 @@ def add_candlestick_patterns(df):
     Native candlestick pattern detection — no pandas_ta dependency required.
     Detects: Hammer, Bullish Engulfing (bullish), Shooting Star, Bearish Engulfing (bearish).
     """
+    kernels = compiled_kernels()
+    if kernels is not None:
+        df['bullish_pattern'], df['bearish_pattern'] = kernels.candlestick_patterns(
+            *_floats(df['open'], df['high'], df['low'], df['close']))
+        return df
+
     o = df['open']
     h = df['high']
     l = df['low']
@@ -325,50 +411,48 @@ def calculate_volume_profile(df, bins=50):
     return poc
 
 
-def calculate_volume_profile_full(df, bins=50):
-    """
-    Institutional-grade VPVR: returns Point of Control (POC), Value Area High (VAH),
-    and Value Area Low (VAL) representing the 70% volume concentration zone.
-    
-    Methodology: Wilder Value Area algorithm — expand symmetrically from POC until
-    70% of total session volume is captured.
-    """
-    min_price = df['low'].min()
-    max_price = df['high'].max()
+def _volume_profile(high, low, close, volume, bins):
+    """POC / VAH / VAL of numpy OHLCV arrays; see calculate_volume_profile_full()."""
+    min_price = low.min()
+    max_price = high.max()
 
     if min_price == max_price:
         return min_price, min_price, min_price
 
     price_bins = np.linspace(min_price, max_price, bins)
-    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    typical_price = (high + low + close) / 3
     bin_indices = np.digitize(typical_price, price_bins)
-    df_vp = pd.DataFrame({'bin': bin_indices, 'volume': df['volume']})
-    volume_by_bin = df_vp.groupby('bin')['volume'].sum()
+    # A bin is part of the profile if any bar falls into it, even with zero volume
+    present = np.bincount(bin_indices, minlength=bins + 1) > 0
 
-    if volume_by_bin.empty:
-        p = typical_price.iloc[-1]
+    if not present.any():
+        p = typical_price[-1]
         return p, p, p
 
-    poc_bin = int(volume_by_bin.idxmax())
+    volume_by_bin = np.bincount(bin_indices, weights=np.where(np.isnan(volume), 0.0, volume), minlength=bins + 1)
+    poc_bin = int(np.where(present, volume_by_bin, -np.inf).argmax())
     total_volume = volume_by_bin.sum()
     target_va_volume = total_volume * 0.70  # Value Area = 70% of total volume
 
-    # Expand from POC outward (Wilder algorithm)
-    cumulative = volume_by_bin.get(poc_bin, 0)
+    # Expand from POC outward (Wilder algorithm) over plain lists; bins outside the profile hold no volume
+    volumes = volume_by_bin.tolist()
+    in_profile = present.tolist()
+    last_bin = len(volumes) - 1
+    cumulative = volumes[poc_bin]
     upper_bin = poc_bin
     lower_bin = poc_bin
 
     while cumulative < target_va_volume:
         up_next = upper_bin + 1
         down_next = lower_bin - 1
-        up_vol = volume_by_bin.get(up_next, 0)
-        down_vol = volume_by_bin.get(down_next, 0)
+        up_vol = volumes[up_next] if up_next <= last_bin else 0
+        down_vol = volumes[down_next] if down_next >= 0 else 0
 
         # Add the side with more volume first (Wilder rule)
-        if up_vol >= down_vol and up_next in volume_by_bin.index:
+        if up_vol >= down_vol and up_next <= last_bin and in_profile[up_next]:
             upper_bin = up_next
             cumulative += up_vol
-        elif down_next in volume_by_bin.index:
+        elif down_next >= 0 and in_profile[down_next]:
             lower_bin = down_next
             cumulative += down_vol
         else:
@@ -385,12 +469,40 @@ def calculate_volume_profile_full(df, bins=50):
 
     return poc, vah, val
 
+def calculate_volume_profile_full(df, bins=50):
+    """
+    Institutional-grade VPVR: returns Point of Control (POC), Value Area High (VAH),
+    and Value Area Low (VAL) representing the 70% volume concentration zone.
+    
+    Methodology: Wilder Value Area algorithm — expand symmetrically from POC until
+    70% of total session volume is captured. Volume per price bin is summed with
+    np.bincount.
+    """
+    return calculate_volume_profiles(df, [None], bins=bins)[None]
+
+def calculate_volume_profiles(df, lookbacks, bins=50):
+    """
+    Volume profiles of several windows of `df` in one call: returns
+    {lookback: (poc, vah, val)} for the last `lookback` bars of each entry
+    (None for the whole frame). The OHLCV arrays are extracted once.
+    """
+    columns = [df[column].to_numpy(dtype=np.float64) for column in ('high', 'low', 'close', 'volume')]
+    return {
+        lookback: _volume_profile(*(values if lookback is None else values[-lookback:] for values in columns), bins)
+        for lookback in lookbacks
+    }
+
 def calculate_vwap(df, period=288):
     """
     Calculates a rolling Volume Weighted Average Price (VWAP).
     For a 5-minute chart, 288 periods = 24 hours.
     This acts as a continuous institutional anchor price.
     """
+    kernels = compiled_kernels()
+    if kernels is not None:
+        df['vwap'] = kernels.vwap(*_floats(df['high'], df['low'], df['close'], df['volume']), period)
+        return df
+
     typical_price = (df['high'] + df['low'] + df['close']) / 3
     
     # Rolling Cumulative Volume * Typical Price
@@ -411,7 +523,7 @@ def calculate_volume_anomaly(df, period=20, multiplier=1.5):
     df['volume_anomaly'] = df['volume'] > (df['vol_sma'] * multiplier)
     return df
 
-def calculate_bos(df, period=192, retest_window=12, retest_proximity=0.003, retest_wick_threshold=0.30):
+def calculate_bos(df, period=192, retest_window=12, retest_proximity=0.003, retest_wick_threshold=0.30, tail=None):
     """
     Break of Structure (BOS) with Retest Detection — Institutional Grade.
     
@@ -432,67 +544,20 @@ def calculate_bos(df, period=192, retest_window=12, retest_proximity=0.003, rete
       bos_level_long / short       — The price level that was broken (for retest tracking)
       recent_bos_long / short      — True if a BOS fired within the last `retest_window` candles
       bos_retest_long / short      — True when a valid retest entry signal occurs
+
+    Computed by data/bos_engine.py. With `tail` set only the last `tail` rows
+    are evaluated (earlier rows are NaN / False); without it every row is (the
+    batch mode for historical data).
     """
-    # Get highest high and lowest low of the PREVIOUS N periods
-    df['recent_high'] = df['high'].shift(1).rolling(window=period).max()
-    df['recent_low'] = df['low'].shift(1).rolling(window=period).min()
-    
-    # Bullish BOS: Close breaks above the recent high
-    df['bullish_bos'] = df['close'] > df['recent_high']
-    
-    # Bearish BOS: Close breaks below the recent low
-    df['bearish_bos'] = df['close'] < df['recent_low']
-    
-    # --- Retest Detection ---
-    # Track the broken level for retest comparison
-    df['bos_level_long'] = df['recent_high'].where(df['bullish_bos'])
-    df['bos_level_short'] = df['recent_low'].where(df['bearish_bos'])
-    
-    # Forward-fill the broken level for the retest window so we can check
-    # if subsequent candles retrace back to it
-    df['bos_level_long'] = df['bos_level_long'].ffill(limit=retest_window)
-    df['bos_level_short'] = df['bos_level_short'].ffill(limit=retest_window)
-    
-    # Check if a BOS occurred within the last `retest_window` candles
-    df['recent_bos_long'] = df['bullish_bos'].rolling(window=retest_window, min_periods=1).max().fillna(0).astype(bool)
-    df['recent_bos_short'] = df['bearish_bos'].rolling(window=retest_window, min_periods=1).max().fillna(0).astype(bool)
-    
-    # --- Retest Long: Price pulls back DOWN toward the broken resistance (now support) ---
-    # Conditions: (1) BOS fired recently, (2) current candle NOT the breakout candle itself,
-    # (3) price is near the broken level, (4) candle shows lower-wick rejection (bouncing off level)
-    bos_lvl_long = df['bos_level_long']
-    near_level_long = (
-        bos_lvl_long.notna() &
-        df['recent_bos_long'] &
-        ~df['bullish_bos'] &  # Not on the breakout candle itself
-        (((df['low'] - bos_lvl_long).abs() / bos_lvl_long) < retest_proximity)
-    )
-    
-    # Wick rejection for long retest: lower wick must be >= threshold of total candle length
-    total_len_long = df['high'] - df['low']
-    lower_wick_long = df[['open', 'close']].min(axis=1) - df['low']
-    wick_ok_long = (total_len_long > 0) & ((lower_wick_long / total_len_long) >= retest_wick_threshold)
-    # Price must also have closed ABOVE the broken level (acceptance)
-    close_above_level_long = df['close'] > bos_lvl_long
-    
-    df['bos_retest_long'] = (near_level_long & wick_ok_long & close_above_level_long).fillna(False)
-    
-    # --- Retest Short: Price pulls back UP toward the broken support (now resistance) ---
-    bos_lvl_short = df['bos_level_short']
-    near_level_short = (
-        bos_lvl_short.notna() &
-        df['recent_bos_short'] &
-        ~df['bearish_bos'] &  # Not on the breakdown candle itself
-        (((df['high'] - bos_lvl_short).abs() / bos_lvl_short) < retest_proximity)
-    )
-    
-    # Wick rejection for short retest: upper wick must be >= threshold of total candle length
-    total_len_short = df['high'] - df['low']
-    upper_wick_short = df['high'] - df[['open', 'close']].max(axis=1)
-    wick_ok_short = (total_len_short > 0) & ((upper_wick_short / total_len_short) >= retest_wick_threshold)
-    # Price must also have closed BELOW the broken level (acceptance)
-    close_below_level_short = df['close'] < bos_lvl_short
-    
-    df['bos_retest_short'] = (near_level_short & wick_ok_short & close_below_level_short).fillna(False)
-    
-    return df
\ No newline at end of file
+    start = 0 if tail is None else max(0, len(df) - tail)
+    columns = evaluate_bos(df['open'].to_numpy(dtype=np.float64), df['high'].to_numpy(dtype=np.float64),
+                           df['low'].to_numpy(dtype=np.float64), df['close'].to_numpy(dtype=np.float64),
+                           period, retest_window, retest_proximity, retest_wick_threshold, start=start)
+    for column, values in columns.items():
+        if start:
+            padded = np.zeros(len(df), dtype=bool) if values.dtype == bool else np.full(len(df), np.nan)
+            padded[start:] = values
+            columns[column] = padded
+    # One concat instead of ten column assignments (returns a new frame, as callers reassign df anyway)
+    existing = [column for column in columns if column in df.columns]
+    return pd.concat([df.drop(columns=existing) if existing else df, pd.DataFrame(columns, index=df.index, copy=False)], axis=1)
@@ -0,0 +1,217 @@
+"""
+Kline Buffers — in-memory per-(symbol, interval) bar storage.
+
+Rows are kept in the exact list format returned by the Binance REST klines
+endpoint so that any buffered data can be turned into the same DataFrame
+that fetch_klines() produces:
+
+    [open_time, open, high, low, close, volume, close_time,
+     quote_volume, trades, taker_base, taker_quote, ignore]
+
+One buffer exists per (symbol, interval) for the whole process. Both the REST
+path (fetch_klines) and the WebSocket stream write into the same buffer.
+decode_klines() turns rows into the typed DataFrame the indicators consume.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+_INTERVAL_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+def interval_to_ms(interval):
+    """
+    Converts a Binance interval string ('15m', '1h', '4h', '1d') to milliseconds.
+    Monthly bars have no fixed length and are rejected.
+    """
+    unit = interval[-1]
+    if unit not in _INTERVAL_UNIT_MS:
+        raise ValueError(f"Unsupported kline interval: {interval}")
+    return int(interval[:-1]) * _INTERVAL_UNIT_MS[unit]
+
+
+def stream_kline_to_row(k):
+    """Converts the 'k' payload of a kline stream event into a REST-format kline row."""
+    return [
+        int(k['t']), k['o'], k['h'], k['l'], k['c'], k['v'],
+        int(k['T']), k['q'], int(k['n']), k['V'], k['Q'], k.get('B', '0')
+    ]
+
+
+# Numeric columns kept after decoding, in row order; taker volumes and 'ignore' are dropped
+_FLOAT_COLUMNS = (('open', 1), ('high', 2), ('low', 3), ('close', 4), ('volume', 5), ('quote_volume', 7))
+_INT_COLUMNS = (('close_time', 6), ('trades', 8))
+
+
+def decode_klines(rows):
+    """
+    Decodes REST-format kline rows into a DataFrame of float64/int64 columns.
+    Each column is parsed straight from the exchange strings into one row of a
+    preallocated block, and the DataFrame is built on views of that block
+    without further copies.
+    """
+    n = len(rows)
+    floats = np.empty((len(_FLOAT_COLUMNS), n), dtype=np.float64)
+    for j, (_, idx) in enumerate(_FLOAT_COLUMNS):
+        floats[j] = [row[idx] for row in rows]
+    ints = np.empty((len(_INT_COLUMNS) + 1, n), dtype=np.int64)
+    ints[0] = [row[0] for row in rows]
+    for j, (_, idx) in enumerate(_INT_COLUMNS, start=1):
+        ints[j] = [row[idx] for row in rows]
+
+    columns = {'timestamp': ints[0].view('datetime64[ms]')}
+    for j, (name, _) in enumerate(_FLOAT_COLUMNS):
+        columns[name] = floats[j]
+    for j, (name, _) in enumerate(_INT_COLUMNS, start=1):
+        columns[name] = ints[j]
+    return pd.DataFrame(columns, copy=False)
+
+
+class KlineBuffer:
+    """
+    Ring buffer of kline rows ordered by open time.
+    The newest row may be the still-forming candle; upserting a row with the same
+    open time patches it in place, and appending beyond maxlen evicts from the head.
+    """
+
+    def __init__(self, maxlen):
+        self._rows = deque(maxlen=int(maxlen))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def maxlen(self):
+        return self._rows.maxlen
+
+    @property
+    def last_open_time(self):
+        with self._lock:
+            return int(self._rows[-1][0]) if self._rows else None
+
+    @property
+    def last_close_time(self):
+        with self._lock:
+            return int(self._rows[-1][6]) if self._rows else None
+
+    def resize(self, maxlen):
+        """Grows (never shrinks) the buffer capacity, keeping existing rows."""
+        with self._lock:
+            if maxlen > self._rows.maxlen:
+                self._rows = deque(self._rows, maxlen=int(maxlen))
+
+    def upsert(self, row):
+        """Appends a newer bar or patches the forming bar with the same open time."""
+        with self._lock:
+            self._upsert(row)
+
+    def merge(self, rows):
+        """
+        Merges a batch of rows (e.g. a REST backfill) into the buffer.
+        Rows newer than the current tail take the cheap append path; anything
+        overlapping older history falls back to a keyed rebuild.
+        """
+        if not rows:
+            return
+        with self._lock:
+            if not self._rows or int(rows[0][0]) >= int(self._rows[-1][0]):
+                for row in rows:
+                    self._upsert(row)
+                return
+            merged = {int(r[0]): r for r in self._rows}
+            for row in rows:
+                existing = merged.get(int(row[0]))
+                # A forming bar only ever gains trades, so the higher count is the fresher copy
+                if existing is None or int(row[8]) >= int(existing[8]):
+                    merged[int(row[0])] = row
+            self._rows = deque((merged[t] for t in sorted(merged)), maxlen=self._rows.maxlen)
+
+    def reseed(self, rows):
+        """
+        Reseeds the buffer from a full REST fetch. Buffered rows older than the
+        fetch are dropped (a gap may separate them from it); rows newer than its
+        last bar, e.g. stream ticks that arrived during the request, are kept.
+        """
+        if not rows:
+            return
+        with self._lock:
+            seeded = {int(r[0]): r for r in rows}
+            last_open = int(rows[-1][0])
+            for row in self._rows:
+                open_time = int(row[0])
+                existing = seeded.get(open_time)
+                if open_time > last_open:
+                    seeded[open_time] = row
+                # A forming bar only ever gains trades, so the higher count is the fresher copy
+                elif existing is not None and int(row[8]) > int(existing[8]):
+                    seeded[open_time] = row
+            self._rows = deque((seeded[t] for t in sorted(seeded)), maxlen=max(self._rows.maxlen, len(rows)))
+
+    def tail(self, limit):
+        """Returns a copy of the newest `limit` rows, oldest first."""
+        with self._lock:
+            if limit >= len(self._rows):
+                return list(self._rows)
+            return list(self._rows)[-limit:]
+
+    def resume_open_time(self, interval_ms):
+        """
+        Open time of the last bar before the first gap in the buffer (or of the
+        newest bar when contiguous). A backfill starting here closes every hole.
+        """
+        with self._lock:
+            if not self._rows:
+                return None
+            prev = int(self._rows[0][0])
+            for row in self._rows:
+                open_time = int(row[0])
+                if open_time - prev > interval_ms:
+                    return prev
+                prev = open_time
+            return prev
+
+    def _upsert(self, row):
+        open_time = int(row[0])
+        if not self._rows or open_time > int(self._rows[-1][0]):
+            self._rows.append(row)
+        elif open_time == int(self._rows[-1][0]):
+            self._rows[-1] = row
+        else:
+            # Late update for an older bar (rare: replayed or out-of-order events)
+            for i in range(len(self._rows) - 1, -1, -1):
+                existing = int(self._rows[i][0])
+                if existing == open_time:
+                    self._rows[i] = row
+                    return
+                if existing < open_time:
+                    return
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_kline_buffer(symbol, interval, maxlen):
+    """Returns the shared buffer for (symbol, interval), creating or growing it to maxlen."""
+    key = (symbol, interval)
+    with _buffers_lock:
+        buffer = _buffers.get(key)
+        if buffer is None:
+            buffer = _buffers[key] = KlineBuffer(maxlen)
+            return buffer
+    buffer.resize(maxlen)
+    return buffer
+
+
+def peek_kline_buffer(symbol, interval):
+    """Returns the shared buffer for (symbol, interval) without creating it."""
+    return _buffers.get((symbol, interval))
@@ -0,0 +1,180 @@
+"""
+Kline Stream — optional WebSocket market-data mode.
+
+PURPOSE:
+    Replaces the per-cycle REST kline polling in data.get_data with
+    Binance combined kline streams. Each subscribed (symbol, interval) keeps a
+    KlineBuffer that is patched live as the forming candle ticks and rolls over
+    when it closes.
+
+HOW IT WORKS:
+    1. A background thread runs an asyncio loop with one WebSocket connection per
+       chunk of up to 200 streams (the Binance per-connection limit).
+    2. Every kline event is converted into a REST-format row and upserted.
+    3. Buffers are the shared ones behind fetch_klines. The data layer seeds
+       them over REST the first time a symbol is read and, after a reconnect,
+       lets fetch_klines backfill from the last contiguous bar, so REST is
+       only used to fill gaps.
+
+TESTING:
+    Point KLINE_STREAM_URL at scripts/replay_kline_server.py to replay recorded
+    klines locally instead of connecting to Binance.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from data.kline_buffer import get_kline_buffer, peek_kline_buffer, interval_to_ms, stream_kline_to_row
+
+DEFAULT_STREAM_URL = 'wss://fstream.binance.com'
+MAX_STREAMS_PER_CONNECTION = 200
+RECONNECT_DELAY_SECONDS = 1
+MAX_RECONNECT_DELAY_SECONDS = 30
+
+
+class KlineStream:
+    def __init__(self, symbols, intervals, base_url=DEFAULT_STREAM_URL):
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.base_url = base_url.rstrip('/')
+        self.keys = {(symbol, interval) for symbol in self.symbols for interval in self.intervals}
+        # Buffers exist up front so no event is lost before the first REST seed;
+        # the seed grows them to the lookback the data layer asks for.
+        for symbol, interval in self.keys:
+            get_kline_buffer(symbol, interval, 2)
+        self._needs_backfill = set()
+        self._connected_keys = set()
+        self._state_lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._running = False
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, name='kline-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(lambda: [t.cancel() for t in asyncio.all_tasks(self._loop)])
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def is_subscribed(self, symbol, interval):
+        return (symbol, interval) in self.keys
+
+    # --- Buffer access (called from the data layer worker threads) ---
+
+    def get_klines(self, symbol, interval, limit):
+        """
+        Returns the newest `limit` buffered rows, or None if the buffer cannot be
+        trusted yet (not seeded, too short, disconnected, or awaiting a backfill).
+        """
+        key = (symbol, interval)
+        with self._state_lock:
+            if key in self._needs_backfill or key not in self._connected_keys:
+                return None
+        buffer = peek_kline_buffer(symbol, interval)
+        if buffer is None or len(buffer) < limit:
+            return None
+        # A buffer that has not seen a single event for a full bar is stale
+        last_close_time = buffer.last_close_time
+        if last_close_time is None or time.time() * 1000 - last_close_time > interval_to_ms(interval):
+            return None
+        return buffer.tail(limit)
+
+    def mark_backfilled(self, symbol, interval):
+        """Called after a REST seed/backfill; the buffer is trusted again if the stream is live."""
+        key = (symbol, interval)
+        with self._state_lock:
+            if key in self._connected_keys:
+                self._needs_backfill.discard(key)
+
+    # --- Stream internals ---
+
+    def _stream_names(self):
+        return [f"{symbol.lower()}@kline_{interval}" for symbol in self.symbols for interval in self.intervals]
+
+    def _keys_for(self, stream_names):
+        keys = []
+        for name in stream_names:
+            pair, interval = name.split('@kline_')
+            keys.append((pair.upper(), interval))
+        return keys
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        names = self._stream_names()
+        chunks = [names[i:i + MAX_STREAMS_PER_CONNECTION] for i in range(0, len(names), MAX_STREAMS_PER_CONNECTION)]
+        await asyncio.gather(*(self._consume(chunk) for chunk in chunks))
+
+    async def _consume(self, stream_names):
+        import websockets
+
+        url = f"{self.base_url}/stream?streams={'/'.join(stream_names)}"
+        keys = self._keys_for(stream_names)
+        delay = RECONNECT_DELAY_SECONDS
+        while self._running:
+            try:
+                async with websockets.connect(url, ping_interval=20, max_size=None) as ws:
+                    with self._state_lock:
+                        # Anything missed while disconnected must be backfilled over REST
+                        self._needs_backfill.update(keys)
+                        self._connected_keys.update(keys)
+                    delay = RECONNECT_DELAY_SECONDS
+                    async for raw in ws:
+                        self._on_message(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Kline Stream] Connection error ({len(stream_names)} streams): {e}. Reconnecting in {delay}s...")
+            with self._state_lock:
+                self._connected_keys.difference_update(keys)
+            if self._running:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    def _on_message(self, raw):
+        try:
+            message = json.loads(raw)
+            payload = message.get('data', message)
+            if payload.get('e') != 'kline':
+                return
+            k = payload['k']
+            buffer = peek_kline_buffer(k['s'], k['i'])
+            if buffer is not None:
+                buffer.upsert(stream_kline_to_row(k))
+        except Exception as e:
+            print(f"[Kline Stream] Could not parse message: {e}")
+
+
+_active_stream = None
+
+
+def start_kline_stream(symbols, intervals, base_url=DEFAULT_STREAM_URL):
+    """Starts the process-wide kline stream (idempotent) and returns it."""
+    global _active_stream
+    if _active_stream is None:
+        _active_stream = KlineStream(symbols, intervals, base_url=base_url)
+        _active_stream.start()
+    return _active_stream
+
+
+def get_active_stream():
+    return _active_stream
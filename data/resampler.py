@@ -0,0 +1,87 @@
+"""
+Multi-Timeframe Aggregator — builds higher-timeframe klines from base bars.
+
+Binance futures klines up to 1d open on UTC boundaries that are exact multiples
+of the interval since the epoch, so a 1h or 4h bar is fully determined by the
+15m bars inside it:
+
+    open  = first open          high   = max high        low = min low
+    close = last close          volume / quote / taker volumes = sums
+    trades = sum                close_time = bucket start + interval - 1
+
+Prices are picked (never recomputed) and volumes are summed as Decimals from
+the exchange strings, so resampled bars match exchange bars exactly.
+Weekly and monthly bars do not open on epoch multiples and are not supported.
+"""
+
+from decimal import Decimal
+
+from data.kline_buffer import interval_to_ms
+
+_DAY_MS = 24 * 60 * 60 * 1000
+
+
+def can_resample(base_interval, target_interval):
+    """True if target bars can be rebuilt exactly from base bars."""
+    try:
+        base_ms = interval_to_ms(base_interval)
+        target_ms = interval_to_ms(target_interval)
+    except ValueError:
+        return False
+    if target_interval.endswith('w'):
+        return False
+    return target_ms > base_ms and target_ms % base_ms == 0 and _DAY_MS % target_ms == 0
+
+
+def resample_klines(rows, base_interval, target_interval):
+    """
+    Aggregates REST-format base rows (oldest first) into target-interval rows.
+    Buckets that are not fully covered by contiguous base bars are dropped, except
+    the newest one, which is returned as the forming bar as long as it is
+    contiguous from its bucket start.
+    """
+    base_ms = interval_to_ms(base_interval)
+    target_ms = interval_to_ms(target_interval)
+    bars_per_bucket = target_ms // base_ms
+
+    buckets = []
+    current = None
+    for row in rows:
+        open_time = int(row[0])
+        bucket_start = open_time - open_time % target_ms
+        if current is None or current['start'] != bucket_start:
+            current = {'start': bucket_start, 'rows': [row], 'valid': open_time == bucket_start}
+            buckets.append(current)
+        else:
+            if open_time - int(current['rows'][-1][0]) != base_ms:
+                current['valid'] = False
+            current['rows'].append(row)
+
+    result = []
+    for i, bucket in enumerate(buckets):
+        is_last = i == len(buckets) - 1
+        if not bucket['valid'] or (not is_last and len(bucket['rows']) != bars_per_bucket):
+            continue
+        result.append(_aggregate(bucket['start'], bucket['rows'], target_ms))
+    return result
+
+
+def _aggregate(bucket_start, rows, target_ms):
+    return [
+        bucket_start,
+        rows[0][1],
+        max((r[2] for r in rows), key=float),
+        min((r[3] for r in rows), key=float),
+        rows[-1][4],
+        _decimal_sum(r[5] for r in rows),
+        bucket_start + target_ms - 1,
+        _decimal_sum(r[7] for r in rows),
+        sum(int(r[8]) for r in rows),
+        _decimal_sum(r[9] for r in rows),
+        _decimal_sum(r[10] for r in rows),
+        '0',
+    ]
+
+
+def _decimal_sum(values):
+    return str(sum((Decimal(str(v)) for v in values), Decimal(0)))
@@ -0,0 +1,560 @@
+"""
+Streaming Indicators — O(1) per-bar indicator updates for the execution timeframe.
+
+PURPOSE:
+    process_symbol recomputed ATR, RSI, SMA 50, HMA, ADX, VWAP, volume anomaly,
+    BOS, stochastic, MACD and Bollinger Bands over the whole 350-bar window every
+    cycle, although at most one bar closed and only the forming bar changed
+    since the previous cycle.
+
+HOW IT WORKS:
+    1. One engine per (symbol, interval) keeps the running state of every
+       indicator: rolling sums, monotonic min/max deques, EWM weights and the
+       last BOS breakout on each side.
+    2. sync(df) commits every bar that closed since the last call (all rows but
+       the last) and previews the forming bar from the committed state without
+       changing it, so a tick of the forming bar is a single O(1) step.
+    3. Committed values are kept in a history array, so apply() writes full
+       columns into the frame under the names the batch functions in
+       data/indicators.py use (the stochastic as stoch_k / stoch_d, as in
+       data/indicator_pipeline.py); strategies read them unchanged.
+    4. A frame that does not continue the committed bars (first call, a gap,
+       a replaced buffer) reseeds the engine from that frame.
+
+    Enabled with ENABLE_STREAMING_INDICATORS = True; process_symbol then takes
+    PIPELINE_INDICATORS from the engine and only the remaining ones from the
+    indicator pipeline.
+
+PARITY:
+    With STREAMING_INDICATORS_PARITY_CHECK = True every apply also runs the
+    batch functions on a copy of the frame and compares the last two rows. A
+    mismatch is logged, the batch values are used and the engine reseeds.
+    Rolling-window values match the batch functions to rounding error. The EWM
+    based ones (ATR, ADX, MACD) differ by (1 - alpha) ** window, because the
+    batch functions restart their averages at the start of the window; for the
+    350-bar execution frame that is below 1e-11.
+"""
+
+import math
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import config.settings
+from data.indicators import (
+    PERIOD, K, D, calculate_atr, calculate_rsi, add_price_sma, calculate_hull_moving_average, calculate_adx,
+    calculate_vwap, calculate_volume_anomaly, calculate_bos, calculate_stoch, calculate_macd, calculate_bollinger_bands,
+)
+
+NAN = float('nan')
+
+# Parameters of the execution-timeframe indicators read by the strategies
+ATR_PERIOD = 10
+RSI_PERIOD = 14
+SMA_PERIOD = 50
+HMA_PERIOD = 14
+ADX_PERIOD = 14
+VWAP_PERIOD = 288
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_PERIOD, BB_STD_DEV = 14, 2
+
+COLUMNS = (
+    'atr', 'rsi', f'price_sma_{SMA_PERIOD}', f'hma_{HMA_PERIOD}', 'ADX', 'vwap', 'vol_sma', 'volume_anomaly',
+    'recent_high', 'recent_low', 'bullish_bos', 'bearish_bos', 'bos_level_long', 'bos_level_short',
+    'recent_bos_long', 'recent_bos_short', 'bos_retest_long', 'bos_retest_short',
+    'macd', 'macd_signal', 'macd_hist', 'BB_Mid', 'BB_Std', 'BB_Upper', 'BB_Lower', 'stoch_k', 'stoch_d',
+)
+BOOL_COLUMNS = frozenset({'volume_anomaly', 'bullish_bos', 'bearish_bos', 'recent_bos_long', 'recent_bos_short',
+                          'bos_retest_long', 'bos_retest_short'})
+
+# data.indicator_pipeline indicators whose columns apply() writes
+PIPELINE_INDICATORS = frozenset({'atr', 'rsi', 'price_sma_50', 'hma_14', 'adx', 'vwap', 'vol_sma', 'volume_anomaly',
+                                 'bos', 'stoch', 'macd', 'bollinger'})
+
+DEFAULT_HISTORY = 1000
+PARITY_ROWS = 2
+PARITY_RTOL = 1e-6
+PARITY_ATOL = 1e-9
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+def _div(a, b):
+    """a / b with numpy semantics for a zero divisor (nan or +/-inf instead of ZeroDivisionError)."""
+    if b == 0:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a)
+    return a / b
+
+
+# --- Incremental primitives ---
+# Each update(x, commit) returns the value for the window ending at x. With
+# commit=False the state is left untouched, which previews the forming bar.
+
+class _RollingSum:
+    """Sum of the last `period` values; NaN until the window is full or while it holds a NaN."""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.nans = 0
+        self.nonzero = 0
+        self.pushes = 0
+
+    def update(self, x, commit):
+        full = len(self.window) == self.period
+        drop = self.window[0] if full else 0.0
+        x_nan, drop_nan = x != x, drop != drop
+        nans = self.nans + x_nan - drop_nan
+        nonzero = self.nonzero + (not x_nan and x != 0) - (not drop_nan and drop != 0)
+        total = self.total + (0.0 if x_nan else x) - (0.0 if drop_nan else drop)
+        count = len(self.window) + (not full)
+        if commit:
+            if full:
+                self.window.popleft()
+            self.window.append(x)
+            self.nans, self.nonzero = nans, nonzero
+            self.pushes += 1
+            if self.pushes % self.period == 0:
+                # Re-add the window every `period` pushes so rounding error cannot accumulate
+                total = math.fsum(v for v in self.window if v == v)
+            self.total = total
+        if count < self.period or nans:
+            return NAN
+        # An all-zero window is exactly zero, as in pandas (RSI's loss average relies on it)
+        return total if nonzero else 0.0
+
+
+class _RollingStd:
+    """Sample standard deviation (ddof=1) of the last `period` values, from sums shifted by a reference value."""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.ref = None
+        self.shifted_sum = 0.0
+        self.shifted_sq = 0.0
+        self.pushes = 0
+
+    def update(self, x, commit):
+        ref = x if self.ref is None else self.ref
+        full = len(self.window) == self.period
+        dx = x - ref
+        s, q = self.shifted_sum + dx, self.shifted_sq + dx * dx
+        if full:
+            dd = self.window[0] - ref
+            s, q = s - dd, q - dd * dd
+        count = len(self.window) + (not full)
+        if commit:
+            if full:
+                self.window.popleft()
+            self.window.append(x)
+            self.pushes += 1
+            if self.ref is None or self.pushes % self.period == 0:
+                # Re-centre on the newest value so the sums stay small relative to the price
+                self.ref = ref = x
+                s = math.fsum(v - ref for v in self.window)
+                q = math.fsum((v - ref) ** 2 for v in self.window)
+            self.shifted_sum, self.shifted_sq = s, q
+        if count < self.period:
+            return NAN
+        return math.sqrt(max((q - s * s / count) / (count - 1), 0.0))
+
+
+class _RollingExtreme:
+    """Max (sign=1) or min (sign=-1) of the last `period` values via a monotonic deque."""
+
+    def __init__(self, period, sign):
+        self.period = period
+        self.sign = sign
+        self.candidates = deque()  # (index, sign * value), values strictly decreasing
+        self.count = 0
+
+    def current(self):
+        """Extreme of the last `period` committed values, excluding any forming one."""
+        if self.count < self.period:
+            return NAN
+        return self.sign * self.candidates[0][1]
+
+    def update(self, x, commit):
+        v = self.sign * x
+        oldest = self.count - self.period  # index that leaves the window when x enters
+        candidates = self.candidates
+        if candidates and candidates[0][0] == oldest:
+            rest = candidates[1][1] if len(candidates) > 1 else None
+        else:
+            rest = candidates[0][1] if candidates else None
+        best = v if rest is None or v >= rest else rest
+        if commit:
+            if candidates and candidates[0][0] <= oldest:
+                candidates.popleft()
+            while candidates and candidates[-1][1] <= v:
+                candidates.pop()
+            candidates.append((self.count, v))
+            self.count += 1
+            count = self.count
+        else:
+            count = self.count + 1
+        return self.sign * best if count >= self.period else NAN
+
+
+class _Ewm:
+    """The pandas ewm().mean() recurrence (ignore_na=False), so seeded values match the batch functions exactly."""
+
+    def __init__(self, com, adjust):
+        alpha = 1.0 / (1.0 + com)
+        self.factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.weighted = NAN
+        self.old_wt = 1.0
+
+    @classmethod
+    def from_alpha(cls, alpha, adjust=True):
+        return cls(1.0 / alpha - 1.0, adjust)
+
+    @classmethod
+    def from_span(cls, span, adjust=True):
+        return cls((span - 1) / 2.0, adjust)
+
+    def update(self, x, commit):
+        weighted, old_wt = self.weighted, self.old_wt
+        if weighted == weighted:
+            old_wt *= self.factor
+            if x == x:
+                if weighted != x:
+                    weighted = (old_wt * weighted + self.new_wt * x) / (old_wt + self.new_wt)
+                old_wt = old_wt + self.new_wt if self.adjust else 1.0
+        elif x == x:
+            weighted = x
+        if commit:
+            self.weighted, self.old_wt = weighted, old_wt
+        return weighted
+
+
+class _RollingWma:
+    """Linearly weighted mean of the last `period` values, updated by the running-sum recurrence."""
+
+    def __init__(self, period):
+        self.period = period
+        self.weight_sum = period * (period + 1) / 2.0
+        self.window = deque()
+        self.total = 0.0
+        self.numerator = NAN
+        self.nans = 0
+        self.pushes = 0
+
+    def _direct(self, values):
+        if len(values) < self.period:
+            return NAN, NAN
+        return math.fsum(i * v for i, v in enumerate(values, 1)), math.fsum(values)
+
+    def update(self, x, commit):
+        n = self.period
+        full = len(self.window) == n
+        if full and not self.nans and x == x and self.numerator == self.numerator:
+            # Every weight drops by one (removing the old window sum) and x enters with weight n
+            numerator = self.numerator + n * x - self.total
+            total = self.total + x - self.window[0]
+        else:
+            numerator, total = self._direct(list(self.window)[len(self.window) - n + 1:] + [x])
+        if commit:
+            drop = self.window.popleft() if full else 0.0
+            self.window.append(x)
+            self.nans += (x != x) - (drop != drop)
+            self.pushes += 1
+            if self.pushes % n == 0:
+                numerator, total = self._direct(list(self.window))
+            self.numerator, self.total = numerator, total
+        return numerator / self.weight_sum
+
+
+# --- Engine ---
+
+class StreamingIndicators:
+    def __init__(self, volume_period=20, volume_multiplier=1.5, bos_period=192, bos_retest_window=12,
+                 bos_retest_proximity=0.003, bos_retest_wick=0.30):
+        self.volume_period = volume_period
+        self.volume_multiplier = volume_multiplier
+        self.bos_period = bos_period
+        self.bos_retest_window = bos_retest_window
+        self.bos_retest_proximity = bos_retest_proximity
+        self.bos_retest_wick = bos_retest_wick
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, capacity=DEFAULT_HISTORY):
+        self.count = 0
+        self.last_open_time = None
+        self.prev_close = self.prev_high = self.prev_low = NAN
+        self.last_bull = self.last_bear = None  # (bar index, broken level)
+
+        self.atr = _Ewm.from_alpha(1 / ATR_PERIOD, adjust=False)
+        self.gain = _RollingSum(RSI_PERIOD)
+        self.loss = _RollingSum(RSI_PERIOD)
+        self.sma = _RollingSum(SMA_PERIOD)
+        self.wma_half = _RollingWma(HMA_PERIOD // 2)
+        self.wma_full = _RollingWma(HMA_PERIOD)
+        self.wma_hull = _RollingWma(int(np.sqrt(HMA_PERIOD)))
+        self.plus_dm = _Ewm.from_alpha(1 / ADX_PERIOD)
+        self.minus_dm = _Ewm.from_alpha(1 / ADX_PERIOD)
+        self.tr = _Ewm.from_alpha(1 / ADX_PERIOD)
+        self.adx = _Ewm.from_alpha(1 / ADX_PERIOD)
+        self.vwap_pv = _RollingSum(VWAP_PERIOD)
+        self.vwap_volume = _RollingSum(VWAP_PERIOD)
+        self.volume = _RollingSum(self.volume_period)
+        self.bos_highs = _RollingExtreme(self.bos_period, 1)
+        self.bos_lows = _RollingExtreme(self.bos_period, -1)
+        self.stoch_high = _RollingExtreme(PERIOD, 1)
+        self.stoch_low = _RollingExtreme(PERIOD, -1)
+        self.stoch_k = _RollingSum(K)
+        self.stoch_d = _RollingSum(D)
+        self.ema_fast = _Ewm.from_span(MACD_FAST, adjust=False)
+        self.ema_slow = _Ewm.from_span(MACD_SLOW, adjust=False)
+        self.ema_signal = _Ewm.from_span(MACD_SIGNAL, adjust=False)
+        self.bb_sum = _RollingSum(BB_PERIOD)
+        self.bb_std = _RollingStd(BB_PERIOD)
+
+        self.capacity = capacity
+        self._history = np.empty((len(COLUMNS), 2 * capacity))
+        self._end = 0
+
+    def _step(self, o, h, l, c, v, commit):
+        """Values of every column for one bar, in COLUMNS order."""
+        idx = self.count
+        prev_close, prev_high, prev_low = self.prev_close, self.prev_high, self.prev_low
+
+        # True range; the first bar has no previous close, and the batch max() skips the NaN terms
+        tr = h - l if idx == 0 else max(h - l, abs(h - prev_close), abs(l - prev_close))
+        atr = self.atr.update(tr, commit)
+
+        # RSI on simple rolling means of gains and losses; a zero loss average yields 0, as in calculate_rsi
+        delta = c - prev_close
+        gain = self.gain.update(delta if delta > 0 else 0.0, commit) / RSI_PERIOD
+        loss = self.loss.update(-delta if delta < 0 else 0.0, commit) / RSI_PERIOD
+        rs = gain / loss if loss == loss and loss != 0 else NAN
+        rsi = 100 - 100 / (1 + (rs if rs == rs else 0.0))
+
+        sma = self.sma.update(c, commit) / SMA_PERIOD
+        hull_input = 2 * self.wma_half.update(c, commit) - self.wma_full.update(c, commit)
+        hma = self.wma_hull.update(hull_input, commit)
+
+        # ADX; directional movement is not clipped at zero, matching calculate_adx
+        up, down = h - prev_high, prev_low - l
+        plus_dm = up if up > down else 0.0
+        minus_dm = down if down > up else 0.0
+        tr_avg = self.tr.update(tr, commit)
+        plus_di = 100 * _div(self.plus_dm.update(plus_dm, commit), tr_avg)
+        minus_di = 100 * _div(self.minus_dm.update(minus_dm, commit), tr_avg)
+        dx = _div(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        adx = self.adx.update(dx if dx == dx else 0.0, commit)
+
+        typical = (h + l + c) / 3
+        vwap = _div(self.vwap_pv.update(typical * v, commit), self.vwap_volume.update(v, commit))
+        vol_sma = self.volume.update(v, commit) / self.volume_period
+        volume_anomaly = v > vol_sma * self.volume_multiplier
+
+        # BOS against the extremes of the previous bos_period bars
+        recent_high, recent_low = self.bos_highs.current(), self.bos_lows.current()
+        bullish, bearish = c > recent_high, c < recent_low
+        window = self.bos_retest_window
+        candle = h - l
+        if bullish:
+            level_long, recent_long = recent_high, True
+        elif self.last_bull is not None and idx - self.last_bull[0] <= window:
+            level_long, recent_long = self.last_bull[1], idx - self.last_bull[0] < window
+        else:
+            level_long, recent_long = NAN, False
+        retest_long = (not bullish and recent_long and level_long == level_long
+                       and abs(l - level_long) / level_long < self.bos_retest_proximity
+                       and candle > 0 and (min(o, c) - l) / candle >= self.bos_retest_wick and c > level_long)
+        if bearish:
+            level_short, recent_short = recent_low, True
+        elif self.last_bear is not None and idx - self.last_bear[0] <= window:
+            level_short, recent_short = self.last_bear[1], idx - self.last_bear[0] < window
+        else:
+            level_short, recent_short = NAN, False
+        retest_short = (not bearish and recent_short and level_short == level_short
+                        and abs(h - level_short) / level_short < self.bos_retest_proximity
+                        and candle > 0 and (h - max(o, c)) / candle >= self.bos_retest_wick and c < level_short)
+
+        # Stochastic; flat ranges read 50 and the first PERIOD-1 bars stay NaN, as in calculate_stoch
+        lowest, highest = self.stoch_low.update(l, commit), self.stoch_high.update(h, commit)
+        if idx < PERIOD - 1:
+            raw_k = NAN
+        else:
+            raw_k = _div(100 * (c - lowest), highest - lowest) if highest != lowest else NAN
+            raw_k = raw_k if raw_k == raw_k else 50.0
+        stoch_k = self.stoch_k.update(raw_k, commit) / K
+        stoch_d = self.stoch_d.update(stoch_k, commit) / D
+
+        macd = self.ema_fast.update(c, commit) - self.ema_slow.update(c, commit)
+        macd_signal = self.ema_signal.update(macd, commit)
+
+        bb_mid = self.bb_sum.update(c, commit) / BB_PERIOD
+        bb_std = self.bb_std.update(c, commit)
+
+        if commit:
+            self.bos_highs.update(h, True)
+            self.bos_lows.update(l, True)
+            if bullish:
+                self.last_bull = (idx, recent_high)
+            if bearish:
+                self.last_bear = (idx, recent_low)
+            self.prev_close, self.prev_high, self.prev_low = c, h, l
+            self.count += 1
+
+        return (atr, rsi, sma, hma, adx, vwap, vol_sma, volume_anomaly,
+                recent_high, recent_low, bullish, bearish, level_long, level_short,
+                recent_long, recent_short, retest_long, retest_short,
+                macd, macd_signal, macd - macd_signal, bb_mid, bb_std, bb_mid + bb_std * BB_STD_DEV, bb_mid - bb_std * BB_STD_DEV,
+                stoch_k, stoch_d)
+
+    def _commit(self, open_time, o, h, l, c, v):
+        values = self._step(o, h, l, c, v, True)
+        if self._end == self._history.shape[1]:
+            # Keep the newest `capacity` rows; amortised O(1) per bar
+            self._history[:, :self.capacity] = self._history[:, self._end - self.capacity:self._end]
+            self._end = self.capacity
+        self._history[:, self._end] = values
+        self._end += 1
+        self.last_open_time = open_time
+
+    def sync(self, df):
+        """
+        Brings the engine up to date with `df` (every row but the last is a closed
+        bar) and returns a (len(COLUMNS), len(df)) array of values for its rows.
+        """
+        n = len(df)
+        result = np.full((len(COLUMNS), n), NAN)
+        if n == 0:
+            return result
+        open_times = df['timestamp'].to_numpy().astype('datetime64[ms]').view('int64')
+        opens, highs, lows, closes, volumes = (df[col].to_numpy(dtype=np.float64).tolist()
+                                               for col in ('open', 'high', 'low', 'close', 'volume'))
+        closed = n - 1
+
+        start = None
+        if self.last_open_time is not None:
+            pos = int(np.searchsorted(open_times, self.last_open_time))
+            # The last committed bar must be a closed row of this frame, and the history must cover the frame
+            covered = closed <= self.capacity and self._end + closed - pos - 1 >= closed
+            if pos < closed and open_times[pos] == self.last_open_time and covered:
+                start = pos + 1
+        if start is None:
+            self.reset(max(DEFAULT_HISTORY, n))
+            start = 0
+
+        for i in range(start, closed):
+            self._commit(int(open_times[i]), opens[i], highs[i], lows[i], closes[i], volumes[i])
+
+        if closed:
+            result[:, :closed] = self._history[:, self._end - closed:self._end]
+        result[:, closed] = self._step(opens[-1], highs[-1], lows[-1], closes[-1], volumes[-1], False)
+        return result
+
+    def apply(self, df):
+        """Returns `df` with the indicator columns added, under the names the batch functions use."""
+        with self.lock:
+            values = self.sync(df)
+        # One concat instead of a column assignment per indicator
+        columns = {name: values[j].astype(bool) if name in BOOL_COLUMNS else values[j] for j, name in enumerate(COLUMNS)}
+        existing = [name for name in COLUMNS if name in df.columns]
+        df = pd.concat([df.drop(columns=existing) if existing else df, pd.DataFrame(columns, index=df.index, copy=False)], axis=1)
+        return df
+
+
+# --- Batch reference ---
+
+def compute_batch(df, volume_period, volume_multiplier, bos_period, bos_retest_window, bos_retest_proximity, bos_retest_wick):
+    """The same columns computed by the batch functions in data/indicators.py, on a copy of `df`."""
+    batch = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].copy()
+    batch = calculate_atr(batch, ATR_PERIOD)
+    batch = calculate_rsi(batch, RSI_PERIOD)
+    batch = add_price_sma(batch, SMA_PERIOD)
+    batch = calculate_hull_moving_average(batch, HMA_PERIOD)
+    batch = calculate_adx(batch, ADX_PERIOD)
+    batch = calculate_vwap(batch, period=VWAP_PERIOD)
+    batch = calculate_volume_anomaly(batch, period=volume_period, multiplier=volume_multiplier)
+    batch = calculate_bos(batch, period=bos_period, retest_window=bos_retest_window,
+                          retest_proximity=bos_retest_proximity, retest_wick_threshold=bos_retest_wick)
+    batch = calculate_macd(batch, MACD_FAST, MACD_SLOW, MACD_SIGNAL)
+    batch = calculate_bollinger_bands(batch, BB_PERIOD, BB_STD_DEV)
+    batch['stoch_k'], batch['stoch_d'] = calculate_stoch(batch['high'], batch['low'], batch['close'], PERIOD, K, D)
+    return batch
+
+
+def find_mismatches(engine, df, rows=PARITY_ROWS):
+    """Compares the engine's columns in `df` with the batch functions; returns a list of (column, streaming, batch)."""
+    batch = compute_batch(
+        df, engine.volume_period, engine.volume_multiplier, engine.bos_period, engine.bos_retest_window,
+        engine.bos_retest_proximity, engine.bos_retest_wick)
+    mismatches = []
+    for name in COLUMNS:
+        a = df[name].to_numpy()[-rows:]
+        b = batch[name].to_numpy()[-rows:]
+        if name in BOOL_COLUMNS:
+            same = np.array_equal(a.astype(bool), b.astype(bool))
+        else:
+            same = np.allclose(a.astype(np.float64), b.astype(np.float64), rtol=PARITY_RTOL, atol=PARITY_ATOL, equal_nan=True)
+        if not same:
+            mismatches.append((name, a.tolist(), b.tolist()))
+    return mismatches
+
+
+# --- Registry ---
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def is_enabled():
+    return _settings('ENABLE_STREAMING_INDICATORS', False)
+
+
+def get_streaming_indicators(symbol, interval):
+    """Returns the shared engine for (symbol, interval), configured from settings on first use."""
+    key = (symbol, interval)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = StreamingIndicators(
+                volume_period=_settings('VOLUME_ANOMALY_PERIOD', 20),
+                volume_multiplier=_settings('VOLUME_ANOMALY_MULTIPLIER', 1.5),
+                bos_period=_settings('BOS_LOOKBACK_PERIOD', 192),
+                bos_retest_window=_settings('BOS_RETEST_WINDOW', 12),
+                bos_retest_proximity=_settings('BOS_RETEST_PROXIMITY_PCT', 0.003),
+                bos_retest_wick=_settings('BOS_RETEST_WICK_REJECTION', 0.30),
+            )
+        return engine
+
+
+def apply_streaming_indicators(symbol, interval, df):
+    """
+    Returns `df` with the execution-timeframe indicator columns added by the
+    streaming engine. In parity mode a mismatch with the batch functions is
+    logged and the batch values are returned instead.
+    """
+    engine = get_streaming_indicators(symbol, interval)
+    df = engine.apply(df)
+    if not _settings('STREAMING_INDICATORS_PARITY_CHECK', False):
+        return df
+
+    mismatches = find_mismatches(engine, df)
+    if not mismatches:
+        return df
+    for name, streaming, reference in mismatches:
+        print(f"[Streaming Indicators] Parity mismatch for {symbol} {interval} '{name}': streaming={streaming} batch={reference}")
+    with engine.lock:
+        engine.reset()
+    batch = compute_batch(
+        df, engine.volume_period, engine.volume_multiplier, engine.bos_period, engine.bos_retest_window,
+        engine.bos_retest_proximity, engine.bos_retest_wick)
+    for name in COLUMNS:
+        df[name] = batch[name]
+    return df
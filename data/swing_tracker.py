@@ -0,0 +1,115 @@
+"""
+Swing Tracker — per-symbol cache of the swing detection for the Fib checks.
+
+PURPOSE:
+    find_swing_points_and_fib runs scipy's find_peaks twice over the lookback
+    window on every call, and the Fibonacci long and short checks both call it
+    for every symbol every cycle, on the same frame.
+
+HOW IT WORKS:
+    1. One tracker per (symbol, interval). update(df) runs the swing detection
+       of find_swing_points_and_fib (find_peaks with distance 5 and the
+       ATR-relative prominence) over the last `lookback` bars, forming bar
+       included, exactly as the stateless function does.
+    2. The result is kept together with the state of the frame it was
+       computed from: length, first and last open time, the last bar's OHLCV
+       and ATR. A further update() on the same state (the short check after
+       the long one, or a second caller) reuses it; any other frame, e.g. a
+       tick of the forming bar, is detected again.
+    3. swing_points_and_fib(trend) and fib_extensions(trend) are computed from
+       the cached latest swing high and low with the same ordering rules and
+       levels as the stateless functions in data/indicators.py.
+
+    This is a cache, not an incremental detector: every new frame state costs
+    one full find_peaks pass over the window, and the signals are identical
+    to find_swing_points_and_fib.
+"""
+
+import threading
+
+from data.indicators import swing_prominence, detect_swings, fib_retracements, calculate_fib_extensions
+
+_STATE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _frame_state(df):
+    """What the detection result depends on, as the indicator pipeline keys its cache."""
+    last_bar = tuple(float(df[column].iat[-1]) for column in _STATE_COLUMNS)
+    atr = float(df['atr'].iat[-1]) if 'atr' in df.columns else None
+    return len(df), df['timestamp'].iat[0], df['timestamp'].iat[-1], last_bar, atr
+
+
+class SwingTracker:
+    def __init__(self, lookback=50, distance=5):
+        self.lookback = lookback
+        self.distance = distance
+        self.frame_state = None
+        self.swing_high = None  # (open time, high) of the latest swing high in the window
+        self.swing_low = None   # (open time, low) of the latest swing low in the window
+
+    def update(self, df):
+        """Detects the swings of `df` unless they were detected on the same frame state; returns self."""
+        if len(df) == 0:
+            self.frame_state, self.swing_high, self.swing_low = None, None, None
+            return self
+        state = _frame_state(df)
+        if state == self.frame_state:
+            return self
+        self.frame_state = state
+
+        subset = df.iloc[-self.lookback:]
+        high_peaks, low_troughs = detect_swings(
+            subset['high'], subset['low'], swing_prominence(df), distance=self.distance
+        )
+        times = subset['timestamp'].to_numpy()
+        self.swing_high = self._latest(high_peaks, times, subset['high'].to_numpy())
+        self.swing_low = self._latest(low_troughs, times, subset['low'].to_numpy())
+        return self
+
+    @staticmethod
+    def _latest(positions, times, prices):
+        """(open time, price) of the last detected swing; None without swings."""
+        if len(positions) == 0:
+            return None
+        return times[positions[-1]], prices[positions[-1]]
+
+    def _swings(self, trend):
+        """(swing low, swing high) prices if their order is valid for `trend`, else None."""
+        if self.swing_high is None or self.swing_low is None:
+            return None
+        (low_time, low_price), (high_time, high_price) = self.swing_low, self.swing_high
+        if trend == 'long' and high_time < low_time:
+            return None
+        if trend == 'short' and low_time < high_time:
+            return None
+        return low_price, high_price
+
+    def swing_points_and_fib(self, trend='long'):
+        """(swing_low, swing_high, fib_levels) as find_swing_points_and_fib, or (None, None, None)."""
+        swings = self._swings(trend)
+        if swings is None:
+            return None, None, None
+        return swings[0], swings[1], fib_retracements(swings[0], swings[1], trend)
+
+    def fib_extensions(self, trend='long'):
+        """calculate_fib_extensions of the stored swings; {} without a valid swing pair."""
+        swings = self._swings(trend)
+        if swings is None:
+            return {}
+        return calculate_fib_extensions(swings[0], swings[1], trend)
+
+
+# --- Registry ---
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_swing_tracker(symbol, interval):
+    """Returns the shared tracker for (symbol, interval)."""
+    key = (symbol, interval)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = SwingTracker()
+        return tracker
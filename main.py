@@ -7,10 +7,10 @@ import io
 if sys.stdout.encoding.lower() != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 import pandas as pd
-from config.symbols import symbols
-from data.get_data import fetch_multi_timeframe_data, get_all_positions_and_balance, get_usdt_balance, get_position, get_all_funding_rates, get_global_btc_trend
+from config.symbols import symbols as configured_symbols
+from data.get_data import fetch_strategy_frames, get_usdt_balance, get_position, get_global_btc_trend
 from data.indicators import *
-from src.close_position import close_position_long, close_position_short
+from src.close_position import close_position_long, close_position_short, REQUIRED_INDICATORS as POSITION_INDICATORS
 from src.trade import manage_active_trades, cancel_open_orders
 from src.state_manager import bot_state
 from src.reconciler import reconcile_trades
@@ -19,20 +19,43 @@ from config.settings import BANNED_TRADING_HOURS_UTC, EXCLUDED_SYMBOLS
 from config.bot_info import get_startup_message
 
 # --- Import All Strategy Functions ---
-from src.fib_strategy import check_fib_pullback_long_entry, check_fib_retrace_short_entry
-from src.open_position import open_position_long, open_position_short
-from src.bos_strategy import check_bos_breakout_long, check_bos_breakout_short
-from src.reversal_strategy import check_reversal_long_entry, check_reversal_short_entry
-from config.client import client
+from src.fib_strategy import (
+    check_fib_pullback_long_entry, check_fib_retrace_short_entry, evaluate_fib_pullback_long_entry,
+    evaluate_fib_retrace_short_entry, REQUIRED_INDICATORS as FIB_INDICATORS,
+)
+from src.open_position import (
+    open_position_long, open_position_short, evaluate_open_position_long, evaluate_open_position_short,
+    REQUIRED_INDICATORS as STOCH_INDICATORS,
+)
+from src.bos_strategy import (
+    check_bos_breakout_long, check_bos_breakout_short, evaluate_bos_breakout_long, evaluate_bos_breakout_short,
+    REQUIRED_INDICATORS as BOS_INDICATORS,
+)
+from src.reversal_strategy import (
+    check_reversal_long_entry, check_reversal_short_entry, evaluate_reversal_long_entry, evaluate_reversal_short_entry,
+    REQUIRED_INDICATORS as REVERSAL_INDICATORS,
+)
+from src.entry_candidates import execute_ranked
+from src.shard_coordinator import shard_config, shard_symbols, owns, sync_shared_state
+from src.cycle_scheduler import create_scheduler, begin_pass, record_signal, is_enabled as candle_close_scheduler_enabled
+from src.async_client import exchange, close_async_client
+from src.market_snapshot import begin_cycle, get_account
+from src.entry_slots import open_cycle as open_entry_slots, get_entry_slots
+from data.kline_stream import start_kline_stream, DEFAULT_STREAM_URL
+from data.streaming_indicators import apply_streaming_indicators, is_enabled as streaming_indicators_enabled, PIPELINE_INDICATORS
+from data.indicator_pipeline import compute_indicators_batch, merge_requirements, batch_enabled as batch_indicators_enabled
+from data.indicator_pool import compute_indicators_pooled, shutdown_pool as shutdown_indicator_pool
+
+# Sharded deployment: this process scans only its partition of the universe (src/shard_coordinator.py)
+symbols = shard_symbols(configured_symbols)
 
-trade_lock = asyncio.Lock()
 
 async def set_leverage(symbol, leverage):
     """
     Sets the leverage for a given symbol with automatic maximum leverage fallback.
     """
     try:
-        await asyncio.to_thread(client.futures_change_leverage, symbol=symbol, leverage=leverage)
+        await exchange.futures_change_leverage(symbol=symbol, leverage=leverage)
     except Exception as e:
         if "No need to change leverage" in str(e):
             return
@@ -49,13 +72,13 @@ async def set_leverage(symbol, leverage):
         # Check if leverage setting failed due to exchange limits (Binance API Error -4028)
         if "code=-4028" in str(e) or "Leverage" in str(e):
             try:
-                brackets = await asyncio.to_thread(client.futures_leverage_bracket, symbol=symbol)
+                brackets = await exchange.futures_leverage_bracket(symbol=symbol)
                 if brackets:
                     bracket_list = brackets[0].get('brackets', [])
                     max_allowed = max([int(b['initialLeverage']) for b in bracket_list])
                     if max_allowed != leverage:
                         print(f"[Leverage Adjuster] {symbol} maximum leverage is {max_allowed}x. Adjusting from {leverage}x to {max_allowed}x...")
-                        await asyncio.to_thread(client.futures_change_leverage, symbol=symbol, leverage=max_allowed)
+                        await exchange.futures_change_leverage(symbol=symbol, leverage=max_allowed)
                         return
             except Exception as inner_e:
                 print(f"[Leverage Adjuster Error] Could not auto-adjust leverage for {symbol}: {inner_e}")
@@ -63,11 +86,50 @@ async def set_leverage(symbol, leverage):
         # Print standard warning if it was a different error or fallback failed
         print(f"[Leverage Warning] Could not set leverage for {symbol}: {e}")
 
-async def process_symbol(symbol, all_positions, balance_data, funding_rates_map):
+def entry_requirements():
+    """Indicators read by the enabled entry strategies, per timeframe role (streamed ones excluded)."""
+    required = merge_requirements(*[declaration for enabled, declaration in (
+        (ENABLE_FIB_STRATEGY, FIB_INDICATORS), (ENABLE_BOS_STRATEGY, BOS_INDICATORS),
+        (ENABLE_REVERSAL_STRATEGY, REVERSAL_INDICATORS), (ENABLE_STOCH_STRATEGY, STOCH_INDICATORS),
+    ) if enabled])
+    if streaming_indicators_enabled():
+        required['execution'] -= PIPELINE_INDICATORS
+    return required
+
+async def prepare_batch_indicators(symbols_to_process, semaphore):
+    """
+    Fetches the frames of every symbol up front and computes their indicators for
+    the whole universe in one vectorized pass per timeframe. Returns {symbol: frames};
+    process_symbol then finds the indicators in the pipeline cache.
+    """
+    async def fetch(symbol):
+        async with semaphore:
+            try:
+                return symbol, await asyncio.to_thread(fetch_strategy_frames, symbol, EXECUTION_TIMEFRAME, PRIMARY_TIMEFRAME)
+            except Exception as e:
+                # process_symbol fetches (and reports) this symbol itself
+                if VERBOSE_LOGGING:
+                    print(f"[Batch Indicators] Prefetch failed for {symbol}: {e}")
+                return symbol, None
+
+    results = await asyncio.gather(*[fetch(symbol) for symbol in symbols_to_process])
+    frames = {symbol: result for symbol, result in results if result is not None}
+
+    required = merge_requirements(entry_requirements(), {'hourly': ('adx',)})
+    if not streaming_indicators_enabled():
+        required['execution'] |= set(POSITION_INDICATORS['execution'])
+    for role, interval, index in (('execution', EXECUTION_TIMEFRAME, 0), ('hourly', '1h', 1), ('primary', PRIMARY_TIMEFRAME, 2)):
+        await asyncio.to_thread(compute_indicators_batch, interval, {symbol: f[index] for symbol, f in frames.items()}, required[role])
+    return frames
+
+async def process_symbol(symbol, all_positions, balance_data, funding_rates_map, frames=None, candidates=None):
     """
     Processes a single symbol by checking for trade signals in a hierarchical order.
     1. First, check for the high-probability Fibonacci setup.
     2. If no Fib setup is found, then check for the general trend-following setup.
+    `frames` are the symbol's prefetched strategy frames in batch-indicator mode.
+    With a `candidates` list (ranked-entry mode) the first qualifying setup is
+    appended to it as an EntryCandidate instead of being traded.
     """
     try:
         # --- Pre-flight: Skip symbols requiring unsigned agreements ---
@@ -76,30 +138,20 @@ async def process_symbol(symbol, all_positions, balance_data, funding_rates_map)
                 print(f"⚠️ Skipping {symbol}: TradFi-Perps Agreement required.")
             return
 
-        df_15m, _, _, _, _, _, _, _, df_4h, support_4h, resistance_4h, stoch_k_1h, stoch_d_1h, df_1h = await asyncio.to_thread(
-            fetch_multi_timeframe_data, symbol, EXECUTION_TIMEFRAME, INTERMEDIATE_TIMEFRAME, PRIMARY_TIMEFRAME
-        )
+        if frames is None:
+            frames = await asyncio.to_thread(fetch_strategy_frames, symbol, EXECUTION_TIMEFRAME, PRIMARY_TIMEFRAME)
+        df_15m, df_1h, df_4h, support_4h, resistance_4h = frames
 
         # --- Prepare Data and Indicators ---
-        df_15m = calculate_atr(df_15m)
-        df_15m = calculate_rsi(df_15m)
-        df_15m = add_price_sma(df_15m, 50)
-        df_15m = calculate_hull_moving_average(df_15m, 14)
-        df_15m = calculate_adx(df_15m)
-        df_15m = calculate_vwap(df_15m, period=288)
-        from config.settings import VOLUME_ANOMALY_PERIOD, VOLUME_ANOMALY_MULTIPLIER
-        df_15m = calculate_volume_anomaly(df_15m, period=VOLUME_ANOMALY_PERIOD, multiplier=VOLUME_ANOMALY_MULTIPLIER)
-        from config.settings import BOS_LOOKBACK_PERIOD, BOS_RETEST_WINDOW, BOS_RETEST_PROXIMITY_PCT, BOS_RETEST_WICK_REJECTION
-        df_15m = calculate_bos(df_15m, period=BOS_LOOKBACK_PERIOD, retest_window=BOS_RETEST_WINDOW, retest_proximity=BOS_RETEST_PROXIMITY_PCT, retest_wick_threshold=BOS_RETEST_WICK_REJECTION)
-        stoch_k_15m, stoch_d_15m = calculate_stoch(df_15m['high'], df_15m['low'], df_15m['close'], 14, 3, 3)
-        
-        df_4h = calculate_adx(df_4h)
-        df_4h = add_price_sma(df_4h, 50)
-        df_4h = add_price_sma(df_4h, 200)  # Required by SMA200 trend filter in open_position.py
-        
-        # --- 1H EMA 21 for BOS Trend Filter ---
-        df_1h['ema_21'] = df_1h['close'].ewm(span=21, adjust=False).mean()
-        
+        # Only what position management reads is computed here; entry indicators wait until the entry gates pass
+        if streaming_indicators_enabled():
+            # O(1) update per closed bar instead of recomputing the whole window
+            df_15m = apply_streaming_indicators(symbol, EXECUTION_TIMEFRAME, df_15m)
+        else:
+            # Process-pool mode computes off the event loop (data/indicator_pool.py)
+            df_15m, = await compute_indicators_pooled(symbol, [(EXECUTION_TIMEFRAME, df_15m, POSITION_INDICATORS['execution'])])
+        stoch_k_15m, stoch_d_15m = df_15m['stoch_k'], df_15m['stoch_d']
+
         position, roi, _, _, entry_price = get_position(symbol, all_positions)
         usdt_balance = get_usdt_balance(balance_data)
         funding_rate = funding_rates_map.get(symbol, 0.0)
@@ -125,7 +177,7 @@ async def process_symbol(symbol, all_positions, balance_data, funding_rates_map)
 
             # --- ADX 1H Regime Gate ---
             # Calculate ADX on 1H timeframe to detect if the market is choppy/ranging
-            df_1h = calculate_adx(df_1h)
+            df_1h, = await compute_indicators_pooled(symbol, [('1h', df_1h, ('adx',))])
             adx_1h = df_1h['ADX'].iloc[-1]
             if adx_1h < 20:
                 if VERBOSE_LOGGING:
@@ -162,47 +214,76 @@ async def process_symbol(symbol, all_positions, balance_data, funding_rates_map)
                     print(f"❄️  Skipping scanning for {symbol}: Symbol is in a cooldown lockout period. {remaining}s remaining.")
                 return
 
+            # --- Indicators read by the enabled entry strategies (each computed once per bar) ---
+            required = entry_requirements()
+            df_15m, df_1h, df_4h = await compute_indicators_pooled(symbol, [
+                (EXECUTION_TIMEFRAME, df_15m, required['execution']),
+                ('1h', df_1h, required['hourly']),
+                (PRIMARY_TIMEFRAME, df_4h, required['primary']),
+            ])
+            stoch_k_1h, stoch_d_1h = (df_1h['stoch_k'], df_1h['stoch_d']) if 'stoch' in required['hourly'] else (None, None)
+
             # 1. Check for Fibonacci Strategy First (A+ precision sniper)
-            async with trade_lock:
-                # Re-fetch active positions and balance dynamically to avoid race conditions in concurrent tasks
-                current_positions, current_balance_data = await asyncio.to_thread(get_all_positions_and_balance)
-                current_active = [p for p in current_positions if float(p.get('positionAmt', 0)) != 0]
-                
-                if len(current_active) >= MAX_CONCURRENT_TRADES:
-                    if VERBOSE_LOGGING:
-                        print(f"⏸️  Max concurrent trades reached ({len(current_active)}/{MAX_CONCURRENT_TRADES}) while evaluating {symbol}. Skipping entry.")
-                    return
-                
-                current_usdt_balance = get_usdt_balance(current_balance_data)
+            # No lock: every symbol's strategies run concurrently and place_order reserves the
+            # slot atomically (src/entry_slots.py), so only that in-memory check is serialized.
+            # Positions and balance come from the cycle snapshot, refetched only after an order invalidated them
+            current_positions, current_balance_data = await asyncio.to_thread(get_account)
+            entry_slots = get_entry_slots()
+
+            # Cheap pre-check; the binding one is the reservation in place_order
+            if not entry_slots.has_free_slot(current_positions):
+                if VERBOSE_LOGGING:
+                    print(f"⏸️  Max concurrent trades reached or reserved ({MAX_CONCURRENT_TRADES}) while evaluating {symbol}. Skipping entry.")
+                return
+            
+            current_usdt_balance = get_usdt_balance(current_balance_data)
 
-                fib_trade_taken = False
+            if candidates is not None:
+                # Ranked mode: the same cascade, evaluated only; the cycle executes the best candidates afterwards
+                candidate = None
                 if ENABLE_FIB_STRATEGY:
-                    fib_trade_taken = await check_fib_pullback_long_entry(symbol, df_15m, df_4h, current_usdt_balance)
-                    if not fib_trade_taken:
-                        fib_trade_taken = await check_fib_retrace_short_entry(symbol, df_15m, df_4h, current_usdt_balance)
-
-                # 2. If no Fib, check for BOS Momentum Breakout (rocket rider)
-                bos_trade_taken = False
-                from config.settings import BOS_MAX_TRADES_PER_CYCLE
-                if ENABLE_BOS_STRATEGY and not fib_trade_taken and bot_state.bos_cycle_count < BOS_MAX_TRADES_PER_CYCLE:
-                    bos_trade_taken = await check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance)
-                    if not bos_trade_taken:
-                        bos_trade_taken = await check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance)
-                    if bos_trade_taken:
-                        bot_state.bos_cycle_count += 1
-
-                # 3. If no Fib or BOS, check for Mean Reversion / Support Catch
-                reversal_trade_taken = False
-                if ENABLE_REVERSAL_STRATEGY and not fib_trade_taken and not bos_trade_taken:
-                    reversal_trade_taken = await check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, support_4h)
-                    if not reversal_trade_taken:
-                        reversal_trade_taken = await check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, resistance_4h)
-
-                # 4. If no Fib, BOS, or Reversal, fall back to Stochastic Pullback (B+ everyday grinder)
-                if ENABLE_STOCH_STRATEGY and not fib_trade_taken and not bos_trade_taken and not reversal_trade_taken:
-                    general_trade_taken = await open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h)
-                    if not general_trade_taken:
-                        await open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h)
+                    candidate = evaluate_fib_pullback_long_entry(symbol, df_15m, df_4h, current_usdt_balance) or \
+                        evaluate_fib_retrace_short_entry(symbol, df_15m, df_4h, current_usdt_balance)
+                if candidate is None and ENABLE_BOS_STRATEGY and entry_slots.bos_slot_free():
+                    candidate = evaluate_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance) or \
+                        evaluate_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance)
+                if candidate is None and ENABLE_REVERSAL_STRATEGY:
+                    candidate = evaluate_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, support_4h) or \
+                        evaluate_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, resistance_4h)
+                if candidate is None and ENABLE_STOCH_STRATEGY:
+                    candidate = evaluate_open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h) or \
+                        evaluate_open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h)
+                if candidate is not None:
+                    record_signal(symbol, candidate.created_at)
+                    candidates.append(candidate)
+                return
+
+            fib_trade_taken = False
+            if ENABLE_FIB_STRATEGY:
+                fib_trade_taken = await check_fib_pullback_long_entry(symbol, df_15m, df_4h, current_usdt_balance)
+                if not fib_trade_taken:
+                    fib_trade_taken = await check_fib_retrace_short_entry(symbol, df_15m, df_4h, current_usdt_balance)
+
+            # 2. If no Fib, check for BOS Momentum Breakout (rocket rider)
+            # BOS fills are counted against BOS_MAX_TRADES_PER_CYCLE by their slot reservation
+            bos_trade_taken = False
+            if ENABLE_BOS_STRATEGY and not fib_trade_taken and entry_slots.bos_slot_free():
+                bos_trade_taken = await check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance)
+                if not bos_trade_taken:
+                    bos_trade_taken = await check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k_15m, current_usdt_balance)
+
+            # 3. If no Fib or BOS, check for Mean Reversion / Support Catch
+            reversal_trade_taken = False
+            if ENABLE_REVERSAL_STRATEGY and not fib_trade_taken and not bos_trade_taken:
+                reversal_trade_taken = await check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, support_4h)
+                if not reversal_trade_taken:
+                    reversal_trade_taken = await check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, current_usdt_balance, resistance_4h)
+
+            # 4. If no Fib, BOS, or Reversal, fall back to Stochastic Pullback (B+ everyday grinder)
+            if ENABLE_STOCH_STRATEGY and not fib_trade_taken and not bos_trade_taken and not reversal_trade_taken:
+                general_trade_taken = await open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h)
+                if not general_trade_taken:
+                    await open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, current_usdt_balance, None, None, atr_value_15m, funding_rate, support_4h, resistance_4h)
 
     except Exception as e:
         import traceback
@@ -215,6 +296,9 @@ async def main_trading_loop():
     """
     # Display startup configuration
     print(get_startup_message())
+    shard_index, shard_count = shard_config()
+    if shard_count > 1:
+        print(f"🧩 Shard {shard_index + 1}/{shard_count}: {len(symbols)} of {len(configured_symbols)} symbols")
 
     # --- STARTUP: Sync any trades closed while bot was offline ---
     print("🔄 Running trade reconciliation against Binance history...")
@@ -227,43 +311,67 @@ async def main_trading_loop():
     except Exception as sync_err:
         print(f"⚠️  Reconciliation failed (non-critical): {sync_err}")
     
+    # --- Optional WebSocket market data: keeps kline buffers live instead of REST polling ---
+    if getattr(sys.modules['config.settings'], 'ENABLE_KLINE_STREAM', False):
+        stream_url = getattr(sys.modules['config.settings'], 'KLINE_STREAM_URL', DEFAULT_STREAM_URL)
+        # 1h bars are rebuilt from the execution timeframe when HTF resampling is on
+        stream_intervals = [EXECUTION_TIMEFRAME]
+        if not getattr(sys.modules['config.settings'], 'ENABLE_HTF_RESAMPLING', True):
+            stream_intervals.append('1h')
+        start_kline_stream(symbols, stream_intervals, base_url=stream_url)
+        print(f"📡 Kline stream started for {len(symbols)} symbols ({', '.join(stream_intervals)}) via {stream_url}")
+
     print("⚙️ Initializing leverage for all symbols...")
     leverage_tasks = [set_leverage(symbol, LEVERAGE) for symbol in symbols]
     await asyncio.gather(*leverage_tasks)
     print("✅ Leverage initialization complete.")
     
+    # Candle-close scheduler: entry passes right after each execution-timeframe close,
+    # management-only passes in between; without it cycles are paced by a fixed 60s sleep
+    scheduler = create_scheduler(EXECUTION_TIMEFRAME) if candle_close_scheduler_enabled() else None
     cycle_count = 0
     previously_active_symbols = set()
     while not bot_state.trading_paused:
+        cycle_pass = begin_pass(await scheduler.next_pass() if scheduler is not None else None)
         cycle_count += 1
         print(f"\n{'='*60}")
-        print(f"🔄 Cycle #{cycle_count} - {pd.Timestamp.now().strftime('%H:%M:%S')}")
+        print(f"🔄 Cycle #{cycle_count} ({cycle_pass.kind}) - {pd.Timestamp.now().strftime('%H:%M:%S')}")
         print(f"{'='*60}")
         
         try:
             # Reset BOS cycle throttle at the start of each scan cycle
             bot_state.bos_cycle_count = 0
             
-            all_positions, balance_data = await asyncio.to_thread(get_all_positions_and_balance)
-            active_positions = [p for p in all_positions if float(p.get('positionAmt', 0)) != 0]
+            # One snapshot per cycle: mark prices and funding for all symbols, positions and balances
+            snapshot = await asyncio.to_thread(begin_cycle)
+            # Fresh entry-slot books: reservations are counted per cycle, like the BOS throttle
+            open_entry_slots()
+            # Sharded: drawdown, BOS cooldown and loss streaks as the coordinator sums them over all shards
+            await asyncio.to_thread(sync_shared_state, bot_state)
+            all_positions, balance_data = snapshot.account()
+            account_positions = [p for p in all_positions if float(p.get('positionAmt', 0)) != 0]
+            # Every shard sees the whole account but manages only the symbols it owns
+            active_positions = [p for p in account_positions if owns(p['symbol'])]
             current_active_symbols = {p['symbol'] for p in active_positions}
             
             # Detect any positions closed on exchange/offline since the last cycle
-            for symbol in previously_active_symbols:
-                if symbol not in current_active_symbols:
-                    print(f"❄️ [Exchange Exit Detected] {symbol} position closed. Applying symbol cooldown lockout and nuking orphan orders.")
-                    await cancel_open_orders(symbol)
-                    bot_state.last_exit_timestamps[symbol] = time.time()
-                    bot_state.breakeven_triggered.pop(symbol, None)
-                    bot_state.partial_tp1_taken.pop(symbol, None)
-                    bot_state.partial_tp2_taken.pop(symbol, None)
-                    bot_state.entry_timestamps.pop(symbol, None)
-                    bot_state.entry_reasons.pop(symbol, None)
-                    
-            previously_active_symbols = current_active_symbols
+            # (not from a carried-over account: a failed read says nothing about closes)
+            closed_symbols = previously_active_symbols - current_active_symbols if not snapshot.account_stale else set()
+            for symbol in closed_symbols:
+                print(f"❄️ [Exchange Exit Detected] {symbol} position closed. Applying symbol cooldown lockout and nuking orphan orders.")
+                await cancel_open_orders(symbol)
+                bot_state.last_exit_timestamps[symbol] = time.time()
+                bot_state.breakeven_triggered.pop(symbol, None)
+                bot_state.partial_tp1_taken.pop(symbol, None)
+                bot_state.partial_tp2_taken.pop(symbol, None)
+                bot_state.entry_timestamps.pop(symbol, None)
+                bot_state.entry_reasons.pop(symbol, None)
+                
+            if not snapshot.account_stale:
+                previously_active_symbols = current_active_symbols
 
-            # Fetch funding rates once per cycle — used by both close and entry logic
-            funding_rates_map = await asyncio.to_thread(get_all_funding_rates)
+            # Funding rates come with the snapshot — used by both close and entry logic
+            funding_rates_map = snapshot.funding_rates
 
             if len(active_positions) > 0:
                 print(f"📊 Managing {len(active_positions)} active trade(s)")
@@ -272,8 +380,14 @@ async def main_trading_loop():
             active_symbols = {p['symbol'] for p in active_positions}
             symbols_to_process = list(active_symbols)
 
-            if len(active_positions) >= MAX_CONCURRENT_TRADES:
-                print(f"⏸️  Max concurrent trades reached ({len(active_positions)}/{MAX_CONCURRENT_TRADES})")
+            if not cycle_pass.entries:
+                # Management pass between candle closes: open positions only, no new entries
+                if VERBOSE_LOGGING:
+                    print(f"🛠️  Management pass: {len(active_positions)} open position(s), entry scan waits for the next close")
+            elif snapshot.account_stale:
+                print("⚠️  Account data unavailable this cycle: managing open positions only, no new entries")
+            elif len(account_positions) >= MAX_CONCURRENT_TRADES:
+                print(f"⏸️  Max concurrent trades reached ({len(account_positions)}/{MAX_CONCURRENT_TRADES})")
             else:
                 # --- Hour Gate: Block new entries during known low-quality hours ---
                 current_utc_hour = pd.Timestamp.utcnow().hour
@@ -298,24 +412,43 @@ async def main_trading_loop():
             else:
                 print(f"🌍 Global BTC Trend: {bot_state.global_btc_trend}")
                 
-            # Throttle concurrency to prevent Binance API rate limits and connection pool timeouts
-            semaphore = asyncio.Semaphore(10)
+            # Request weight is budgeted by src/rate_limiter.py; this only bounds in-flight symbol
+            # tasks (worker threads and HTTP connections), so raise it with USE_ASYNC_CLIENT
+            semaphore = asyncio.Semaphore(getattr(sys.modules['config.settings'], 'SYMBOL_TASK_CONCURRENCY', 10))
+            # Batch mode: indicators of all symbols in one vectorized pass instead of per symbol
+            prefetched = await prepare_batch_indicators(symbols_to_process, semaphore) if batch_indicators_enabled() else {}
+            # Ranked mode: collect every symbol's entry candidate first, then trade the best ones
+            candidates = [] if getattr(sys.modules['config.settings'], 'ENABLE_RANKED_ENTRIES', False) else None
             async def bounded_process(symbol):
                 async with semaphore:
-                    await process_symbol(symbol, all_positions, balance_data, funding_rates_map)
+                    await process_symbol(symbol, all_positions, balance_data, funding_rates_map, prefetched.get(symbol), candidates)
                     
             tasks = [bounded_process(symbol) for symbol in symbols_to_process]
             await asyncio.gather(*tasks)
 
+            if candidates:
+                entry_slots = get_entry_slots()
+                async def free_slots():
+                    positions, _ = await asyncio.to_thread(get_account)
+                    return entry_slots.free_slots(positions)
+                print(f"🏁 Ranking {len(candidates)} entry candidate(s)")
+                placed = await execute_ranked(candidates, free_slots)
+                print(f"🏁 Placed {len(placed)} of {len(candidates)} ranked entr{'y' if len(candidates) == 1 else 'ies'}")
+
         except Exception as e:
             error_msg = f"Error in main loop: {e}"
             print(error_msg.encode(sys.stdout.encoding or 'utf-8', errors='replace').decode(sys.stdout.encoding or 'utf-8'))
 
         print(f"\n{'='*60}")
-        print(f"✅ Cycle #{cycle_count} complete - Next cycle in 60s")
+        print(f"✅ Cycle #{cycle_count} complete - " + ("next pass at the scheduler's deadline" if scheduler is not None else "Next cycle in 60s"))
+        print(cycle_pass.report())
         print(f"{'='*60}\n")
         bot_state.save_state()
-        await asyncio.sleep(60)
+        if scheduler is None:
+            await asyncio.sleep(60)
+
+    shutdown_indicator_pool()
+    await close_async_client()
 
 if __name__ == "__main__":
     asyncio.run(main_trading_loop())
\ No newline at end of file
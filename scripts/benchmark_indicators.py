@@ -0,0 +1,322 @@
+"""
+Benchmark: indicator computation.
+
+1. WMA / Hull moving average: compares the original rolling().apply(lambda)
+   WMA with the convolution in data.indicators.calculate_wma, checks that both
+   produce the same HMA to floating-point tolerance, and times them on 350-bar
+   (one live cycle) and 1500-bar (historical mining) inputs.
+2. Streaming engine: replays --cycles consecutive 350-bar frames (one new bar
+   each) through data.streaming_indicators and through the batch functions,
+   checking parity on every frame and timing one cycle of each.
+3. Batch mode: computes every pipeline indicator for --symbols frames one
+   symbol at a time and in one vectorized pass (data.batch_indicators),
+   checks that both agree and times them.
+4. ATR / ADX: compares the original pandas calculate_atr + calculate_adx
+   (nine scratch columns, true range computed twice) with the fused kernel
+   in data.indicators.calculate_adx_atr.
+5. Volume profile: compares the original groupby-based
+   calculate_volume_profile_full with the bincount version (outputs must be
+   identical) and times both.
+
+Usage:
+    python scripts/benchmark_indicators.py [--symbols 100] [--bars 350 1500] [--period 14] [--repeat 5] [--cycles 200]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.indicators import calculate_wma, calculate_hull_moving_average, calculate_adx_atr, calculate_volume_profile_full
+from data.kline_buffer import decode_klines
+from data.streaming_indicators import StreamingIndicators, compute_batch, find_mismatches
+from data.indicator_pipeline import INDICATORS, BATCH_INDICATORS, BOS_COLUMNS, resolve, bos_tail_rows
+from data.batch_indicators import stack_frames
+
+
+def legacy_wma(series, period):
+    """The pre-vectorization calculate_wma, kept here as the baseline."""
+    weights = np.arange(1, period + 1)
+    return series.rolling(period).apply(lambda prices: np.dot(prices, weights) / weights.sum(), raw=True)
+
+
+def legacy_hma(df, period):
+    df[f'hma_{period}'] = legacy_wma(
+        2 * legacy_wma(df['close'], period // 2) - legacy_wma(df['close'], period),
+        int(np.sqrt(period))
+    )
+    return df
+
+
+def legacy_atr_adx(df, atr_period=10, adx_period=14):
+    """The pre-fusion calculate_atr and calculate_adx, kept here as the baseline."""
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    df['atr'] = tr.ewm(alpha=1/atr_period, adjust=False).mean()
+
+    df['H-L'] = df['high'] - df['low']
+    df['H-PC'] = abs(df['high'] - df['close'].shift(1))
+    df['L-PC'] = abs(df['low'] - df['close'].shift(1))
+    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
+    df['+DM'] = np.where((df['high'] - df['high'].shift(1)) > (df['low'].shift(1) - df['low']), df['high'] - df['high'].shift(1), 0)
+    df['-DM'] = np.where((df['low'].shift(1) - df['low']) > (df['high'] - df['high'].shift(1)), df['low'].shift(1) - df['low'], 0)
+    df['+DI'] = 100 * (df['+DM'].ewm(alpha=1/adx_period).mean() / df['TR'].ewm(alpha=1/adx_period).mean())
+    df['-DI'] = 100 * (df['-DM'].ewm(alpha=1/adx_period).mean() / df['TR'].ewm(alpha=1/adx_period).mean())
+    di_sum = df['+DI'] + df['-DI']
+    df['DX'] = 100 * abs(df['+DI'] - df['-DI']) / di_sum.replace(0, np.nan)
+    df['DX'] = df['DX'].fillna(0)
+    df['ADX'] = df['DX'].ewm(alpha=1/adx_period).mean()
+    return df
+
+
+def legacy_volume_profile(df, bins=50):
+    """The pre-bincount calculate_volume_profile_full, kept here as the baseline."""
+    min_price = df['low'].min()
+    max_price = df['high'].max()
+    if min_price == max_price:
+        return min_price, min_price, min_price
+
+    price_bins = np.linspace(min_price, max_price, bins)
+    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    bin_indices = np.digitize(typical_price, price_bins)
+    volume_by_bin = pd.DataFrame({'bin': bin_indices, 'volume': df['volume']}).groupby('bin')['volume'].sum()
+    if volume_by_bin.empty:
+        p = typical_price.iloc[-1]
+        return p, p, p
+
+    poc_bin = int(volume_by_bin.idxmax())
+    target_va_volume = volume_by_bin.sum() * 0.70
+    cumulative = volume_by_bin.get(poc_bin, 0)
+    upper_bin = lower_bin = poc_bin
+    while cumulative < target_va_volume:
+        up_next, down_next = upper_bin + 1, lower_bin - 1
+        up_vol, down_vol = volume_by_bin.get(up_next, 0), volume_by_bin.get(down_next, 0)
+        if up_vol >= down_vol and up_next in volume_by_bin.index:
+            upper_bin = up_next
+            cumulative += up_vol
+        elif down_next in volume_by_bin.index:
+            lower_bin = down_next
+            cumulative += down_vol
+        else:
+            break
+
+    clamp = lambda b: min(max(b - 1, 0), len(price_bins) - 1)
+    return price_bins[clamp(poc_bin)], price_bins[clamp(upper_bin)], price_bins[clamp(lower_bin)]
+
+
+def make_frame(bars, seed):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.003, bars))
+    return pd.DataFrame({'close': closes})
+
+
+def check_parity(frames, period):
+    for df in frames:
+        for p in (period // 2, period, int(np.sqrt(period))):
+            if not np.allclose(legacy_wma(df['close'], p), calculate_wma(df['close'], p), rtol=1e-12, atol=0, equal_nan=True):
+                raise AssertionError(f"WMA({p}) differs from the legacy path")
+        legacy = legacy_hma(df.copy(), period)[f'hma_{period}']
+        fast = calculate_hull_moving_average(df.copy(), period)[f'hma_{period}']
+        if not legacy.isna().equals(fast.isna()):
+            raise AssertionError(f"HMA({period}) warm-up NaNs differ from the legacy path")
+        if not np.allclose(legacy, fast, rtol=1e-12, atol=0, equal_nan=True):
+            raise AssertionError(f"HMA({period}) differs from the legacy path")
+
+
+def time_hma(hma, frames, period, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for df in frames:
+            hma(df, period)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_ohlcv(bars, seed, interval_ms=15 * 60 * 1000):
+    """
+    Random-walk OHLCV frame with the timestamp and price/volume columns
+    decode_klines produces: each bar opens at the previous close and the
+    wicks extend past the body. Built from arrays, so large frames are cheap.
+    """
+    df = make_frame(bars, seed)
+    rng = np.random.default_rng(seed + 1)
+    closes = df['close'].to_numpy()
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    start = 1_700_000_000_000 - 1_700_000_000_000 % interval_ms
+    return pd.DataFrame({
+        'timestamp': (start + np.arange(bars, dtype=np.int64) * interval_ms).view('datetime64[ms]'),
+        'open': opens,
+        'high': np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.002, bars))),
+        'low': np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.002, bars))),
+        'close': closes,
+        'volume': np.abs(rng.normal(1000, 300, bars)),
+    }, copy=False)
+
+
+def make_rows(bars, seed, interval_ms=15 * 60 * 1000):
+    """make_ohlcv as klines in the REST row format, as the live frames are decoded from."""
+    df = make_ohlcv(bars, seed, interval_ms)
+    open_times = df['timestamp'].to_numpy().view(np.int64)
+    opens, highs, lows, closes, volumes = (df[c].to_numpy() for c in ('open', 'high', 'low', 'close', 'volume'))
+    return [[int(open_times[i]), f"{opens[i]:.4f}", f"{highs[i]:.4f}", f"{lows[i]:.4f}", f"{closes[i]:.4f}",
+             f"{volumes[i]:.3f}", int(open_times[i]) + interval_ms - 1, "0", 100, "0", "0", "0"] for i in range(bars)]
+
+
+def benchmark_streaming(cycles, window=350):
+    rows = make_rows(window + cycles, seed=7)
+    frames = [decode_klines(rows[i:i + window]) for i in range(cycles + 1)]
+    engine = StreamingIndicators()
+    engine.apply(frames[0])
+
+    stream_time = batch_time = 0.0
+    for df in frames[1:]:
+        start = time.perf_counter()
+        streamed = engine.apply(df)
+        stream_time += time.perf_counter() - start
+        start = time.perf_counter()
+        compute_batch(df, engine.volume_period, engine.volume_multiplier, engine.bos_period, engine.bos_retest_window,
+                      engine.bos_retest_proximity, engine.bos_retest_wick)
+        batch_time += time.perf_counter() - start
+        mismatches = find_mismatches(engine, streamed)
+        if mismatches:
+            raise AssertionError(f"Streaming indicators differ from the batch functions: {mismatches[0]}")
+
+    print(f"Execution-timeframe indicators, {cycles} cycles of {window} bars (one new bar per cycle):")
+    print(f"  batch functions        : {batch_time / cycles * 1000:8.2f} ms/cycle")
+    print(f"  streaming engine       : {stream_time / cycles * 1000:8.2f} ms/cycle")
+    print(f"  speedup                : {batch_time / stream_time:8.2f}x")
+
+
+def per_symbol_indicators(frames):
+    results = []
+    for df in frames:
+        df = df.copy()
+        for name in resolve(INDICATORS):
+            df = INDICATORS[name][0](df)
+        results.append(df)
+    return results
+
+
+def batch_mode_indicators(frames):
+    panel = stack_frames(frames)
+    for name in resolve(BATCH_INDICATORS):
+        panel.update(BATCH_INDICATORS[name](panel))
+    return panel
+
+
+def benchmark_batch(symbols, window=350, repeat=3):
+    frames = [decode_klines(make_rows(window, seed)) for seed in range(symbols)]
+    reference = per_symbol_indicators(frames)
+    panel = batch_mode_indicators(frames)
+    for row, df in enumerate(reference):
+        for name in INDICATORS:
+            for column in INDICATORS[name][2]:
+                expected, actual = df[column].to_numpy(), panel[column][row]
+                if column in BOS_COLUMNS:
+                    # The per-symbol path evaluates BOS on the rows the strategies read only
+                    expected, actual = expected[-bos_tail_rows():], actual[-bos_tail_rows():]
+                if expected.dtype == bool:
+                    matches = np.array_equal(expected, actual)
+                else:
+                    # Absolute tolerance on the price scale: pandas' online rolling variance leaves ~1e-13 noise
+                    matches = np.allclose(expected, actual, rtol=1e-9, atol=1e-9 * df['close'].abs().max(), equal_nan=True)
+                if not matches:
+                    raise AssertionError(f"Batch {column} differs from the per-symbol functions for symbol {row}")
+
+    per_symbol_time = batch_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        per_symbol_indicators(frames)
+        per_symbol_time = min(per_symbol_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        batch_mode_indicators(frames)
+        batch_time = min(batch_time, time.perf_counter() - start)
+
+    print(f"All pipeline indicators, {symbols} symbols x {window} bars (best of {repeat}):")
+    print(f"  one symbol at a time   : {per_symbol_time * 1000:8.1f} ms")
+    print(f"  batched 2D panel       : {batch_time * 1000:8.1f} ms")
+    print(f"  speedup                : {per_symbol_time / batch_time:8.2f}x")
+
+
+def benchmark_atr_adx(symbols, window=350, repeat=3):
+    frames = [decode_klines(make_rows(window, seed)) for seed in range(symbols)]
+    for df in frames:
+        legacy = legacy_atr_adx(df.copy())
+        fused = calculate_adx_atr(df.copy())
+        for column in ('atr', 'ADX'):
+            if not np.allclose(legacy[column], fused[column], rtol=1e-9, atol=0, equal_nan=True):
+                raise AssertionError(f"Fused {column} differs from the legacy path")
+
+    legacy_time = fused_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for df in frames:
+            legacy_atr_adx(df.copy())
+        legacy_time = min(legacy_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        for df in frames:
+            calculate_adx_atr(df.copy())
+        fused_time = min(fused_time, time.perf_counter() - start)
+
+    print(f"ATR + ADX on {symbols} symbols x {window} bars (best of {repeat}):")
+    print(f"  legacy pandas          : {legacy_time * 1000:8.1f} ms")
+    print(f"  fused kernel           : {fused_time * 1000:8.1f} ms")
+    print(f"  speedup                : {legacy_time / fused_time:8.2f}x")
+
+
+def benchmark_volume_profile(symbols, window=350, repeat=3):
+    frames = [decode_klines(make_rows(window, seed)) for seed in range(symbols)]
+    for df in frames:
+        if tuple(legacy_volume_profile(df)) != tuple(calculate_volume_profile_full(df)):
+            raise AssertionError("Volume profile differs from the legacy path")
+
+    legacy_time = fast_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for df in frames:
+            legacy_volume_profile(df)
+        legacy_time = min(legacy_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        for df in frames:
+            calculate_volume_profile_full(df)
+        fast_time = min(fast_time, time.perf_counter() - start)
+
+    print(f"Volume profile on {symbols} symbols x {window} bars (best of {repeat}):")
+    print(f"  legacy groupby         : {legacy_time * 1000:8.1f} ms")
+    print(f"  bincount               : {fast_time * 1000:8.1f} ms")
+    print(f"  speedup                : {legacy_time / fast_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark indicator implementations.")
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--bars', type=int, nargs='+', default=[350, 1500])
+    parser.add_argument('--period', type=int, default=14)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cycles', type=int, default=200)
+    args = parser.parse_args()
+
+    for bars in args.bars:
+        frames = [make_frame(bars, seed) for seed in range(args.symbols)]
+        check_parity(frames, args.period)
+
+        legacy_time = time_hma(legacy_hma, frames, args.period, args.repeat)
+        fast_time = time_hma(calculate_hull_moving_average, frames, args.period, args.repeat)
+
+        print(f"HMA({args.period}) on {args.symbols} symbols x {bars} bars (best of {args.repeat}):")
+        print(f"  legacy rolling().apply : {legacy_time * 1000:8.1f} ms  ({legacy_time / args.symbols * 1e6:7.1f} us/symbol)")
+        print(f"  convolution            : {fast_time * 1000:8.1f} ms  ({fast_time / args.symbols * 1e6:7.1f} us/symbol)")
+        print(f"  speedup                : {legacy_time / fast_time:8.2f}x")
+
+    benchmark_streaming(args.cycles)
+    benchmark_batch(args.symbols)
+    benchmark_atr_adx(args.symbols)
+    benchmark_volume_profile(args.symbols)
@@ -0,0 +1,90 @@
+"""
+Benchmark: kline decoding (REST rows -> DataFrame).
+
+Compares the original object-DataFrame path (12 string columns, then
+pd.to_datetime + astype(float)) with data.kline_buffer.decode_klines on
+synthetic payloads shaped like one cycle of the bot: 500 symbols x 350 bars.
+
+Usage:
+    python scripts/benchmark_kline_decode.py [--symbols 500] [--bars 350] [--repeat 5]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.kline_buffer import decode_klines
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_volume', 'trades', 'taker_base', 'taker_quote', 'ignore']
+
+
+def legacy_decode(klines):
+    """The pre-numpy fetch_klines decoding, kept here as the baseline."""
+    df = pd.DataFrame(klines, columns=COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    return df
+
+
+def make_payload(bars, seed, interval_ms=15 * 60 * 1000):
+    """Random-walk klines in the exact REST format (strings for decimals)."""
+    rng = np.random.default_rng(seed)
+    start = 1_700_000_000_000 - 1_700_000_000_000 % interval_ms
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.003, bars))
+    opens = np.concatenate(([100.0], closes[:-1]))
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.002, bars)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.002, bars)))
+    volumes = np.abs(rng.normal(1000, 300, bars))
+    trades = rng.integers(10, 500, bars)
+    rows = []
+    for i in range(bars):
+        t = start + i * interval_ms
+        rows.append([
+            t, f"{opens[i]:.4f}", f"{highs[i]:.4f}", f"{lows[i]:.4f}", f"{closes[i]:.4f}", f"{volumes[i]:.3f}",
+            t + interval_ms - 1, f"{volumes[i] * closes[i]:.4f}", int(trades[i]),
+            f"{volumes[i] / 2:.3f}", f"{volumes[i] * closes[i] / 2:.4f}", "0",
+        ])
+    return rows
+
+
+def check_parity(payload):
+    legacy = legacy_decode(payload)
+    fast = decode_klines(payload)
+    for column in ['timestamp', 'open', 'high', 'low', 'close', 'volume']:
+        if not legacy[column].equals(fast[column]):
+            raise AssertionError(f"Decoded column '{column}' differs from the legacy path")
+
+
+def time_decoder(decode, payloads, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for rows in payloads:
+            decode(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark kline decoding paths.")
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--bars', type=int, default=350)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = [make_payload(args.bars, seed) for seed in range(args.symbols)]
+    check_parity(payloads[0])
+
+    legacy_time = time_decoder(legacy_decode, payloads, args.repeat)
+    fast_time = time_decoder(decode_klines, payloads, args.repeat)
+
+    print(f"Decoding {args.symbols} symbols x {args.bars} bars (best of {args.repeat}):")
+    print(f"  legacy object DataFrame : {legacy_time * 1000:8.1f} ms  ({legacy_time / args.symbols * 1e6:7.1f} us/symbol)")
+    print(f"  numpy decode_klines     : {fast_time * 1000:8.1f} ms  ({fast_time / args.symbols * 1e6:7.1f} us/symbol)")
+    print(f"  speedup                 : {legacy_time / fast_time:8.2f}x")
@@ -0,0 +1,255 @@
+"""
+Local HTTP stand-in for the Binance USD-M futures REST API.
+
+Serves the endpoints the bot calls so src/async_client.py (and anything else
+speaking the REST API) can be exercised without touching the exchange.
+Signed endpoints verify the HMAC signature against --secret, orders are kept
+in memory, and MARKET orders fill immediately at the synthetic mark price.
+Like the exchange, /fapi/v1/order rejects conditional types (STOP_MARKET,
+TAKE_PROFIT_MARKET, ...); those go through POST /fapi/v1/algoOrder with
+algoType=CONDITIONAL and triggerPrice, and are listed by openAlgoOrders.
+Every response carries X-MBX-USED-WEIGHT-1M (one unit per request), and
+requests beyond --weight-limit in a minute get a 429 with Retry-After.
+
+    ASYNC_CLIENT_BASE_URL = 'http://127.0.0.1:8766'
+
+Usage:
+    python scripts/exchange_stub_server.py [--port 8766] [--secret SECRET] [--latency 0.05] [--weight-limit 2400]
+"""
+
+import sys
+import os
+import json
+import hmac
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONDITIONAL_ORDER_TYPES = {'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET', 'TRAILING_STOP_MARKET'}
+
+INTERVAL_MS = {'1m': 60000, '5m': 300000, '15m': 900000, '1h': 3600000, '4h': 14400000, '1d': 86400000}
+
+
+class StubExchange:
+    def __init__(self, secret, balance=1000.0, weight_limit=2400):
+        self.secret = secret.encode()
+        self.balance = balance
+        self.weight_limit = weight_limit
+        self.weight_minute = 0
+        self.used_weight = 0
+        self.positions = {}      # symbol -> signed quantity
+        self.entry_prices = {}
+        self.open_orders = {}    # orderId -> order
+        self.algo_orders = {}    # algoId -> conditional order
+        self.next_order_id = 1
+        self.lock = threading.Lock()
+
+    def mark_price(self, symbol):
+        # Deterministic per-symbol price with a slow drift so repeated reads differ
+        base = 10 + (sum(ord(c) for c in symbol) % 90)
+        return round(base * (1 + 0.001 * ((int(time.time()) // 60) % 10)), 4)
+
+    def klines(self, symbol, interval, limit, start_time=None):
+        interval_ms = INTERVAL_MS[interval]
+        now = int(time.time() * 1000)
+        last_open = now - now % interval_ms
+        first_open = start_time - start_time % interval_ms if start_time else last_open - (limit - 1) * interval_ms
+        price = self.mark_price(symbol)
+        rows = []
+        open_time = first_open
+        while open_time <= last_open and len(rows) < limit:
+            wiggle = ((open_time // interval_ms) % 7 - 3) * 0.001
+            o, c = price * (1 + wiggle), price * (1 - wiggle)
+            rows.append([open_time, f"{o:.4f}", f"{max(o, c) * 1.001:.4f}", f"{min(o, c) * 0.999:.4f}", f"{c:.4f}",
+                         "1000.000", open_time + interval_ms - 1, f"{1000 * c:.4f}", 100, "500.000", f"{500 * c:.4f}", "0"])
+            open_time += interval_ms
+        return rows
+
+    def create_order(self, params):
+        symbol, side, order_type = params['symbol'], params['side'], params['type']
+        with self.lock:
+            order_id = self.next_order_id
+            self.next_order_id += 1
+            order = {'orderId': order_id, 'symbol': symbol, 'side': side, 'type': order_type, 'status': 'NEW',
+                     'origQty': params.get('quantity', '0'), 'stopPrice': params.get('stopPrice', '0'),
+                     'avgPrice': '0', 'reduceOnly': params.get('reduceOnly') == 'true',
+                     'closePosition': params.get('closePosition') == 'true', 'updateTime': int(time.time() * 1000)}
+            if order_type == 'MARKET':
+                qty = float(params['quantity']) * (1 if side == 'BUY' else -1)
+                price = self.mark_price(symbol)
+                self.positions[symbol] = self.positions.get(symbol, 0.0) + qty
+                self.entry_prices[symbol] = price
+                order.update(status='FILLED', avgPrice=str(price), executedQty=params['quantity'])
+                if self.positions[symbol] == 0:
+                    self.positions.pop(symbol)
+            else:
+                self.open_orders[order_id] = order
+        return order
+
+    def create_algo_order(self, params):
+        if params['algoType'] != 'CONDITIONAL' or params['type'] not in CONDITIONAL_ORDER_TYPES:
+            raise ValueError(f"algoType={params['algoType']} type={params['type']}")
+        trigger_price = params['triggerPrice'] if params['type'] != 'TRAILING_STOP_MARKET' else params.get('activatePrice', '0')
+        with self.lock:
+            algo_id = self.next_order_id
+            self.next_order_id += 1
+            order = {'algoId': algo_id, 'algoType': 'CONDITIONAL', 'symbol': params['symbol'], 'side': params['side'],
+                     'orderType': params['type'], 'algoStatus': 'NEW', 'quantity': params.get('quantity', '0'),
+                     'triggerPrice': trigger_price, 'reduceOnly': params.get('reduceOnly') == 'true',
+                     'closePosition': params.get('closePosition') == 'true', 'updateTime': int(time.time() * 1000)}
+            self.algo_orders[algo_id] = order
+        return order
+
+    def position_risk(self, symbol=None):
+        with self.lock:
+            symbols = [symbol] if symbol else list(self.positions)
+            return [{'symbol': s, 'positionAmt': str(self.positions.get(s, 0.0)), 'entryPrice': str(self.entry_prices.get(s, 0.0)),
+                     'markPrice': str(self.mark_price(s)), 'unRealizedProfit': '0.0', 'leverage': '5', 'marginType': 'isolated'}
+                    for s in symbols]
+
+    def route(self, method, path, params):
+        """Returns (status, payload) for one request."""
+        symbol = params.get('symbol')
+        if path == '/fapi/v1/klines':
+            return 200, self.klines(symbol, params['interval'], int(params.get('limit', 500)),
+                                    int(params['startTime']) if 'startTime' in params else None)
+        if path == '/fapi/v1/premiumIndex':
+            rows = [{'symbol': s, 'markPrice': str(self.mark_price(s)), 'lastFundingRate': '0.0001'} for s in ([symbol] if symbol else ['BTCUSDT', 'ETHUSDT'])]
+            return 200, rows[0] if symbol else rows
+        if path == '/fapi/v1/depth':
+            price = self.mark_price(symbol)
+            return 200, {'bids': [[f"{price * (1 - 0.0001 * i):.4f}", "10"] for i in range(1, 51)],
+                         'asks': [[f"{price * (1 + 0.0001 * i):.4f}", "10"] for i in range(1, 51)]}
+        if path == '/fapi/v1/exchangeInfo':
+            return 200, {'symbols': [{'symbol': s, 'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': '0.0001'},
+                {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001'},
+                {'filterType': 'MIN_NOTIONAL', 'notional': '5'}]} for s in ['BTCUSDT', 'ETHUSDT']]}
+        if path == '/fapi/v2/positionRisk':
+            return 200, self.position_risk(symbol)
+        if path == '/fapi/v2/balance':
+            return 200, [{'asset': 'USDT', 'balance': str(self.balance), 'availableBalance': str(self.balance)}]
+        if path == '/fapi/v1/userTrades':
+            return 200, []
+        if path == '/fapi/v1/leverageBracket':
+            return 200, [{'symbol': symbol, 'brackets': [{'bracket': 1, 'initialLeverage': 20}]}]
+        if path == '/fapi/v1/leverage':
+            return 200, {'symbol': symbol, 'leverage': int(params['leverage'])}
+        if path == '/fapi/v1/marginType':
+            return 400, {'code': -4046, 'msg': 'No need to change margin type.'}
+        if path == '/fapi/v1/openOrders':
+            with self.lock:
+                return 200, [o for o in self.open_orders.values() if o['symbol'] == symbol]
+        if path == '/fapi/v1/openAlgoOrders':
+            with self.lock:
+                return 200, [o for o in self.algo_orders.values() if not symbol or o['symbol'] == symbol]
+        if path == '/fapi/v1/order' and method == 'POST':
+            if params['type'] in CONDITIONAL_ORDER_TYPES:
+                return 400, {'code': -4120, 'msg': 'Order type not supported for this endpoint. '
+                                                   'Please use the Algo Order API endpoints instead.'}
+            return 200, self.create_order(params)
+        if path == '/fapi/v1/algoOrder' and method == 'POST':
+            return 200, self.create_algo_order(params)
+        if path == '/fapi/v1/order' and method == 'DELETE':
+            with self.lock:
+                order = self.open_orders.pop(int(params.get('orderId', 0)), None)
+            if order is None:
+                return 400, {'code': -2011, 'msg': 'Unknown order sent.'}
+            return 200, dict(order, status='CANCELED')
+        if path == '/fapi/v1/algoOrder' and method == 'DELETE':
+            with self.lock:
+                order = self.algo_orders.pop(int(params.get('algoId', 0)), None)
+            if order is None:
+                return 400, {'code': -2011, 'msg': 'Unknown order sent.'}
+            return 200, dict(order, algoStatus='CANCELED')
+        if path == '/fapi/v1/allOpenOrders':
+            with self.lock:
+                for order_id in [i for i, o in self.open_orders.items() if o['symbol'] == symbol]:
+                    self.open_orders.pop(order_id)
+                for algo_id in [i for i, o in self.algo_orders.items() if o['symbol'] == symbol]:
+                    self.algo_orders.pop(algo_id)
+            return 200, {'code': 200, 'msg': 'The operation of cancel all open order is done.'}
+        return 404, {'code': -1000, 'msg': f'Unknown endpoint {method} {path}'}
+
+    def use_weight(self):
+        """Counts one request against the current minute; returns the used weight."""
+        with self.lock:
+            minute = int(time.time() // 60)
+            if minute != self.weight_minute:
+                self.weight_minute, self.used_weight = minute, 0
+            self.used_weight += 1
+            return self.used_weight
+
+    def verify(self, query):
+        if '&signature=' not in query:
+            return False
+        payload, signature = query.rsplit('&signature=', 1)
+        expected = hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+
+def make_handler(exchange, latency):
+    signed_prefixes = ('/fapi/v2/', '/fapi/v1/order', '/fapi/v1/allOpenOrders', '/fapi/v1/openOrders', '/fapi/v1/openAlgoOrders',
+                       '/fapi/v1/algoOrder', '/fapi/v1/userTrades', '/fapi/v1/leverage', '/fapi/v1/marginType')
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, so connection pooling is exercised
+
+        def _handle(self, method):
+            parts = urlsplit(self.path)
+            if latency:
+                time.sleep(latency)
+            used_weight = exchange.use_weight()
+            headers = {'X-MBX-USED-WEIGHT-1M': str(used_weight)}
+            if used_weight > exchange.weight_limit:
+                status, payload = 429, {'code': -1003, 'msg': 'Too many requests; current limit is exceeded.'}
+                headers['Retry-After'] = str(60 - int(time.time()) % 60)
+            elif parts.path.startswith(signed_prefixes) and not exchange.verify(parts.query):
+                status, payload = 401, {'code': -1022, 'msg': 'Signature for this request is not valid.'}
+            else:
+                try:
+                    status, payload = exchange.route(method, parts.path, dict(parse_qsl(parts.query)))
+                except (KeyError, ValueError) as e:
+                    status, payload = 400, {'code': -1102, 'msg': f'Mandatory parameter missing or malformed: {e}'}
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Binance futures REST API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--secret', default='stub-secret', help="API secret the signatures are checked against")
+    parser.add_argument('--balance', type=float, default=1000.0)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to delay every response")
+    parser.add_argument('--weight-limit', type=int, default=2400, help="Requests per minute before answering 429")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubExchange(args.secret, args.balance, args.weight_limit), args.latency))
+    print(f"Stub exchange listening on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,121 @@
+"""
+Parity check: compiled indicator kernels vs. the pandas / numpy reference.
+
+Computes the stochastic, RSI, ATR/ADX (per frame and on a 2D panel), VWAP,
+BOS (whole history and the live tail) and candlestick patterns on random-walk
+klines with the reference implementation and with the selected backend of
+data/indicator_backend.py, compares every column and times both.
+
+Usage:
+    python scripts/indicator_backend_parity_check.py [--backend numba] [--symbols 20] [--bars 350 5000] [--repeat 3]
+
+Exits with status 1 if any column differs or the backend is unavailable.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import indicator_backend
+from data.indicators import (
+    PERIOD, K, D, calculate_stoch, calculate_rsi, calculate_adx_atr, atr_adx_kernel, calculate_vwap,
+    calculate_bos, add_candlestick_patterns,
+)
+from data.kline_buffer import decode_klines
+from scripts.benchmark_indicators import make_rows
+
+RTOL = 1e-9
+ATOL = 1e-12
+
+
+def _stoch(df):
+    return dict(zip(('stoch_k', 'stoch_d'), calculate_stoch(df['high'], df['low'], df['close'], PERIOD, K, D)))
+
+
+def _panel_atr_adx(df):
+    # The same frame three times as a (symbols, bars) panel, as the batch mode calls the kernel
+    high, low, close = (np.vstack([df[column].to_numpy()] * 3) for column in ('high', 'low', 'close'))
+    atr, adx = atr_adx_kernel(high, low, close)
+    return {'panel_atr': atr, 'panel_ADX': adx}
+
+
+def _columns(function, columns):
+    return lambda df: {column: function(df.copy())[column] for column in columns}
+
+
+# name -> function(df) -> {column: values}
+CHECKS = {
+    'stoch':       _stoch,
+    'rsi':         _columns(calculate_rsi, ('rsi',)),
+    'atr_adx':     _columns(calculate_adx_atr, ('atr', 'ADX')),
+    'atr_adx_2d':  _panel_atr_adx,
+    'vwap':        _columns(lambda df: calculate_vwap(df, period=288), ('vwap',)),
+    'bos':         _columns(calculate_bos, ('recent_high', 'recent_low', 'bos_level_long', 'bos_level_short',
+                                            'bos_retest_long', 'bos_retest_short')),
+    'bos_tail':    _columns(lambda df: calculate_bos(df, tail=14), ('recent_high', 'recent_low', 'bos_retest_long',
+                                                                    'bos_retest_short')),
+    'candlestick': _columns(add_candlestick_patterns, ('bullish_pattern', 'bearish_pattern')),
+}
+
+
+def run(backend, frames, repeat):
+    """{check: ([{column: values} per frame], best time)} with the given backend active."""
+    if indicator_backend.set_backend(backend) != backend:
+        sys.exit(f"Backend '{backend}' is not available")
+    results = {}
+    for name, check in CHECKS.items():
+        outputs = [check(df) for df in frames]  # also triggers compilation before timing
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for df in frames:
+                check(df)
+            best = min(best, time.perf_counter() - start)
+        results[name] = (outputs, best)
+    return results
+
+
+def compare(reference, candidate):
+    mismatches = []
+    for name, (expected_frames, _) in reference.items():
+        for i, (expected, actual) in enumerate(zip(expected_frames, candidate[name][0])):
+            for column, values in expected.items():
+                a = np.asarray(values, dtype=np.float64)
+                b = np.asarray(actual[column], dtype=np.float64)
+                if a.shape != b.shape or not np.allclose(a, b, rtol=RTOL, atol=ATOL, equal_nan=True):
+                    mismatches.append(f"{name} frame {i}: '{column}' differs (max abs diff {np.nanmax(np.abs(a - b)) if a.shape == b.shape else 'shape'})")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare a compiled indicator backend against the reference.")
+    parser.add_argument('--backend', default='numba', choices=[name for name in indicator_backend.BACKENDS if name != 'numpy'])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--bars', type=int, nargs='+', default=[350, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for bars in args.bars:
+        frames = [decode_klines(make_rows(bars, seed)) for seed in range(args.symbols)]
+        reference = run('numpy', frames, args.repeat)
+        candidate = run(args.backend, frames, args.repeat)
+
+        print(f"{args.symbols} symbols x {bars} bars (best of {args.repeat}):")
+        for name in CHECKS:
+            reference_time, candidate_time = reference[name][1], candidate[name][1]
+            print(f"  {name:<12} numpy {reference_time * 1000:8.1f} ms   {args.backend} {candidate_time * 1000:8.1f} ms"
+                  f"   {reference_time / candidate_time:6.2f}x")
+
+        mismatches = compare(reference, candidate)
+        for mismatch in mismatches:
+            print(f"  MISMATCH {mismatch}")
+        failed = failed or bool(mismatches)
+
+    indicator_backend.set_backend('numpy')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,256 @@
+"""
+Benchmark suite: time and peak memory of each indicator, with saved baselines.
+
+Runs calculate_stoch, calculate_rsi, calculate_adx, calculate_bos (whole
+history and the live tail), calculate_volume_profile_full,
+calculate_hull_moving_average and add_candlestick_patterns on the seeded
+random-walk frames of scripts/benchmark_indicators.py (make_ohlcv) for every
+combination of --bars and --symbols, once per indicator backend in
+--backends (data/indicator_backend.py). A backend that cannot be loaded
+(numba not installed) is skipped with a note.
+Frames are generated per symbol and call, so the 50k-bar x 500-symbol case
+does not hold the whole universe in memory; generation is not timed.
+
+For each case and indicator it reports:
+    time       best of --repeat passes over all symbols (wall clock, total)
+    per symbol time / symbols
+    peak       largest tracemalloc peak of a single call (a separate,
+               untimed pass, since tracing slows allocation down)
+
+Every backend other than numpy is also checked against the numpy reference
+on the first frame of each case (rtol 1e-9, atol 1e-12, as
+scripts/indicator_backend_parity_check.py); a mismatch fails the run.
+
+--save writes the results as a JSON baseline; --baseline compares against
+one and flags a case whose time or peak grew by more than --tolerance /
+--memory-tolerance, backend by backend. Baselines are only comparable on the
+same machine.
+
+Usage:
+    python scripts/indicator_benchmark_suite.py --save logs/indicator_baseline.json
+    python scripts/indicator_benchmark_suite.py --baseline logs/indicator_baseline.json [--tolerance 0.25]
+    python scripts/indicator_benchmark_suite.py --bars 350 1500 --symbols 1 100 --indicators rsi bos_tail
+    python scripts/indicator_benchmark_suite.py --backends numba
+
+Exits with status 1 if any regression or backend mismatch is flagged.
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.indicators import (
+    PERIOD, K, D, calculate_stoch, calculate_rsi, calculate_adx, calculate_bos, calculate_volume_profile_full,
+    calculate_hull_moving_average, add_candlestick_patterns,
+)
+from data import indicator_backend
+from scripts.benchmark_indicators import make_ohlcv
+
+REFERENCE_BACKEND = 'numpy'
+RTOL = 1e-9
+ATOL = 1e-12
+
+# name -> function(df); each gets a freshly generated frame
+INDICATORS = {
+    'stoch':          lambda df: calculate_stoch(df['high'], df['low'], df['close'], PERIOD, K, D),
+    'rsi':            calculate_rsi,
+    'adx':            calculate_adx,
+    'bos':            calculate_bos,
+    'bos_tail':       lambda df: calculate_bos(df, tail=14),
+    'volume_profile': lambda df: calculate_volume_profile_full(df, bins=50),
+    'hma_14':         lambda df: calculate_hull_moving_average(df, period=14),
+    'candlestick':    add_candlestick_patterns,
+}
+
+
+def time_indicator(function, bars, symbols, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        elapsed = 0.0
+        for seed in range(symbols):
+            df = make_ohlcv(bars, seed)
+            start = time.perf_counter()
+            function(df)
+            elapsed += time.perf_counter() - start
+        best = min(best, elapsed)
+    return best
+
+
+def peak_memory(function, bars, symbols):
+    """Largest tracemalloc peak of one call, excluding the input frame."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for seed in range(symbols):
+            df = make_ohlcv(bars, seed)
+            gc.collect()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            function(df)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+            del df
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _outputs(result):
+    """Output arrays of an indicator call: frame columns, or the items of a tuple result."""
+    if isinstance(result, pd.DataFrame):
+        return {column: result[column].to_numpy() for column in result.columns}
+    if isinstance(result, tuple):
+        return {i: np.asarray(item) for i, item in enumerate(result)}
+    return {0: np.asarray(result)}
+
+
+def compare_to_reference(function, bars, backend):
+    """Outputs of `function` under `backend` that differ from the numpy reference on one frame."""
+    indicator_backend.set_backend(REFERENCE_BACKEND)
+    expected = _outputs(function(make_ohlcv(bars, 0)))
+    indicator_backend.set_backend(backend)
+    actual = _outputs(function(make_ohlcv(bars, 0)))
+    mismatches = []
+    for key, want in expected.items():
+        got = actual.get(key)
+        if got is None:
+            mismatches.append(f"{key}: missing")
+        elif want.dtype.kind in 'fiub' and got.dtype.kind in 'fiub':
+            if want.shape != got.shape or not np.allclose(got, want, rtol=RTOL, atol=ATOL, equal_nan=True):
+                mismatches.append(str(key))
+        elif not np.array_equal(got, want):
+            mismatches.append(str(key))
+    return mismatches
+
+
+def run_suite(bar_sizes, symbol_counts, names, repeat, backend=REFERENCE_BACKEND):
+    """{case: {indicator: {'seconds', 'per_symbol_us', 'peak_kib'}}} for every bars x symbols case.
+
+    Outside the reference backend each entry also carries 'mismatches', the
+    outputs that differ from the numpy reference.
+    """
+    results = {}
+    for bars in bar_sizes:
+        for symbols in symbol_counts:
+            case = f"{bars}x{symbols}"
+            results[case] = {}
+            print(f"[{backend}] {bars} bars x {symbols} symbols (best of {repeat}):")
+            for name in names:
+                function = INDICATORS[name]
+                indicator_backend.set_backend(backend)
+                function(make_ohlcv(bars, 0))  # warm-up: imports, kernel compilation
+                seconds = time_indicator(function, bars, symbols, repeat)
+                # Peak memory is a per-call figure; a few symbols are enough
+                peak = peak_memory(function, bars, min(symbols, 3))
+                results[case][name] = {
+                    'seconds': seconds,
+                    'per_symbol_us': seconds / symbols * 1e6,
+                    'peak_kib': peak / 1024,
+                }
+                note = ''
+                if backend != REFERENCE_BACKEND:
+                    mismatches = compare_to_reference(function, bars, backend)
+                    results[case][name]['mismatches'] = mismatches
+                    note = f"  MISMATCH {', '.join(mismatches)}" if mismatches else "  matches numpy"
+                print(f"  {name:<15} {seconds * 1000:10.1f} ms  {seconds / symbols * 1e6:10.1f} us/symbol"
+                      f"  peak {peak / 1024:10.1f} KiB{note}")
+    return results
+
+
+def find_regressions(results, baseline, tolerance, memory_tolerance):
+    """Descriptions of every backend/case/indicator that is slower or larger than the baseline allows."""
+    regressions = []
+    for backend, cases in results.items():
+        for case, indicators in cases.items():
+            for name, current in indicators.items():
+                previous = baseline.get('results', {}).get(backend, {}).get(case, {}).get(name)
+                if previous is None:
+                    continue
+                label = f"[{backend}] {case} {name}"
+                if current['seconds'] > previous['seconds'] * (1 + tolerance):
+                    regressions.append(f"{label}: time {previous['seconds'] * 1000:.1f} ms -> {current['seconds'] * 1000:.1f} ms "
+                                       f"({current['seconds'] / previous['seconds']:.2f}x)")
+                if current['peak_kib'] > previous['peak_kib'] * (1 + memory_tolerance) + 1:
+                    regressions.append(f"{label}: peak {previous['peak_kib']:.1f} KiB -> {current['peak_kib']:.1f} KiB")
+    return regressions
+
+
+def find_mismatches(results):
+    """Descriptions of every backend/case/indicator whose outputs differ from the numpy reference."""
+    return [f"[{backend}] {case} {name}: {', '.join(current['mismatches'])}"
+            for backend, cases in results.items()
+            for case, indicators in cases.items()
+            for name, current in indicators.items()
+            if current.get('mismatches')]
+
+
+def environment(backends):
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'backends': backends,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and measure the peak memory of each indicator.")
+    parser.add_argument('--bars', type=int, nargs='+', default=[350, 1500, 50000])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 100, 500])
+    parser.add_argument('--indicators', nargs='+', choices=list(INDICATORS), default=list(INDICATORS))
+    parser.add_argument('--backends', nargs='+', choices=list(indicator_backend.BACKENDS),
+                        default=list(indicator_backend.BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="Write the results as a JSON baseline to this path")
+    parser.add_argument('--baseline', help="Compare against a JSON baseline written by --save")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown (default 0.25)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.10, help="Allowed relative peak growth (default 0.10)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for backend in args.backends:
+        if indicator_backend.set_backend(backend) != backend:
+            print(f"Skipping the {backend} backend: it is not available here")
+            continue
+        results[backend] = run_suite(args.bars, args.symbols, args.indicators, args.repeat, backend)
+    report = {'environment': environment(list(results)), 'results': results}
+
+    mismatches = find_mismatches(results)
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    regressions = []
+    if baseline is not None:
+        missing = [backend for backend in baseline.get('environment', {}).get('backends', []) if backend not in results]
+        if missing:
+            print(f"Note: the baseline also covers {', '.join(missing)}, not run here")
+        regressions = find_regressions(results, baseline, args.tolerance, args.memory_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if not regressions:
+            print(f"No regressions against {args.baseline}")
+    sys.exit(1 if regressions or mismatches else 0)
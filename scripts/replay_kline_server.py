@@ -0,0 +1,96 @@
+"""
+Local WebSocket stand-in for the Binance combined kline stream.
+
+Replays recorded klines so the streaming market-data mode can be exercised
+without touching the exchange. Point the bot at it with:
+
+    KLINE_STREAM_URL = 'ws://127.0.0.1:8765'
+
+Recording formats accepted (one file per run):
+    - JSON lines of raw combined-stream messages ({"stream": ..., "data": {...}})
+    - A JSON object mapping "SYMBOL@interval" to REST kline arrays, e.g. the
+      output of client.futures_klines(); each bar is replayed as a closed event.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rest_klines_to_messages(symbol, interval, klines):
+    """Turns REST kline rows into the combined-stream messages Binance would have sent."""
+    messages = []
+    for row in klines:
+        messages.append({
+            'stream': f"{symbol.lower()}@kline_{interval}",
+            'data': {
+                'e': 'kline', 'E': int(row[6]), 's': symbol,
+                'k': {
+                    't': int(row[0]), 'T': int(row[6]), 's': symbol, 'i': interval,
+                    'o': row[1], 'h': row[2], 'l': row[3], 'c': row[4], 'v': row[5],
+                    'n': int(row[8]), 'x': True, 'q': row[7], 'V': row[9], 'Q': row[10], 'B': row[11],
+                },
+            },
+        })
+    return messages
+
+
+def load_recording(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        recording = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if isinstance(recording, dict) and 'stream' not in recording:
+        messages = []
+        for key, klines in recording.items():
+            symbol, interval = key.split('@')
+            messages.extend(rest_klines_to_messages(symbol.upper(), interval, klines))
+        # Interleave symbols the way a live stream would
+        return sorted(messages, key=lambda m: m['data']['E'])
+    return recording if isinstance(recording, list) else [recording]
+
+
+async def serve(messages, host, port, delay, loop_forever):
+    import websockets
+
+    async def handler(ws, path=None):
+        # Only replay the streams the client subscribed to
+        request_path = path if path is not None else ws.request.path
+        query = request_path.split('streams=', 1)[-1]
+        wanted = set(query.split('/')) if 'streams=' in request_path else None
+        print(f"Client connected: {len(wanted) if wanted else 'all'} stream(s)")
+        try:
+            while True:
+                for message in messages:
+                    if wanted is None or message['stream'] in wanted:
+                        await ws.send(json.dumps(message))
+                        if delay:
+                            await asyncio.sleep(delay)
+                if not loop_forever:
+                    break
+            await ws.wait_closed()
+        except websockets.ConnectionClosed:
+            print("Client disconnected")
+
+    async with websockets.serve(handler, host, port):
+        print(f"Replaying {len(messages)} kline events on ws://{host}:{port}/stream")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded klines over a local WebSocket.")
+    parser.add_argument('recording', help="Path to the recorded klines file")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait between events")
+    parser.add_argument('--loop', action='store_true', help="Restart the replay when it reaches the end")
+    args = parser.parse_args()
+
+    asyncio.run(serve(load_recording(args.recording), args.host, args.port, args.delay, args.loop))
@@ -0,0 +1,107 @@
+"""
+Parity check: resampled higher-timeframe bars vs. exchange bars.
+
+Rebuilds 1h/4h (or any resamplable interval) klines from base-timeframe klines
+with data/resampler.py and compares every closed bar field by field against
+the bars Binance returned for the same period.
+
+Usage:
+    # Recorded data: JSON object mapping "SYMBOL@interval" to REST kline arrays
+    python scripts/resample_parity_check.py --recording logs/klines_recording.json --base 15m --targets 1h 4h
+
+    # Live data via the configured client (also writes the recording for reuse)
+    python scripts/resample_parity_check.py --live BTCUSDT ETHUSDT --base 15m --targets 1h 4h --save logs/klines_recording.json
+
+Exits with status 1 if any bar differs.
+"""
+
+import sys
+import os
+import json
+import argparse
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.resampler import can_resample, resample_klines
+
+FIELDS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+          'quote_volume', 'trades', 'taker_base', 'taker_quote']
+
+
+def record_live(symbols, base, targets):
+    from config.client import client
+
+    recording = {}
+    for symbol in symbols:
+        base_rows = client.futures_klines(symbol=symbol, interval=base, limit=1500)
+        recording[f"{symbol}@{base}"] = base_rows
+        start_time = int(base_rows[0][0])
+        for target in targets:
+            recording[f"{symbol}@{target}"] = client.futures_klines(symbol=symbol, interval=target, startTime=start_time, limit=1500)
+    return recording
+
+
+def compare(symbol, base, target, base_rows, exchange_rows):
+    """Returns a list of mismatch descriptions for the closed bars both sides cover."""
+    resampled = resample_klines(base_rows, base, target)
+    exchange_by_open = {int(r[0]): r for r in exchange_rows}
+    last_base_close = int(base_rows[-1][6])
+
+    mismatches = []
+    checked = 0
+    for bar in resampled:
+        exchange_bar = exchange_by_open.get(int(bar[0]))
+        # Only closed bars are comparable; the forming bar moves between the two requests
+        if exchange_bar is None or int(bar[6]) > last_base_close:
+            continue
+        checked += 1
+        for i, field in enumerate(FIELDS):
+            if Decimal(str(bar[i])) != Decimal(str(exchange_bar[i])):
+                mismatches.append(f"{symbol} {target} @ {bar[0]}: {field} resampled={bar[i]} exchange={exchange_bar[i]}")
+    return checked, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare resampled klines against exchange klines.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--recording', help="JSON file mapping SYMBOL@interval to REST kline arrays")
+    source.add_argument('--live', nargs='+', metavar='SYMBOL', help="Fetch fresh klines for these symbols")
+    parser.add_argument('--base', default='15m')
+    parser.add_argument('--targets', nargs='+', default=['1h', '4h'])
+    parser.add_argument('--save', help="Write the live recording to this path")
+    args = parser.parse_args()
+
+    for target in args.targets:
+        if not can_resample(args.base, target):
+            sys.exit(f"{target} cannot be rebuilt exactly from {args.base}")
+
+    if args.live:
+        recording = record_live(args.live, args.base, args.targets)
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(recording, f)
+    else:
+        with open(args.recording, 'r', encoding='utf-8') as f:
+            recording = json.load(f)
+
+    total_checked = 0
+    all_mismatches = []
+    symbols = sorted({key.split('@')[0] for key in recording})
+    for symbol in symbols:
+        base_rows = recording.get(f"{symbol}@{args.base}")
+        if not base_rows:
+            continue
+        for target in args.targets:
+            exchange_rows = recording.get(f"{symbol}@{target}")
+            if not exchange_rows:
+                continue
+            checked, mismatches = compare(symbol, args.base, target, base_rows, exchange_rows)
+            total_checked += checked
+            all_mismatches.extend(mismatches)
+            print(f"{symbol} {args.base}->{target}: {checked} closed bars checked, {len(mismatches)} field mismatches")
+
+    for line in all_mismatches[:50]:
+        print(f"  MISMATCH {line}")
+    print(f"\n{'PASS' if not all_mismatches else 'FAIL'}: {total_checked} bars checked, {len(all_mismatches)} mismatches")
+    sys.exit(1 if all_mismatches else 0)
@@ -0,0 +1,77 @@
+"""
+Runs a sharded deployment on one machine: the coordinator plus N bot shards.
+
+Starts `python -m src.shard_coordinator` and N copies of main.py with
+BOT_SHARD_COUNT / BOT_SHARD_INDEX set, prefixes every output line with its
+process, and stops all of them when one exits or on Ctrl+C. The shards read
+COORDINATOR_ADDRESS from the settings unless --address is given. Point
+ASYNC_CLIENT_BASE_URL at scripts/exchange_stub_server.py to try it without
+the exchange.
+
+Usage:
+    python scripts/run_shards.py --shards 3 [--address 127.0.0.1:8765] [--print-partition]
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from config.symbols import symbols
+from src.shard_coordinator import shard_of, coordinator_address
+
+
+def _pipe(name, process):
+    for line in iter(process.stdout.readline, b''):
+        sys.stdout.write(f"[{name}] {line.decode(errors='replace')}")
+        sys.stdout.flush()
+
+
+def _start(name, command, env):
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    threading.Thread(target=_pipe, args=(name, process), daemon=True).start()
+    return process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the coordinator and N bot shards locally.")
+    parser.add_argument('--shards', type=int, default=2)
+    parser.add_argument('--address', help="Coordinator address (host:port or Unix socket path); default from settings")
+    parser.add_argument('--print-partition', action='store_true', help="Only print which shard owns which symbol")
+    args = parser.parse_args()
+
+    if args.print_partition:
+        for index in range(args.shards):
+            owned = [symbol for symbol in symbols if shard_of(symbol, args.shards) == index]
+            print(f"shard {index}: {len(owned)} symbols: {', '.join(owned)}")
+        sys.exit(0)
+
+    import config.settings
+    address = args.address or coordinator_address()
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    processes = [_start('coordinator', [sys.executable, '-m', 'src.shard_coordinator', '--address', address], env)]
+    time.sleep(1)  # let the coordinator bind before the shards reserve entries
+
+    # The address travels as an environment override only when given on the command line
+    for index in range(args.shards):
+        shard_env = dict(env, BOT_SHARD_COUNT=str(args.shards), BOT_SHARD_INDEX=str(index))
+        if args.address:
+            shard_env['BOT_COORDINATOR_ADDRESS'] = args.address
+        processes.append(_start(f"shard {index}", [sys.executable, 'main.py'], shard_env))
+
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            process.wait()
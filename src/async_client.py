@@ -0,0 +1,215 @@
+"""
+Async Exchange Client — native asyncio Binance futures REST.
+
+PURPOSE:
+    The coroutine code paths (main.py, src/trade.py) used to reach the exchange
+    through asyncio.to_thread(client.*), which ties concurrency to the default
+    thread pool and to the requests session pool. This module provides an
+    awaitable drop-in for the client methods the bot uses.
+
+HOW IT WORKS:
+    1. `exchange` is a proxy: `await exchange.futures_create_order(...)` takes the
+       same keyword arguments as the python-binance client method.
+    2. With USE_ASYNC_CLIENT = True, calls go through AsyncBinanceClient: one
+       pooled aiohttp session (keep-alive, capped connections), HMAC-SHA256
+       signed requests and a timeout per endpoint class (market/account/order).
+    3. Otherwise (the default) the proxy falls back to running the synchronous
+       client in a worker thread, exactly as before.
+    4. Every request is admitted by the shared weight limiter
+       (src/rate_limiter.py), which also reads the rate-limit headers.
+    5. Conditional orders (STOP_MARKET, TAKE_PROFIT_MARKET, ...) are not
+       accepted on /fapi/v1/order any more: futures_create_order sends them to
+       the Algo Order API (POST /fapi/v1/algoOrder, algoType=CONDITIONAL) with
+       stopPrice renamed to triggerPrice. The response carries an algoId
+       instead of an orderId.
+    6. Exchange errors are raised as ExchangeAPIError, whose message uses the
+       python-binance "APIError(code=...)" format so existing string checks on
+       error codes keep working.
+
+    Plain functions that already run in worker threads (close_position, the
+    data layer) keep using the synchronous client.
+
+TESTING:
+    Point ASYNC_CLIENT_BASE_URL at scripts/exchange_stub_server.py to serve the
+    REST API locally instead of Binance.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import sys
+import time
+from decimal import Decimal
+from functools import partial
+from urllib.parse import urlencode
+
+import config.settings
+from src.rate_limiter import get_rate_limiter
+
+DEFAULT_BASE_URL = 'https://fapi.binance.com'
+DEFAULT_TIMEOUTS = {'market': 5, 'account': 10, 'order': 10}
+DEFAULT_POOL_SIZE = 50
+RECV_WINDOW_MS = 5000
+
+# client method -> (HTTP method, path, signed, timeout class)
+ENDPOINTS = {
+    'futures_klines':                 ('GET',    '/fapi/v1/klines',          False, 'market'),
+    'futures_mark_price':             ('GET',    '/fapi/v1/premiumIndex',    False, 'market'),
+    'futures_order_book':             ('GET',    '/fapi/v1/depth',           False, 'market'),
+    'futures_exchange_info':          ('GET',    '/fapi/v1/exchangeInfo',    False, 'market'),
+    'futures_position_information':   ('GET',    '/fapi/v2/positionRisk',    True,  'account'),
+    'futures_account_balance':        ('GET',    '/fapi/v2/balance',         True,  'account'),
+    'futures_account_trades':         ('GET',    '/fapi/v1/userTrades',      True,  'account'),
+    'futures_leverage_bracket':       ('GET',    '/fapi/v1/leverageBracket', True,  'account'),
+    'futures_change_leverage':        ('POST',   '/fapi/v1/leverage',        True,  'account'),
+    'futures_change_margin_type':     ('POST',   '/fapi/v1/marginType',      True,  'account'),
+    'futures_get_open_orders':        ('GET',    '/fapi/v1/openOrders',      True,  'account'),
+    'futures_get_open_algo_orders':   ('GET',    '/fapi/v1/openAlgoOrders',  True,  'account'),
+    'futures_create_order':           ('POST',   '/fapi/v1/order',           True,  'order'),
+    'futures_cancel_order':           ('DELETE', '/fapi/v1/order',           True,  'order'),
+    'futures_cancel_all_open_orders': ('DELETE', '/fapi/v1/allOpenOrders',   True,  'order'),
+    'futures_create_algo_order':      ('POST',   '/fapi/v1/algoOrder',       True,  'order'),
+    'futures_cancel_algo_order':      ('DELETE', '/fapi/v1/algoOrder',       True,  'order'),
+}
+
+# Order types the exchange only takes through the Algo Order API
+CONDITIONAL_ORDER_TYPES = {'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET', 'TRAILING_STOP_MARKET'}
+
+
+class ExchangeAPIError(Exception):
+    def __init__(self, status_code, code, message):
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        super().__init__(f"APIError(code={code}): {message}")
+
+
+def _format_param(value):
+    # Binance rejects scientific notation and Python-style booleans
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return format(Decimal(str(value)), 'f')
+    return str(value)
+
+
+def _as_algo_order(params):
+    # /fapi/v1/algoOrder names the trigger fields differently from /fapi/v1/order
+    params = dict(params, algoType='CONDITIONAL')
+    if 'stopPrice' in params:
+        params['triggerPrice'] = params.pop('stopPrice')
+    if 'activationPrice' in params:
+        params['activatePrice'] = params.pop('activationPrice')
+    return params
+
+
+class AsyncBinanceClient:
+    def __init__(self, api_key, api_secret, base_url=DEFAULT_BASE_URL, timeouts=None, pool_size=DEFAULT_POOL_SIZE):
+        self.api_key = api_key
+        self.api_secret = api_secret.encode() if isinstance(api_secret, str) else api_secret
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.pool_size = pool_size
+        self._session = None
+        self._session_loop = None
+
+    def __getattr__(self, name):
+        if name in ENDPOINTS:
+            return partial(self.request, name)
+        raise AttributeError(name)
+
+    async def _get_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        # aiohttp sessions are bound to the loop that created them
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers={'X-MBX-APIKEY': self.api_key})
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _sign(self, params):
+        params['timestamp'] = int(time.time() * 1000)
+        params.setdefault('recvWindow', RECV_WINDOW_MS)
+        query = urlencode(params)
+        signature = hmac.new(self.api_secret, query.encode(), hashlib.sha256).hexdigest()
+        return f"{query}&signature={signature}"
+
+    async def request(self, name, **params):
+        import aiohttp
+
+        if name == 'futures_create_order' and params.get('type') in CONDITIONAL_ORDER_TYPES:
+            name, params = 'futures_create_algo_order', _as_algo_order(params)
+        method, path, signed, timeout_class = ENDPOINTS[name]
+        params = {k: _format_param(v) for k, v in params.items() if v is not None}
+        limiter = get_rate_limiter()
+        await limiter.acquire_async(name, params)
+
+        # Sign after admission so a long wait cannot push the timestamp outside recvWindow
+        query = self._sign(params) if signed else urlencode(params)
+        url = f"{self.base_url}{path}" + (f"?{query}" if query else '')
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeouts[timeout_class])
+        async with session.request(method, url, timeout=timeout) as response:
+            limiter.update_from_headers(response.headers)
+            if response.status in (429, 418):
+                limiter.on_rate_limited(response.status, response.headers.get('Retry-After'))
+            body = await response.text()
+            try:
+                payload = json.loads(body) if body else {}
+            except json.JSONDecodeError:
+                raise ExchangeAPIError(response.status, None, f"Invalid JSON response: {body[:200]}")
+            if response.status >= 400:
+                if isinstance(payload, dict):
+                    raise ExchangeAPIError(response.status, payload.get('code'), payload.get('msg', body[:200]))
+                raise ExchangeAPIError(response.status, None, body[:200])
+            return payload
+
+
+_async_client = None
+
+
+def get_async_client():
+    """Returns the shared AsyncBinanceClient, or None when USE_ASYNC_CLIENT is off."""
+    global _async_client
+    settings = sys.modules['config.settings']
+    if not getattr(settings, 'USE_ASYNC_CLIENT', False):
+        return None
+    if _async_client is None:
+        from config.secrets import API_KEY, API_SECRET
+        _async_client = AsyncBinanceClient(
+            API_KEY, API_SECRET,
+            base_url=getattr(settings, 'ASYNC_CLIENT_BASE_URL', DEFAULT_BASE_URL),
+            timeouts=getattr(settings, 'ASYNC_CLIENT_TIMEOUTS', None),
+            pool_size=getattr(settings, 'ASYNC_CLIENT_POOL_SIZE', DEFAULT_POOL_SIZE),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    if _async_client is not None:
+        await _async_client.close()
+
+
+class _ExchangeProxy:
+    def __getattr__(self, name):
+        native = get_async_client()
+        if native is not None and name in ENDPOINTS:
+            return getattr(native, name)
+
+        from src.rate_limiter import client
+        method = getattr(client, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+
+exchange = _ExchangeProxy()
@@ -44,7 +44,8 @@ HIERARCHY:
 
 import sys
 from binance.enums import SIDE_BUY, SIDE_SELL
-from src.trade import place_order
+from src.entry_candidates import EntryCandidate, execute_candidate
+from src.entry_slots import BOS_STRATEGY
 from data.indicators import calculate_atr
 from config.settings import (
     VERBOSE_LOGGING, BOS_ADX_THRESHOLD, BOS_MIN_BREAKOUT_RANGE,
@@ -57,6 +58,13 @@ from datetime import datetime, timezone
 import pandas as pd
 import time
 
+# Indicators read per timeframe role, resolved by data.indicator_pipeline
+REQUIRED_INDICATORS = {
+    'execution': ('atr', 'bos', 'vol_sma', 'volume_anomaly', 'vwap', 'stoch'),
+    'hourly': ('ema_21',),
+    'primary': ('adx', 'price_sma_50', 'price_sma_200'),
+}
+
 
 def _check_bos_global_guards(symbol, side_label):
     """
@@ -90,18 +98,28 @@ def _check_bos_global_guards(symbol, side_label):
     return False
 
 
-async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
+def _start_bos_cooldown():
+    """
+    Starts the global BOS cooldown once a BOS order went through. Inside a
+    scan cycle the entry slots already started it at the fill; this covers
+    orders placed without slot books.
+    """
+    bot_state.last_bos_entry_time = time.time()
+
+
+def evaluate_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
     """
     Checks for a LONG momentum breakout using Break of Structure + Retest.
     Requires: Bullish BOS within recent window + Retest pullback with rejection
               + 3x Volume on breakout + 1H EMA 21 trend alignment + VWAP + 4H ADX > 25.
+    Returns the EntryCandidate, or None; places no order.
     """
     if getattr(sys.modules['config.settings'], 'ENABLE_GLOBAL_BTC_FILTER', True) and bot_state.global_btc_trend == 'BEARISH' and symbol != 'BTCUSDT':
-        return False
+        return None
 
     # --- Global BOS Guards (cooldown, time filter) ---
     if _check_bos_global_guards(symbol, "LONG"):
-        return False
+        return None
 
     # --- SMA 200 Trend Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_SMA_200_FILTER and 'price_sma_200' in df_4h.columns:
@@ -110,12 +128,12 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
         if pd.notna(sma_200_4h) and last_close < sma_200_4h:
             if VERBOSE_LOGGING:
                 print(f"  BOS LONG rejected for {symbol}: Price {last_close:.4f} < 4H SMA 200 {sma_200_4h:.4f}")
-            return False
+            return None
 
     # --- Core Condition 1: 4H Trending Market (ADX > 25) ---
     adx_4h = df_4h['ADX'].iloc[-1]
     if adx_4h != adx_4h or adx_4h < BOS_ADX_THRESHOLD:  # NaN check + threshold
-        return False
+        return None
 
     # --- HTF Trend Guard: 4H Price must be above 4H SMA 50 ---
     if 'price_sma_50' in df_4h.columns:
@@ -124,7 +142,7 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
         if pd.notna(sma_50_4h) and last_4h_close < sma_50_4h:
             if VERBOSE_LOGGING:
                 print(f"  BOS LONG rejected for {symbol}: 4H macro trend is BEARISH (Price {last_4h_close:.4f} < SMA50 {sma_50_4h:.4f}).")
-            return False
+            return None
 
     # --- NEW: 1H EMA 21 Trend Alignment Filter ---
     # Prevents taking LONG breakouts when the 1H trend is pointing down
@@ -134,28 +152,28 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
         if pd.notna(ema_21_1h) and last_1h_close < ema_21_1h:
             if VERBOSE_LOGGING:
                 print(f"  BOS LONG rejected for {symbol}: 1H trend BEARISH (Price {last_1h_close:.4f} < EMA21 {ema_21_1h:.4f}).")
-            return False
+            return None
 
     # --- Core Condition 2: Bullish BOS Retest (NOT chase entry) ---
     # Instead of entering on the breakout candle, we wait for the retest
     if 'bos_retest_long' not in df_15m.columns:
-        return False
+        return None
 
     # Ensure the retest rejection wick was printed on a fully CLOSED candle
     if not df_15m['bos_retest_long'].iloc[-2]:
-        return False
+        return None
 
     # NEW: Strict Momentum Breakout Requirement (Trigger Pull)
     # The current live price must break above the high of the closed retest candle
     last_close = df_15m['close'].iloc[-1]
     if last_close <= df_15m['high'].iloc[-2]:
-        return False
+        return None
 
     # --- Core Condition 3: Volume Anomaly on the ORIGINAL breakout candle ---
     # The retest candle doesn't need high volume — the breakout candle does.
     # We check if volume_anomaly was True at any point in the recent BOS window
     if 'volume_anomaly' not in df_15m.columns or 'vol_sma' not in df_15m.columns:
-        return False
+        return None
 
     # Check volume ratio on the current candle AND verify breakout had institutional volume
     # Use BOS_VOLUME_MULTIPLIER (3.0x) instead of the shared anomaly column
@@ -179,11 +197,11 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
     if not breakout_had_volume:
         if VERBOSE_LOGGING:
             print(f"  BOS LONG rejected for {symbol}: Breakout candle lacked {BOS_VOLUME_MULTIPLIER}x volume.")
-        return False
+        return None
 
     # --- Core Condition 4: Price above VWAP (institutional trend alignment) ---
     if 'vwap' not in df_15m.columns:
-        return False
+        return None
 
     last_close = df_15m['close'].iloc[-1]
     vwap_value = df_15m['vwap'].iloc[-1]
@@ -191,13 +209,13 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
     if last_close <= vwap_value:
         if VERBOSE_LOGGING:
             print(f"  BOS LONG rejected for {symbol}: Price {last_close:.4f} below VWAP {vwap_value:.4f}.")
-        return False
+        return None
 
     # --- Exhaustion Guard: Stochastic Overbought ---
     if stoch_k is not None and stoch_k.iloc[-1] > 80:
         if VERBOSE_LOGGING:
             print(f"  BOS LONG rejected for {symbol}: Stochastic is overbought ({stoch_k.iloc[-1]:.2f}). Exhaustion risk.")
-        return False
+        return None
 
     # --- All conditions met: Calculate trade parameters ---
     # Use the broken level from the retest detection
@@ -215,7 +233,7 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
     if breakout_range <= 0 or (breakout_range / last_close) < BOS_MIN_BREAKOUT_RANGE:
         if VERBOSE_LOGGING:
             print(f"  BOS LONG rejected for {symbol}: Breakout range too small ({breakout_range:.4f}).")
-        return False
+        return None
 
     take_profit_price = broken_level + (breakout_range * BOS_TP_EXTENSION)  # 1.272 extension
 
@@ -234,38 +252,38 @@ async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_ba
     print(f"  VWAP (24h):             {vwap_value:.4f}")
     print(f"  Breakout Volume:        {BOS_VOLUME_MULTIPLIER}x+ confirmed")
     print(f"  4H ADX:                 {adx_4h:.2f}")
-    print(f"\n--- Trade Execution ---")
+    print(f"\n--- Trade Plan ---")
     print(f"  Stop Loss:              {stop_loss_price:.4f} (below retest candle)")
     print(f"  Take Profit (1.272):    {take_profit_price:.4f}")
     print(f"{'='*70}\n")
 
-    order_placed = await place_order(
+    return EntryCandidate(symbol, BOS_STRATEGY, dict(
         symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
         reason_to_open=f"BOS Retest LONG | {BOS_VOLUME_MULTIPLIER}x Vol | ADX {adx_4h:.1f}",
         stop_loss_price=stop_loss_price,
         take_profit_price=take_profit_price if take_profit_price > 0 else None,
         atr_value=atr_value, df=df_15m,
         support_4h=recent_low, resistance_4h=broken_level, adx_value=adx_4h
-    )
-    
-    if order_placed:
-        bot_state.last_bos_entry_time = time.time()
-    
-    return order_placed if order_placed is not None else False
+    ), quality=volume_ratio, on_fill=_start_bos_cooldown)
 
 
-async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
+async def check_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
+    return await execute_candidate(evaluate_bos_breakout_long(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance))
+
+
+def evaluate_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
     """
     Checks for a SHORT momentum breakdown using Break of Structure + Retest.
     Requires: Bearish BOS within recent window + Retest pullback with rejection
               + 3x Volume on breakdown + 1H EMA 21 trend alignment + VWAP + 4H ADX > 25.
+    Returns the EntryCandidate, or None; places no order.
     """
     if getattr(sys.modules['config.settings'], 'ENABLE_GLOBAL_BTC_FILTER', True) and bot_state.global_btc_trend == 'BULLISH' and symbol != 'BTCUSDT':
-        return False
+        return None
 
     # --- Global BOS Guards (cooldown, time filter) ---
     if _check_bos_global_guards(symbol, "SHORT"):
-        return False
+        return None
 
     # --- SMA 200 Trend Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_SMA_200_FILTER and 'price_sma_200' in df_4h.columns:
@@ -274,12 +292,12 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
         if pd.notna(sma_200_4h) and last_close > sma_200_4h:
             if VERBOSE_LOGGING:
                 print(f"  BOS SHORT rejected for {symbol}: Price {last_close:.4f} > 4H SMA 200 {sma_200_4h:.4f}")
-            return False
+            return None
 
     # --- Core Condition 1: 4H Trending Market (ADX > 25) ---
     adx_4h = df_4h['ADX'].iloc[-1]
     if adx_4h != adx_4h or adx_4h < BOS_ADX_THRESHOLD:  # NaN check + threshold
-        return False
+        return None
 
     # --- HTF Trend Guard: 4H Price must be below 4H SMA 50 ---
     if 'price_sma_50' in df_4h.columns:
@@ -288,7 +306,7 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
         if pd.notna(sma_50_4h) and last_4h_close > sma_50_4h:
             if VERBOSE_LOGGING:
                 print(f"  BOS SHORT rejected for {symbol}: 4H macro trend is BULLISH (Price {last_4h_close:.4f} > SMA50 {sma_50_4h:.4f}).")
-            return False
+            return None
 
     # --- NEW: 1H EMA 21 Trend Alignment Filter ---
     # Prevents taking SHORT breakdowns when the 1H trend is pointing up
@@ -298,25 +316,25 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
         if pd.notna(ema_21_1h) and last_1h_close > ema_21_1h:
             if VERBOSE_LOGGING:
                 print(f"  BOS SHORT rejected for {symbol}: 1H trend BULLISH (Price {last_1h_close:.4f} > EMA21 {ema_21_1h:.4f}).")
-            return False
+            return None
 
     # --- Core Condition 2: Bearish BOS Retest (NOT chase entry) ---
     if 'bos_retest_short' not in df_15m.columns:
-        return False
+        return None
 
     # Ensure the retest rejection wick was printed on a fully CLOSED candle
     if not df_15m['bos_retest_short'].iloc[-2]:
-        return False
+        return None
 
     # NEW: Strict Momentum Breakout Requirement (Trigger Pull)
     # The current live price must break below the low of the closed retest candle
     last_close = df_15m['close'].iloc[-1]
     if last_close >= df_15m['low'].iloc[-2]:
-        return False
+        return None
 
     # --- Core Condition 3: Volume Anomaly on the ORIGINAL breakdown candle ---
     if 'volume_anomaly' not in df_15m.columns or 'vol_sma' not in df_15m.columns:
-        return False
+        return None
 
     last_vol = df_15m['volume'].iloc[-1]
     avg_vol = df_15m['vol_sma'].iloc[-1]
@@ -338,11 +356,11 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
     if not breakdown_had_volume:
         if VERBOSE_LOGGING:
             print(f"  BOS SHORT rejected for {symbol}: Breakdown candle lacked {BOS_VOLUME_MULTIPLIER}x volume.")
-        return False
+        return None
 
     # --- Core Condition 4: Price below VWAP (institutional trend alignment) ---
     if 'vwap' not in df_15m.columns:
-        return False
+        return None
 
     last_close = df_15m['close'].iloc[-1]
     vwap_value = df_15m['vwap'].iloc[-1]
@@ -350,13 +368,13 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
     if last_close >= vwap_value:
         if VERBOSE_LOGGING:
             print(f"  BOS SHORT rejected for {symbol}: Price {last_close:.4f} above VWAP {vwap_value:.4f}.")
-        return False
+        return None
 
     # --- Exhaustion Guard: Stochastic Oversold ---
     if stoch_k is not None and stoch_k.iloc[-1] < 20:
         if VERBOSE_LOGGING:
             print(f"  BOS SHORT rejected for {symbol}: Stochastic is oversold ({stoch_k.iloc[-1]:.2f}). Exhaustion risk.")
-        return False
+        return None
 
     # --- All conditions met: Calculate trade parameters ---
     broken_level = df_15m['bos_level_short'].iloc[-2]
@@ -373,7 +391,7 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
     if breakdown_range <= 0 or (breakdown_range / last_close) < BOS_MIN_BREAKOUT_RANGE:
         if VERBOSE_LOGGING:
             print(f"  BOS SHORT rejected for {symbol}: Breakdown range too small ({breakdown_range:.4f}).")
-        return False
+        return None
 
     take_profit_price = broken_level - (breakdown_range * BOS_TP_EXTENSION)  # 1.272 extension below
 
@@ -392,21 +410,20 @@ async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_b
     print(f"  VWAP (24h):             {vwap_value:.4f}")
     print(f"  Breakdown Volume:       {BOS_VOLUME_MULTIPLIER}x+ confirmed")
     print(f"  4H ADX:                 {adx_4h:.2f}")
-    print(f"\n--- Trade Execution ---")
+    print(f"\n--- Trade Plan ---")
     print(f"  Stop Loss:              {stop_loss_price:.4f} (above retest candle)")
     print(f"  Take Profit (1.272):    {take_profit_price:.4f}")
     print(f"{'='*70}\n")
 
-    order_placed = await place_order(
+    return EntryCandidate(symbol, BOS_STRATEGY, dict(
         symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
         reason_to_open=f"BOS Retest SHORT | {BOS_VOLUME_MULTIPLIER}x Vol | ADX {adx_4h:.1f}",
         stop_loss_price=stop_loss_price,
         take_profit_price=take_profit_price if take_profit_price > 0 else None,
         atr_value=atr_value, df=df_15m,
         support_4h=broken_level, resistance_4h=recent_high, adx_value=adx_4h
-    )
-    
-    if order_placed:
-        bot_state.last_bos_entry_time = time.time()
-    
-    return order_placed if order_placed is not None else False
+    ), quality=volume_ratio, on_fill=_start_bos_cooldown)
+
+
+async def check_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance):
+    return await execute_candidate(evaluate_bos_breakout_short(symbol, df_15m, df_4h, df_1h, stoch_k, usdt_balance))
@@ -7,6 +7,12 @@ import asyncio
 from data.get_data import round_quantity
 from config.settings import *
 from src.state_manager import bot_state
+from src.shard_coordinator import get_shard_link
+
+# Indicators read per timeframe role, resolved by data.indicator_pipeline
+REQUIRED_INDICATORS = {
+    'execution': ('atr', 'rsi', 'stoch'),
+}
 
 async def close_position_long(symbol, position, roi, df, stoch_k, stoch_d, resistance, atr_value, entry_price, funding_rate=0.0):
     reason = None
@@ -163,4 +169,8 @@ def update_loss_counter(symbol, roi):
     else:
         if bot_state.consecutive_losses[symbol] > 0:
             print(f"Trade won for {symbol}. Resetting consecutive loss counter.")
-        bot_state.consecutive_losses[symbol] = 0
\ No newline at end of file
+        bot_state.consecutive_losses[symbol] = 0
+
+    shard_link = get_shard_link()
+    if shard_link is not None:
+        shard_link.record_result(symbol, roi < 0)
\ No newline at end of file
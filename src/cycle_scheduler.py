@@ -0,0 +1,161 @@
+"""
+Cycle Scheduler — entry passes aligned to execution-timeframe candle closes.
+
+PURPOSE:
+    main_trading_loop used to sleep a flat 60 seconds after each cycle. Entry
+    signals are read from the last closed candle, so the time from a close to
+    our evaluation ranged from 0 to 60+ seconds plus the cycle's own duration,
+    and the cycle start drifted against the candle grid.
+
+HOW IT WORKS:
+    1. CycleScheduler.next_pass() sleeps until the earlier of two absolute
+       deadlines and returns a CyclePass:
+         - entry:      CANDLE_CLOSE_DELAY_MS after the next EXECUTION_TIMEFRAME
+                       close (the delay lets the exchange publish the closed
+                       bar). Entry passes run the full cycle.
+         - management: every POSITION_MANAGEMENT_INTERVAL seconds between
+                       closes. Management passes only manage and exit open
+                       positions; they scan no symbols for entries.
+       Deadlines sit on the wall-clock grid, so a pass's duration never
+       shifts the next one. A pass that overran one or more closes is
+       followed immediately by a single entry pass for the latest close.
+    2. begin_pass() makes the pass the current one. record_signal() (a
+       strategy produced an entry candidate) and record_order() (an entry's
+       market order filled) stamp it, keeping the first stamp per symbol.
+    3. CyclePass.report() gives the lag from the candle close to the pass
+       start, the first and last signal, the first and last order and the
+       end of the pass.
+
+    With ENABLE_CANDLE_CLOSE_SCHEDULER = False (default) the loop keeps its
+    fixed 60-second sleep; signals and orders are then stamped against the
+    pass start.
+"""
+
+import asyncio
+import sys
+import time
+
+from data.kline_buffer import interval_to_ms
+
+DEFAULT_CLOSE_DELAY_MS = 300
+DEFAULT_MANAGEMENT_INTERVAL_SECONDS = 60
+
+ENTRY_PASS = 'entry'
+MANAGEMENT_PASS = 'management'
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+class CyclePass:
+    def __init__(self, kind, candle_close_ms=None, missed_closes=0):
+        self.kind = kind
+        self.candle_close_ms = candle_close_ms  # close this pass evaluates; None for unaligned passes
+        self.missed_closes = missed_closes      # closes skipped because the previous pass overran them
+        self.started_at = time.time()
+        self.signals = {}  # symbol -> first signal time
+        self.orders = {}   # symbol -> first order fill time
+
+    @property
+    def entries(self):
+        return self.kind == ENTRY_PASS
+
+    @property
+    def reference_time(self):
+        """Time lags are measured from: the candle close, or the pass start."""
+        return self.candle_close_ms / 1000 if self.candle_close_ms is not None else self.started_at
+
+    def _lag(self, at):
+        return at - self.reference_time
+
+    def report(self):
+        reference = 'close' if self.candle_close_ms is not None else 'start'
+        parts = [f"start +{self._lag(self.started_at):.2f}s"] if self.candle_close_ms is not None else []
+        for label, stamps in (('signal', self.signals), ('order', self.orders)):
+            if stamps:
+                first, last = min(stamps.values()), max(stamps.values())
+                parts.append(f"{len(stamps)} {label}(s) +{self._lag(first):.2f}s..+{self._lag(last):.2f}s")
+            else:
+                parts.append(f"no {label}s")
+        parts.append(f"done +{self._lag(time.time()):.2f}s")
+        if self.missed_closes:
+            parts.append(f"{self.missed_closes} close(s) missed")
+        return f"[Scheduler] {self.kind} pass, lag from {reference}: " + ", ".join(parts)
+
+
+class CycleScheduler:
+    def __init__(self, interval, close_delay_ms=DEFAULT_CLOSE_DELAY_MS,
+                 management_interval=DEFAULT_MANAGEMENT_INTERVAL_SECONDS, clock=time.time):
+        self.interval_ms = interval_to_ms(interval)
+        self.close_delay_ms = close_delay_ms
+        self.management_interval = management_interval
+        self.clock = clock
+        now_ms = int(clock() * 1000)
+        # One interval back, so the first pass evaluates the close before startup right away
+        self.last_close_ms = now_ms - now_ms % self.interval_ms - self.interval_ms
+        self.next_management = clock() + management_interval
+
+    def _next_close_ms(self):
+        return self.last_close_ms + self.interval_ms
+
+    def due(self):
+        """The pass due now (entry before management), or None with the seconds until the next one."""
+        now = self.clock()
+        now_ms = int(now * 1000)
+        if now_ms >= self._next_close_ms() + self.close_delay_ms:
+            latest_close = now_ms - (now_ms - self.close_delay_ms) % self.interval_ms - self.close_delay_ms
+            missed = (latest_close - self._next_close_ms()) // self.interval_ms
+            self.last_close_ms = latest_close
+            self.next_management = now + self.management_interval
+            return CyclePass(ENTRY_PASS, latest_close, missed), 0.0
+        if now >= self.next_management:
+            # Keep the management grid: skip ticks that fell inside a long pass
+            ticks = int((now - self.next_management) // self.management_interval) + 1
+            self.next_management += ticks * self.management_interval
+            return CyclePass(MANAGEMENT_PASS), 0.0
+        entry_at = (self._next_close_ms() + self.close_delay_ms) / 1000
+        return None, min(entry_at, self.next_management) - now
+
+    async def next_pass(self):
+        while True:
+            cycle_pass, wait = self.due()
+            if cycle_pass is not None:
+                return cycle_pass
+            await asyncio.sleep(wait)
+
+
+def create_scheduler(interval):
+    return CycleScheduler(
+        interval,
+        close_delay_ms=_settings('CANDLE_CLOSE_DELAY_MS', DEFAULT_CLOSE_DELAY_MS),
+        management_interval=_settings('POSITION_MANAGEMENT_INTERVAL', DEFAULT_MANAGEMENT_INTERVAL_SECONDS),
+    )
+
+
+def is_enabled():
+    return _settings('ENABLE_CANDLE_CLOSE_SCHEDULER', False)
+
+
+_current_pass = None
+
+
+def begin_pass(cycle_pass=None):
+    """Makes `cycle_pass` the current pass; without one, an unaligned entry pass (fixed-sleep loop)."""
+    global _current_pass
+    _current_pass = cycle_pass if cycle_pass is not None else CyclePass(ENTRY_PASS)
+    return _current_pass
+
+
+def get_current_pass():
+    return _current_pass
+
+
+def record_signal(symbol, at=None):
+    if _current_pass is not None:
+        _current_pass.signals.setdefault(symbol, at if at is not None else time.time())
+
+
+def record_order(symbol, at=None):
+    if _current_pass is not None:
+        _current_pass.orders.setdefault(symbol, at if at is not None else time.time())
@@ -0,0 +1,96 @@
+"""
+Entry Candidates — strategy signals as data, ranked and executed separately.
+
+PURPOSE:
+    Entries used to be first-come-first-served: each strategy placed its order
+    as soon as its conditions held, in whatever order the symbol tasks
+    finished. A weak stochastic setup could take the last free slot before a
+    strong Fibonacci setup had even been evaluated.
+
+HOW IT WORKS:
+    1. Every entry strategy has a pure evaluate_* function. It runs the same
+       conditions as before and returns an EntryCandidate (the place_order
+       arguments plus a score) or None. It places no orders and only logs
+       the signal; the "Placing" line comes from execute_candidate().
+    2. The check_* functions the cycle has always called are now
+       evaluate + execute_candidate(), so the default cycle behaves as before.
+    3. With ENABLE_RANKED_ENTRIES = True the cycle runs in two phases.
+       Phase one evaluates every symbol concurrently and collects at most one
+       candidate per symbol (the first of Fib, BOS, Reversal, Stoch that
+       qualifies). Phase two ranks all candidates and executes the best ones
+       in parallel, one per free slot (src/entry_slots.py still serializes
+       the reservation). Slots of failed orders go to the next-ranked
+       candidates.
+
+    Candidates rank by strategy tier first (Fib > BOS > Reversal > Stoch, the
+    order of the sequential cascade), then by a strategy-specific quality:
+    the Fib confirmation count, the BOS breakout volume ratio, the Reversal
+    confluence count and the Stoch ADX.
+"""
+
+import asyncio
+import time
+
+from src.trade import place_order
+from src.cycle_scheduler import record_signal
+
+# Strategy tiers, highest first; the same precedence as the sequential cascade in process_symbol
+STRATEGY_PRIORITY = {'fib': 3, 'bos': 2, 'reversal': 1, 'stoch': 0}
+
+
+class EntryCandidate:
+    def __init__(self, symbol, strategy, order, quality=0.0, on_fill=None):
+        self.symbol = symbol
+        self.strategy = strategy
+        self.order = order          # place_order keyword arguments
+        self.quality = quality      # tie-breaker within a strategy tier, higher is better
+        self.on_fill = on_fill      # called after the order was placed (e.g. the BOS cooldown clock)
+        self.created_at = time.time()
+
+    @property
+    def score(self):
+        return STRATEGY_PRIORITY.get(self.strategy, 0), self.quality
+
+    def __repr__(self):
+        return f"EntryCandidate({self.symbol}, {self.strategy}, {self.order.get('side')}, quality={self.quality:.2f})"
+
+
+async def execute_candidate(candidate):
+    """Places the candidate's order; False if there is no candidate or the order did not go through."""
+    if candidate is None:
+        return False
+    record_signal(candidate.symbol, candidate.created_at)
+    print(f"📤 Placing {candidate.strategy} {candidate.order.get('side')} for {candidate.symbol}: {candidate.order.get('reason_to_open')}")
+    order_placed = await place_order(**candidate.order, strategy=candidate.strategy)
+    if order_placed and candidate.on_fill is not None:
+        candidate.on_fill()
+    # If stop-loss placement failed, place_order returns False and the trade must not count
+    return order_placed if order_placed is not None else False
+
+
+def rank_candidates(candidates):
+    """Candidates best first."""
+    return sorted(candidates, key=lambda candidate: candidate.score, reverse=True)
+
+
+async def execute_ranked(candidates, free_slots):
+    """
+    Executes the best candidates in parallel, one per free slot; slots of
+    orders that did not go through are handed to the next-ranked candidates.
+    `await free_slots()` gives the number of slots currently free. Returns the
+    candidates whose orders were placed.
+    """
+    pending = rank_candidates(candidates)
+    placed = []
+    while pending:
+        batch_size = min(await free_slots(), len(pending))
+        if batch_size <= 0:
+            break
+        batch, pending = pending[:batch_size], pending[batch_size:]
+        results = await asyncio.gather(*(execute_candidate(candidate) for candidate in batch), return_exceptions=True)
+        for candidate, result in zip(batch, results):
+            if isinstance(result, Exception):
+                print(f"Error executing entry for {candidate.symbol}: {result}")
+            elif result:
+                placed.append(candidate)
+    return placed
@@ -0,0 +1,191 @@
+"""
+Entry Slots — atomic reservation of a trade slot before an entry order.
+
+PURPOSE:
+    process_symbol used to hold one global trade_lock while it read the
+    account, ran all four entry strategies and placed the order (order book,
+    margin type, market order, stop loss, take profit). Entry evaluation across
+    the universe ran one symbol at a time behind those network round-trips,
+    only to keep MAX_CONCURRENT_TRADES, BOS_MAX_TRADES_PER_CYCLE and the
+    available margin consistent between concurrent entries.
+
+HOW IT WORKS:
+    1. Strategies are evaluated concurrently without a lock. When one decides
+       to enter, place_order sizes the trade and acquires a Reservation right
+       before the market order. That is the only serialized step: an
+       in-memory check under a threading lock, with no I/O.
+    2. A reservation holds a position slot, a BOS slot for BOS entries, and
+       the entry's required margin. BOS entries are also refused while the
+       global BOS cooldown (BOS_GLOBAL_COOLDOWN_SECONDS) runs; a BOS fill
+       starts it under the same lock, so two concurrent BOS entries cannot
+       both pass the strategy's cooldown check. Occupied slots are the union of open
+       positions in the caller's account read and the symbols reserved or
+       filled this cycle. A fill is therefore counted exactly once, whether or
+       not the account read already shows it.
+    3. Reservation.fill() keeps the slot taken once the market order filled;
+       release() frees it when the order is unwound. place_order releases a
+       reservation that did not fill on every exit path.
+    4. open_cycle() starts fresh books for each scan cycle, next to the market
+       snapshot. Outside a cycle there are no books, and place_order falls
+       back to its plain margin pre-flight.
+    5. In a sharded deployment a reservation granted here is also requested
+       from the coordinator (src/shard_coordinator.py), which applies the
+       limits shared with the other shards; fills and releases are forwarded.
+"""
+
+import sys
+import threading
+import time
+
+from src.state_manager import bot_state
+from src.shard_coordinator import get_shard_link
+
+BOS_STRATEGY = 'bos'
+
+
+def _settings(name, default):
+    return getattr(sys.modules['config.settings'], name, default)
+
+
+class Reservation:
+    """One entry's claim on a slot; created by EntrySlots.reservation() for each place_order call."""
+
+    def __init__(self, slots, symbol, strategy=None):
+        self.slots = slots
+        self.symbol = symbol
+        self.strategy = strategy
+        self.margin = 0.0
+        self.previous_bos_entry_time = None  # restored if a filled BOS entry is unwound
+        self.state = 'new'  # new -> reserved -> filled; released from reserved or filled
+
+    def acquire(self, margin, available_margin, positions):
+        """Returns None when the slot is granted, otherwise the reason it was refused."""
+        refusal = self.slots._acquire(self, margin, available_margin, positions)
+        link = get_shard_link()
+        if refusal is None and link is not None:
+            open_symbols = {p['symbol'] for p in positions if float(p.get('positionAmt', 0)) != 0}
+            refusal = link.acquire(self.symbol, self.strategy, margin, available_margin, open_symbols)
+            if refusal is not None:
+                self.slots._release(self)
+        return refusal
+
+    def fill(self):
+        self.slots._fill(self)
+        link = get_shard_link()
+        if link is not None:
+            link.fill(self.symbol, self.strategy, self.margin)
+
+    def release(self):
+        self.slots._release(self)
+        link = get_shard_link()
+        if link is not None:
+            link.release(self.symbol)
+
+    def release_unless_filled(self):
+        if self.state == 'reserved':
+            self.release()
+
+
+class EntrySlots:
+    def __init__(self, max_trades, max_bos_trades):
+        self.max_trades = max_trades
+        self.max_bos_trades = max_bos_trades
+        self.reserved = {}  # symbol -> Reservation whose order is in flight
+        self.filled = {}    # symbol -> Reservation filled this cycle
+        self._lock = threading.Lock()
+
+    def reservation(self, symbol, strategy=None):
+        return Reservation(self, symbol, strategy)
+
+    def _occupied(self, positions):
+        open_symbols = {p['symbol'] for p in positions if float(p.get('positionAmt', 0)) != 0}
+        return open_symbols | self.reserved.keys() | self.filled.keys(), open_symbols
+
+    def _bos_in_flight(self):
+        return sum(1 for r in self.reserved.values() if r.strategy == BOS_STRATEGY)
+
+    def has_free_slot(self, positions):
+        """Cheap pre-check before evaluating a symbol's strategies (no reservation is made)."""
+        with self._lock:
+            return len(self._occupied(positions)[0]) < self.max_trades
+
+    def free_slots(self, positions):
+        """Number of entries that could still be reserved against `positions`."""
+        with self._lock:
+            return max(self.max_trades - len(self._occupied(positions)[0]), 0)
+
+    def bos_slot_free(self):
+        with self._lock:
+            return bot_state.bos_cycle_count + self._bos_in_flight() < self.max_bos_trades
+
+    def _acquire(self, reservation, margin, available_margin, positions):
+        """
+        Atomically reserves a slot and `margin` of `available_margin` (from the
+        caller's account read of `positions`).
+        """
+        symbol = reservation.symbol
+        with self._lock:
+            occupied, open_symbols = self._occupied(positions)
+            if symbol in occupied:
+                return f"{symbol} already has an open or pending entry"
+            if len(occupied) >= self.max_trades:
+                return f"Max concurrent trades reached ({len(occupied)}/{self.max_trades})"
+            if reservation.strategy == BOS_STRATEGY:
+                if bot_state.bos_cycle_count + self._bos_in_flight() >= self.max_bos_trades:
+                    return f"BOS cycle limit reached ({self.max_bos_trades})"
+                cooldown = _settings('BOS_GLOBAL_COOLDOWN_SECONDS', 0)
+                elapsed = time.time() - bot_state.last_bos_entry_time
+                if elapsed < cooldown:
+                    return f"Global BOS cooldown active ({int(cooldown - elapsed)}s remaining)"
+            # Margin the account read does not reflect yet: entries in flight, or filled after the read
+            committed = sum(r.margin for r in self.reserved.values()) + \
+                sum(r.margin for s, r in self.filled.items() if s not in open_symbols)
+            if margin > available_margin - committed:
+                return f"Insufficient margin (${margin:.2f} > ${max(available_margin - committed, 0):.2f} unreserved)"
+            reservation.margin = margin
+            reservation.state = 'reserved'
+            self.reserved[symbol] = reservation
+            return None
+
+    def _fill(self, reservation):
+        """The entry's market order filled: the slot stays taken for the rest of the cycle."""
+        with self._lock:
+            if self.reserved.get(reservation.symbol) is not reservation:
+                return
+            del self.reserved[reservation.symbol]
+            self.filled[reservation.symbol] = reservation
+            reservation.state = 'filled'
+            if reservation.strategy == BOS_STRATEGY:
+                bot_state.bos_cycle_count += 1
+                reservation.previous_bos_entry_time = bot_state.last_bos_entry_time
+                bot_state.last_bos_entry_time = time.time()
+
+    def _release(self, reservation):
+        """Frees the slot of an entry whose order failed or was unwound."""
+        with self._lock:
+            symbol = reservation.symbol
+            if self.reserved.get(symbol) is reservation:
+                del self.reserved[symbol]
+            elif self.filled.get(symbol) is reservation:
+                del self.filled[symbol]
+                if reservation.strategy == BOS_STRATEGY:
+                    bot_state.bos_cycle_count -= 1
+                    bot_state.last_bos_entry_time = reservation.previous_bos_entry_time
+            reservation.state = 'released'
+
+
+_current_slots = None
+
+
+def open_cycle():
+    """Starts the slot books for a new scan cycle and makes them the shared ones."""
+    global _current_slots
+    _current_slots = EntrySlots(
+        max_trades=_settings('MAX_CONCURRENT_TRADES', 1),
+        max_bos_trades=_settings('BOS_MAX_TRADES_PER_CYCLE', 1),
+    )
+    return _current_slots
+
+
+def get_entry_slots():
+    return _current_slots
@@ -1,23 +1,30 @@
 import sys
 from binance.enums import *
-from src.trade import place_order
+from src.entry_candidates import EntryCandidate, execute_candidate
 from data.indicators import *
-from data.indicators import calculate_volume_profile_full, calculate_roc, calculate_fib_extensions
+from data.indicators import calculate_volume_profile_full, calculate_roc
+from data.swing_tracker import get_swing_tracker
 from config.settings import *
 from config.settings import strategy_toggles
 
+# Indicators read per timeframe role, resolved by data.indicator_pipeline
+REQUIRED_INDICATORS = {
+    'execution': ('atr', 'vwap'),
+    'primary': ('adx', 'price_sma_50', 'price_sma_200'),
+}
 
 
-async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
+def evaluate_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
     """
     Checks for a LONG buying opportunity using a confirmation scoring system.
+    Returns the EntryCandidate, or None; places no order.
     """
     # --- Global BTC Filter ---
     from src.state_manager import bot_state
     if getattr(sys.modules['config.settings'], 'ENABLE_GLOBAL_BTC_FILTER', True) and bot_state.global_btc_trend == 'BEARISH' and symbol != 'BTCUSDT':
         if VERBOSE_LOGGING:
             print(f"Skipping LONG for {symbol}: Global BTC trend is BEARISH.")
-        return False
+        return None
 
     # --- Time Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_TIME_FILTER:
@@ -26,7 +33,7 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
         if current_hour >= 1 and current_hour < 7:
             if VERBOSE_LOGGING:
                 print(f"  FIB LONG rejected for {symbol}: Time Filter active (Asian dead hours).")
-            return False
+            return None
 
     # --- SMA 200 Trend Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_SMA_200_FILTER and 'price_sma_200' in df_4h.columns:
@@ -35,7 +42,7 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
         if pd.notna(sma_200_4h) and last_close < sma_200_4h:
             if VERBOSE_LOGGING:
                 print(f"  FIB LONG rejected for {symbol}: Price {last_close:.4f} < 4H SMA 200 {sma_200_4h:.4f}")
-            return False
+            return None
 
     # --- Core Condition 1: Moderate 4-hour uptrend ---
     adx_4h = df_4h['ADX'].iloc[-1]
@@ -43,15 +50,16 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
     last_close_4h = df_4h['close'].iloc[-1]
     is_strong_uptrend = adx_4h > FIB_ADX_THRESHOLD and last_close_4h > price_sma_4h
     if not is_strong_uptrend:
-        return False
+        return None
 
     # --- Core Condition 2: Golden Pocket Fibonacci Zone (0.618 to 0.65) ---
     # The "Golden Pocket" is the institutional entry zone between 0.618 and 0.65 retracement.
     # It is a tighter, higher-probability zone than a loose ±1% band.
     # Adopted from ICT (Inner Circle Trader) methodology used by prop desk traders.
-    swing_low, swing_high, fib_levels = find_swing_points_and_fib(df_15m, trend='long')
+    swing_tracker = get_swing_tracker(symbol, EXECUTION_TIMEFRAME).update(df_15m)
+    swing_low, swing_high, fib_levels = swing_tracker.swing_points_and_fib(trend='long')
     if not fib_levels:
-        return False
+        return None
     last_close_15m = df_15m['close'].iloc[-1]
     fib_618 = fib_levels['0.618']
     fib_786 = fib_levels['0.786']
@@ -62,7 +70,7 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
 
     # --- VWAP Confluence Check ---
     if 'vwap' not in df_15m.columns:
-        return False
+        return None
     vwap_price = df_15m['vwap'].iloc[-1]
     # VWAP must be within 0.5% of the 0.618 Fib level
     is_vwap_confluent = abs(vwap_price - fib_618) / fib_618 <= 0.005
@@ -81,7 +89,7 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
         # Strict Momentum Breakout Requirement (Trigger Pull)
         # Live price must break above the high of the previous closed candle
         if last_close_15m <= df_15m['high'].iloc[-2]:
-            return False
+            return None
 
         # --- Tally the confirmation signals ---
         confirmations = []
@@ -95,7 +103,7 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
         # --- Check if the score meets the minimum requirement ---
         if len(confirmations) > 0:
             # Calculate Fibonacci extension targets (institutional TP levels)
-            ext_levels = calculate_fib_extensions(swing_low, swing_high, trend='long')
+            ext_levels = swing_tracker.fib_extensions(trend='long')
             tp3_price = ext_levels.get('1.272', 0)
             tp4_price = ext_levels.get('1.618', 0)
 
@@ -122,29 +130,30 @@ async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
             print(f"{'='*70}\n")
 
             atr_value = df_15m['atr'].iloc[-1]
-            order_placed = await place_order(
+            return EntryCandidate(symbol, 'fib', dict(
                 symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
                 reason_to_open=f"Golden Pocket Fib ({', '.join(confirmations)}) | TP3={tp3_price:.4f} TP4={tp4_price:.4f}",
                 stop_loss_price=swing_low * (1 - FIB_STOP_BUFFER),
                 take_profit_price=tp3_price if tp3_price > 0 else None,
                 atr_value=atr_value, df=df_15m,
                 support_4h=swing_low, resistance_4h=swing_high, adx_value=adx_4h
-            )
-            # Return the actual result — if stop-loss failed, place_order returns False
-            # and we must NOT claim the trade was placed
-            return order_placed if order_placed is not None else False
-    return False
+            ), quality=len(confirmations))
+    return None
 
-async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
+async def check_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance):
+    return await execute_candidate(evaluate_fib_pullback_long_entry(symbol, df_15m, df_4h, usdt_balance))
+
+def evaluate_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
     """
     Checks for a SHORT selling opportunity using a confirmation scoring system.
+    Returns the EntryCandidate, or None; places no order.
     """
     # --- Global BTC Filter ---
     from src.state_manager import bot_state
     if getattr(sys.modules['config.settings'], 'ENABLE_GLOBAL_BTC_FILTER', True) and bot_state.global_btc_trend == 'BULLISH' and symbol != 'BTCUSDT':
         if VERBOSE_LOGGING:
             print(f"Skipping SHORT for {symbol}: Global BTC trend is BULLISH.")
-        return False
+        return None
 
     # --- Time Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_TIME_FILTER:
@@ -153,7 +162,7 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
         if current_hour >= 1 and current_hour < 7:
             if VERBOSE_LOGGING:
                 print(f"  FIB SHORT rejected for {symbol}: Time Filter active (Asian dead hours).")
-            return False
+            return None
 
     # --- SMA 200 Trend Filter (Dashboard Toggle) ---
     if strategy_toggles.USE_SMA_200_FILTER and 'price_sma_200' in df_4h.columns:
@@ -162,7 +171,7 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
         if pd.notna(sma_200_4h) and last_close > sma_200_4h:
             if VERBOSE_LOGGING:
                 print(f"  FIB SHORT rejected for {symbol}: Price {last_close:.4f} > 4H SMA 200 {sma_200_4h:.4f}")
-            return False
+            return None
 
     # --- Core Condition 1: Moderate 4-hour downtrend ---
     adx_4h = df_4h['ADX'].iloc[-1]
@@ -170,12 +179,13 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
     last_close_4h = df_4h['close'].iloc[-1]
     is_strong_downtrend = adx_4h > FIB_ADX_THRESHOLD and last_close_4h < price_sma_4h
     if not is_strong_downtrend:
-        return False
+        return None
 
     # --- Core Condition 2: Golden Pocket Fibonacci Zone (0.618 to 0.65) ---
-    swing_low, swing_high, fib_levels = find_swing_points_and_fib(df_15m, trend='short')
+    swing_tracker = get_swing_tracker(symbol, EXECUTION_TIMEFRAME).update(df_15m)
+    swing_low, swing_high, fib_levels = swing_tracker.swing_points_and_fib(trend='short')
     if not fib_levels:
-        return False
+        return None
     last_close_15m = df_15m['close'].iloc[-1]
     fib_618 = fib_levels['0.618']
     fib_786 = fib_levels['0.786']
@@ -186,7 +196,7 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
 
     # --- VWAP Confluence Check ---
     if 'vwap' not in df_15m.columns:
-        return False
+        return None
     vwap_price = df_15m['vwap'].iloc[-1]
     # VWAP must be within 0.5% of the 0.618 Fib level
     is_vwap_confluent = abs(vwap_price - fib_618) / fib_618 <= 0.005
@@ -205,7 +215,7 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
         # Strict Momentum Breakout Requirement (Trigger Pull)
         # Live price must break below the low of the previous closed candle
         if last_close_15m >= df_15m['low'].iloc[-2]:
-            return False
+            return None
 
         # --- Tally the confirmation signals ---
         confirmations = []
@@ -219,7 +229,7 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
         # --- Check if the score meets the minimum requirement ---
         if len(confirmations) > 0:
             # Fibonacci extension targets (institutional TP levels below swing low)
-            ext_levels = calculate_fib_extensions(swing_low, swing_high, trend='short')
+            ext_levels = swing_tracker.fib_extensions(trend='short')
             tp3_price = ext_levels.get('1.272', 0)
             tp4_price = ext_levels.get('1.618', 0)
 
@@ -246,13 +256,15 @@ async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
             print(f"{'='*70}\n")
 
             atr_value = df_15m['atr'].iloc[-1]
-            order_placed = await place_order(
+            return EntryCandidate(symbol, 'fib', dict(
                 symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
                 reason_to_open=f"Golden Pocket Fib ({', '.join(confirmations)}) | TP3={tp3_price:.4f} TP4={tp4_price:.4f}",
                 stop_loss_price=swing_high * (1 + FIB_STOP_BUFFER),
                 take_profit_price=tp3_price if tp3_price > 0 else None,
                 atr_value=atr_value, df=df_15m,
                 support_4h=swing_low, resistance_4h=swing_high, adx_value=adx_4h
-            )
-            return order_placed if order_placed is not None else False
-    return False
\ No newline at end of file
+            ), quality=len(confirmations))
+    return None
+
+async def check_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance):
+    return await execute_candidate(evaluate_fib_retrace_short_entry(symbol, df_15m, df_4h, usdt_balance))
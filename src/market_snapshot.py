@@ -0,0 +1,154 @@
+"""
+Market Snapshot — one shared view of prices, funding and the account per cycle.
+
+PURPOSE:
+    A scan cycle used to re-request the same exchange state over and over:
+    positions and balances once per candidate symbol, the mark price several
+    times per order and the balance again during order pre-flight. The
+    snapshot fetches that state once and lets every symbol task and the trade
+    manager read from it.
+
+HOW IT WORKS:
+    1. begin_cycle() builds a snapshot from three calls: the premium index
+       (mark price and funding rate for every symbol in one request),
+       position information and account balances.
+    2. Mark prices and funding rates are served from the snapshot while they
+       are younger than MARKET_SNAPSHOT_PRICE_TTL seconds. A read after that
+       refreshes the whole premium index once for every symbol.
+    3. Placing or closing a market order calls invalidate_account(). The next
+       account read refetches positions and balances once, for all readers.
+       A version counter makes sure an invalidation that races with an
+       in-flight refresh is not lost.
+    4. If the account read fails at the start of a cycle, the snapshot keeps
+       the previous cycle's positions and balances (none on the first cycle)
+       and is marked account_stale. The cycle still manages open positions;
+       the caller skips new entries until an account read succeeds.
+"""
+
+import sys
+import threading
+import time
+
+import config.settings
+from src.rate_limiter import client
+
+DEFAULT_PRICE_TTL_SECONDS = 15
+
+
+class MarketSnapshot:
+    def __init__(self, price_ttl=DEFAULT_PRICE_TTL_SECONDS):
+        self.price_ttl = price_ttl
+        self.created_at = time.time()
+        self.mark_prices = {}
+        self.funding_rates = {}
+        self.prices_time = 0.0
+        self.positions = []
+        self.balances = []
+        self.account_stale = False  # positions/balances carried over after a failed read
+        self._account_version = 1
+        self._fetched_version = 0
+        self._lock = threading.Lock()
+        self._price_refresh_lock = threading.Lock()
+        self._account_refresh_lock = threading.Lock()
+
+    # --- Refresh ---
+
+    def refresh_prices(self):
+        premium_index = client.futures_mark_price()
+        mark_prices = {}
+        funding_rates = {}
+        for item in premium_index:
+            mark_prices[item['symbol']] = float(item['markPrice'])
+            if 'lastFundingRate' in item:
+                funding_rates[item['symbol']] = float(item['lastFundingRate'])
+        with self._lock:
+            self.mark_prices, self.funding_rates, self.prices_time = mark_prices, funding_rates, time.time()
+
+    def refresh_account(self):
+        with self._lock:
+            version = self._account_version
+        positions = client.futures_position_information()
+        balances = client.futures_account_balance()
+        with self._lock:
+            self.positions, self.balances, self._fetched_version = positions, balances, version
+            self.account_stale = False
+
+    def keep_account(self, previous):
+        """After a failed account read: serves `previous` snapshot's positions and balances (or none) instead."""
+        with self._lock:
+            if previous is not None:
+                self.positions, self.balances = previous.positions, previous.balances
+            self._fetched_version = self._account_version
+            self.account_stale = True
+
+    def _ensure_prices(self):
+        if time.time() - self.prices_time <= self.price_ttl:
+            return
+        with self._price_refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if time.time() - self.prices_time > self.price_ttl:
+                self.refresh_prices()
+
+    def _ensure_account(self):
+        if self._fetched_version == self._account_version:
+            return
+        with self._account_refresh_lock:
+            if self._fetched_version != self._account_version:
+                self.refresh_account()
+
+    # --- Reads ---
+
+    def mark_price(self, symbol):
+        self._ensure_prices()
+        return self.mark_prices.get(symbol)
+
+    def get_funding_rates(self):
+        self._ensure_prices()
+        return self.funding_rates
+
+    def account(self):
+        """Returns (positions, balances), refetching them only if an order invalidated them."""
+        self._ensure_account()
+        with self._lock:
+            return self.positions, self.balances
+
+    def invalidate_account(self):
+        with self._lock:
+            self._account_version += 1
+
+
+_current_snapshot = None
+
+
+def begin_cycle():
+    """Builds the snapshot for a new cycle and makes it the shared one."""
+    global _current_snapshot
+    snapshot = MarketSnapshot(getattr(sys.modules['config.settings'], 'MARKET_SNAPSHOT_PRICE_TTL', DEFAULT_PRICE_TTL_SECONDS))
+    try:
+        snapshot.refresh_prices()
+    except Exception as e:
+        print(f"Error fetching premium index: {e}")
+    try:
+        snapshot.refresh_account()
+    except Exception as e:
+        print(f"Error fetching account data: {e}. Keeping the previous cycle's positions; no new entries this cycle.")
+        snapshot.keep_account(_current_snapshot)
+    _current_snapshot = snapshot
+    return snapshot
+
+
+def get_snapshot():
+    return _current_snapshot
+
+
+def get_account():
+    """(positions, balances) from the current snapshot, or fetched directly outside a cycle."""
+    if _current_snapshot is not None:
+        return _current_snapshot.account()
+    return client.futures_position_information(), client.futures_account_balance()
+
+
+def invalidate_account():
+    """Marks positions and balances as stale after an order changed them."""
+    if _current_snapshot is not None:
+        _current_snapshot.invalidate_account()
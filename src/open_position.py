@@ -1,6 +1,6 @@
 import sys
 from binance.enums import *
-from src.trade import place_order
+from src.entry_candidates import EntryCandidate, execute_candidate
 from data.indicators import *
 from data.indicators import calculate_roc
 from config.settings import *
@@ -12,7 +12,14 @@ import pandas as pd
 import time
 import sys
 
-async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
+# Indicators read per timeframe role, resolved by data.indicator_pipeline
+REQUIRED_INDICATORS = {
+    'execution': ('atr', 'rsi', 'vwap', 'volume_anomaly', 'macd', 'hma_14', 'price_sma_50', 'adx', 'bollinger', 'bos', 'stoch'),
+    'hourly': ('stoch',),
+    'primary': ('price_sma_200',),
+}
+
+def evaluate_open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
     
     # NOTE: Cooldown lockout is enforced in process_symbol() before this function is called.
 
@@ -21,7 +28,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
         if VERBOSE_LOGGING:
             print(f"Skipping LONG for {symbol}: Global BTC trend is BEARISH.")
         log_rejected_signal(symbol, 'LONG', {}, "Global BTC trend is BEARISH")
-        return False
+        return None
 
     # Time-based filter - skip low volatility periods
     if strategy_toggles.USE_TIME_FILTER:
@@ -30,7 +37,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"⏰ Skipping LONG for {symbol}: {time_reason}")
             log_rejected_signal(symbol, 'LONG', {}, f"Time Filter: {time_reason}")
-            return False
+            return None
     
     adx_value = df_15m['ADX'].iloc[-1]
 
@@ -39,7 +46,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
         if VERBOSE_LOGGING:
             print(f"Skipping LONG for {symbol}: ADX is {adx_value:.2f}, below minimum threshold of {MIN_ADX_THRESHOLD}.")
         log_rejected_signal(symbol, 'LONG', {'ADX': adx_value}, f"ADX below {MIN_ADX_THRESHOLD}")
-        return False
+        return None
 
     # === PHASE 1 IMPROVEMENT: SMA 200 Trend Filter on 4H ===
     if strategy_toggles.USE_SMA_200_FILTER:
@@ -49,7 +56,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: Price (${last_close_4h:.2f}) below 4H SMA 200 (${sma_200_4h:.2f}).")
             log_rejected_signal(symbol, 'LONG', {}, "Price below 4H SMA 200")
-            return False
+            return None
 
     # === PHASE 1 IMPROVEMENT: Multi-Timeframe Stochastic Alignment ===
     if strategy_toggles.REQUIRE_1H_STOCH_ALIGNMENT:
@@ -59,7 +66,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: 1H Stochastic ({stoch_k_1h.iloc[-1]:.2f}) not aligned (not oversold).")
             log_rejected_signal(symbol, 'LONG', {'Stoch_K': stoch_k_1h.iloc[-1]}, "1H Stoch not aligned")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Institutional VWAP Filter ===
     if getattr(strategy_toggles, 'REQUIRE_VWAP_ALIGNMENT', False):
@@ -69,7 +76,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: Price (${current_price:.2f}) below VWAP (${vwap:.2f}).")
             log_rejected_signal(symbol, 'LONG', {'Price': current_price, 'VWAP': vwap}, "Price below VWAP")
-            return False
+            return None
 
     # === NEW: Exhaustion Guard ===
     if getattr(strategy_toggles, 'REQUIRE_ATR_EXHAUSTION_GUARD', False):
@@ -80,7 +87,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: Trigger candle size ({candle_size:.4f}) exceeds {MAX_CANDLE_ATR_MULTIPLIER}x ATR ({atr_value:.4f}). Exhaustion risk.")
             log_rejected_signal(symbol, 'LONG', {'Candle_Size': candle_size, 'ATR': atr_value}, "ATR Exhaustion Guard")
-            return False
+            return None
 
     # === NEW: Mean-Reversion Guard (Bollinger Bands) ===
     if getattr(strategy_toggles, 'REQUIRE_BB_REVERSION_GUARD', False) and 'BB_Upper' in df_15m.columns:
@@ -90,7 +97,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: Price (${current_price:.4f}) is pushing above upper Bollinger Band (${bb_upper:.4f}). Mean-reversion risk.")
             log_rejected_signal(symbol, 'LONG', {'Price': current_price, 'BB_Upper': bb_upper}, "Bollinger Band Reversion Guard")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Volume Anomaly Detection ===
     if getattr(strategy_toggles, 'REQUIRE_VOLUME_ANOMALY', False):
@@ -98,7 +105,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: No volume anomaly detected (insufficient momentum).")
             log_rejected_signal(symbol, 'LONG', {}, "No Volume Anomaly")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Break of Structure (BOS) ===
     if getattr(strategy_toggles, 'REQUIRE_BOS', False):
@@ -107,7 +114,7 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
             if VERBOSE_LOGGING:
                 print(f"Skipping LONG for {symbol}: No Bullish Break of Structure (BOS) on last closed candle.")
             log_rejected_signal(symbol, 'LONG', {}, "No Bullish BOS")
-            return False
+            return None
 
     if AGGRESSIVE_ENTRY:
         last_close = df_15m['close'].iloc[-1]
@@ -157,11 +164,10 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
 
             log_signal_analysis(symbol, {**indicators, 'Price': float(last_close), 'Bullish_BOS': bool(df_15m['bullish_bos'].iloc[-1])}, 'LONG', 'All criteria met')
 
-            result = await place_order(symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
+            return EntryCandidate(symbol, 'stoch', dict(symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
                                      reason_to_open="Bullish confluence (Aggressive)",
                                      stop_loss_atr_multiplier=2.0, atr_value=atr_value, df=df_15m,
-                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value)
-            return result
+                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value), quality=adx_value)
         else:
             rejection_reasons = []
             if not stochastic_signal:
@@ -199,15 +205,20 @@ async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, st
         hma_is_sloping_up = df_15m['hma_14'].iloc[-1] > df_15m['hma_14'].iloc[-2] # HMA check added
         
         if (stochastic_signal and price_above_sma and rsi_is_bullish and confirmation_is_bullish and hma_is_sloping_up):
-            print(f"✅ Placing SAFE LONG for {symbol} - ADX: {adx_value:.1f}, 15m Stoch: {stoch_k_15m.iloc[-1]:.1f}, 1h Stoch: {stoch_k_1h.iloc[-1]:.1f}")
-            return await place_order(symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance, 
-                                     reason_to_open="Bullish confluence (Safe)", 
+            print(f"✅ SAFE LONG signal for {symbol} - ADX: {adx_value:.1f}, 15m Stoch: {stoch_k_15m.iloc[-1]:.1f}, 1h Stoch: {stoch_k_1h.iloc[-1]:.1f}")
+            return EntryCandidate(symbol, 'stoch', dict(symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
+                                     reason_to_open="Bullish confluence (Safe)",
                                      stop_loss_atr_multiplier=2.0, atr_value=atr_value, df=df_15m,
-                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value)
+                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value), quality=adx_value)
             
-    return False
+    return None
 
-async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
+async def open_position_long(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
+    return await execute_candidate(evaluate_open_position_long(
+        symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance,
+        atr_value, funding_rate, support_4h, resistance_4h))
+
+def evaluate_open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
 
 
     # NOTE: Cooldown lockout is enforced in process_symbol() before this function is called.
@@ -217,7 +228,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
         if VERBOSE_LOGGING:
             print(f"Skipping SHORT for {symbol}: Global BTC trend is BULLISH.")
         log_rejected_signal(symbol, 'SHORT', {}, "Global BTC trend is BULLISH")
-        return False
+        return None
 
     # Time-based filter - skip low volatility periods (mirrors long filter)
     if strategy_toggles.USE_TIME_FILTER:
@@ -226,7 +237,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"⏰ Skipping SHORT for {symbol}: {time_reason}")
             log_rejected_signal(symbol, 'SHORT', {}, f"Time Filter: {time_reason}")
-            return False
+            return None
 
     adx_value = df_15m['ADX'].iloc[-1]
 
@@ -235,7 +246,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
         if VERBOSE_LOGGING:
             print(f"Skipping SHORT for {symbol}: ADX is {adx_value:.2f}, below minimum threshold of {MIN_ADX_THRESHOLD}.")
         log_rejected_signal(symbol, 'SHORT', {'ADX': adx_value}, f"ADX below {MIN_ADX_THRESHOLD}")
-        return False
+        return None
 
     # === PHASE 1 IMPROVEMENT: SMA 200 Trend Filter on 4H ===
     if strategy_toggles.USE_SMA_200_FILTER:
@@ -245,7 +256,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: Price (${last_close_4h:.2f}) above 4H SMA 200 (${sma_200_4h:.2f}).")
             log_rejected_signal(symbol, 'SHORT', {}, "Price above 4H SMA 200")
-            return False
+            return None
 
     # === PHASE 1 IMPROVEMENT: Multi-Timeframe Stochastic Alignment ===
     if strategy_toggles.REQUIRE_1H_STOCH_ALIGNMENT:
@@ -255,7 +266,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: 1H Stochastic ({stoch_k_1h.iloc[-1]:.2f}) not aligned (not overbought).")
             log_rejected_signal(symbol, 'SHORT', {'Stoch_K': stoch_k_1h.iloc[-1]}, "1H Stoch not aligned")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Institutional VWAP Filter ===
     if getattr(strategy_toggles, 'REQUIRE_VWAP_ALIGNMENT', False):
@@ -265,7 +276,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: Price (${current_price:.2f}) above VWAP (${vwap:.2f}).")
             log_rejected_signal(symbol, 'SHORT', {'Price': current_price, 'VWAP': vwap}, "Price above VWAP")
-            return False
+            return None
 
     # === NEW: Exhaustion Guard ===
     if getattr(strategy_toggles, 'REQUIRE_ATR_EXHAUSTION_GUARD', False):
@@ -276,7 +287,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: Trigger candle size ({candle_size:.4f}) exceeds {MAX_CANDLE_ATR_MULTIPLIER}x ATR ({atr_value:.4f}). Exhaustion risk.")
             log_rejected_signal(symbol, 'SHORT', {'Candle_Size': candle_size, 'ATR': atr_value}, "ATR Exhaustion Guard")
-            return False
+            return None
 
     # === NEW: Mean-Reversion Guard (Bollinger Bands) ===
     if getattr(strategy_toggles, 'REQUIRE_BB_REVERSION_GUARD', False) and 'BB_Lower' in df_15m.columns:
@@ -286,7 +297,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: Price (${current_price:.4f}) is pushing below lower Bollinger Band (${bb_lower:.4f}). Mean-reversion risk.")
             log_rejected_signal(symbol, 'SHORT', {'Price': current_price, 'BB_Lower': bb_lower}, "Bollinger Band Reversion Guard")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Volume Anomaly Detection ===
     if getattr(strategy_toggles, 'REQUIRE_VOLUME_ANOMALY', False):
@@ -294,7 +305,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: No volume anomaly detected (insufficient momentum).")
             log_rejected_signal(symbol, 'SHORT', {}, "No Volume Anomaly")
-            return False
+            return None
 
     # === PHASE 2 IMPROVEMENT: Break of Structure (BOS) ===
     if getattr(strategy_toggles, 'REQUIRE_BOS', False):
@@ -303,7 +314,7 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             if VERBOSE_LOGGING:
                 print(f"Skipping SHORT for {symbol}: No Bearish Break of Structure (BOS) on last closed candle.")
             log_rejected_signal(symbol, 'SHORT', {}, "No Bearish BOS")
-            return False
+            return None
 
     if AGGRESSIVE_ENTRY:
         last_close = df_15m['close'].iloc[-1]
@@ -340,10 +351,10 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
             
             log_signal_analysis(symbol, {'Price': float(last_close), 'Bearish_BOS': bool(df_15m['bearish_bos'].iloc[-1])}, 'SHORT', 'All criteria met')
             
-            return await place_order(symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
+            return EntryCandidate(symbol, 'stoch', dict(symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
                                      reason_to_open="Bearish confluence (Aggressive)",
                                      stop_loss_atr_multiplier=2.0, atr_value=atr_value, df=df_15m,
-                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value)
+                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value), quality=adx_value)
         else:
             rejection_reasons = []
             if not stochastic_signal:
@@ -382,10 +393,15 @@ async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, s
         hma_is_sloping_down = df_15m['hma_14'].iloc[-1] < df_15m['hma_14'].iloc[-2]
 
         if (stochastic_signal and price_below_sma and rsi_is_bearish and confirmation_is_bearish and hma_is_sloping_down):
-            print(f"🔻 Placing SAFE SHORT for {symbol} - ADX: {adx_value:.1f}, 15m Stoch: {stoch_k_15m.iloc[-1]:.1f}, 1h Stoch: {stoch_k_1h.iloc[-1]:.1f}")
-            return await place_order(symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
+            print(f"🔻 SAFE SHORT signal for {symbol} - ADX: {adx_value:.1f}, 15m Stoch: {stoch_k_15m.iloc[-1]:.1f}, 1h Stoch: {stoch_k_1h.iloc[-1]:.1f}")
+            return EntryCandidate(symbol, 'stoch', dict(symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
                                      reason_to_open="Bearish confluence (Safe)",
                                      stop_loss_atr_multiplier=2.0, atr_value=atr_value, df=df_15m,
-                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value)
+                                     support_4h=support_4h, resistance_4h=resistance_4h, adx_value=adx_value), quality=adx_value)
+
+    return None
 
-    return False
\ No newline at end of file
+async def open_position_short(symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance, atr_value, funding_rate, support_4h, resistance_4h):
+    return await execute_candidate(evaluate_open_position_short(
+        symbol, df_15m, df_4h, stoch_k_15m, stoch_d_15m, stoch_k_1h, stoch_d_1h, usdt_balance, support, resistance,
+        atr_value, funding_rate, support_4h, resistance_4h))
@@ -0,0 +1,304 @@
+"""
+Rate Limiter — weight-aware admission for every exchange call.
+
+PURPOSE:
+    Binance futures budgets requests by weight per IP per minute (2400) and
+    orders per account per 10s/1m. A fixed semaphore or sleep() either wastes
+    that budget or runs into 429 (rate limited) and 418 (IP banned) responses.
+
+HOW IT WORKS:
+    1. Each client method has a request weight (some depend on `limit` or on
+       whether a symbol is given). A call is admitted only if the weight fits
+       into the current minute window; otherwise it waits for the next window.
+    2. The local estimate is corrected from the X-MBX-USED-WEIGHT-1M and
+       X-MBX-ORDER-COUNT-10S/1M response headers, so weight used by other
+       processes on the same IP is accounted for.
+    3. Order-management traffic (orders, positions, balances) may use the full
+       budget. Market-data scans stop at (1 - RATE_LIMIT_ORDER_RESERVE) of it
+       and also yield while order traffic is waiting.
+    4. A 429/418 blocks all admission until Retry-After has passed.
+
+    `client` is the synchronous python-binance client wrapped so that every
+    call goes through the limiter; the async client in src/async_client.py
+    uses the same limiter instance.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import config.settings
+from config.client import client as _raw_client
+
+PRIORITY_ORDER = 0
+PRIORITY_MARKET = 1
+
+DEFAULT_WEIGHT_PER_MINUTE = 2400
+DEFAULT_ORDERS_PER_10S = 300
+DEFAULT_ORDERS_PER_MINUTE = 1200
+DEFAULT_SAFETY = 0.9
+DEFAULT_ORDER_RESERVE = 0.2
+DEFAULT_BAN_SECONDS = {429: 60, 418: 300}
+
+
+def _klines_weight(params):
+    limit = int(params.get('limit', 500))
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    return 5 if limit <= 1000 else 10
+
+
+def _depth_weight(params):
+    limit = int(params.get('limit', 500))
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    return 10 if limit <= 500 else 20
+
+
+def _mark_price_weight(params):
+    # premiumIndex without a symbol returns every symbol
+    return 1 if params.get('symbol') else 10
+
+
+def _per_symbol_weight(params):
+    # Order queries without a symbol scan the whole account
+    return 1 if params.get('symbol') else 40
+
+
+# client method -> (weight or weight(params), priority, counts toward order limits)
+ENDPOINT_LIMITS = {
+    'futures_klines':                 (_klines_weight,     PRIORITY_MARKET, False),
+    'futures_mark_price':             (_mark_price_weight, PRIORITY_MARKET, False),
+    'futures_order_book':             (_depth_weight,      PRIORITY_MARKET, False),
+    'futures_exchange_info':          (1,                  PRIORITY_MARKET, False),
+    'futures_account_trades':         (5,                  PRIORITY_MARKET, False),
+    'futures_leverage_bracket':       (1,                  PRIORITY_MARKET, False),
+    'futures_position_information':   (5,                  PRIORITY_ORDER,  False),
+    'futures_account_balance':        (5,                  PRIORITY_ORDER,  False),
+    'futures_change_leverage':        (1,                  PRIORITY_ORDER,  False),
+    'futures_change_margin_type':     (1,                  PRIORITY_ORDER,  False),
+    'futures_get_open_orders':        (_per_symbol_weight, PRIORITY_ORDER,  False),
+    'futures_get_open_algo_orders':   (_per_symbol_weight, PRIORITY_ORDER,  False),
+    'futures_create_order':           (1,                  PRIORITY_ORDER,  True),
+    'futures_cancel_order':           (1,                  PRIORITY_ORDER,  False),
+    'futures_cancel_all_open_orders': (1,                  PRIORITY_ORDER,  False),
+    'futures_create_algo_order':      (1,                  PRIORITY_ORDER,  True),
+    'futures_cancel_algo_order':      (1,                  PRIORITY_ORDER,  False),
+}
+
+
+def endpoint_limits(name, params):
+    """Returns (weight, priority, is_order) for a client method call."""
+    weight, priority, is_order = ENDPOINT_LIMITS.get(name, (1, PRIORITY_MARKET, False))
+    if callable(weight):
+        weight = weight(params)
+    return weight, priority, is_order
+
+
+class WeightRateLimiter:
+    def __init__(self, weight_per_minute=DEFAULT_WEIGHT_PER_MINUTE, orders_per_10s=DEFAULT_ORDERS_PER_10S,
+                 orders_per_minute=DEFAULT_ORDERS_PER_MINUTE, safety=DEFAULT_SAFETY, order_reserve=DEFAULT_ORDER_RESERVE):
+        self.weight_cap = weight_per_minute * safety
+        self.market_weight_cap = self.weight_cap * (1 - order_reserve)
+        self.orders_10s_cap = orders_per_10s * safety
+        self.orders_1m_cap = orders_per_minute * safety
+        self._lock = threading.Lock()
+        self._minute = 0
+        self._ten_seconds = 0
+        self.used_weight = 0
+        self.orders_10s = 0
+        self.orders_1m = 0
+        self.blocked_until = 0.0
+        self._waiting_orders = 0
+
+    # --- Admission ---
+
+    def _roll(self, now):
+        minute = int(now // 60)
+        if minute != self._minute:
+            self._minute = minute
+            self.used_weight = 0
+            self.orders_1m = 0
+        ten_seconds = int(now // 10)
+        if ten_seconds != self._ten_seconds:
+            self._ten_seconds = ten_seconds
+            self.orders_10s = 0
+
+    def _try_acquire(self, weight, priority, is_order):
+        """Admits the call and returns 0, or returns how many seconds to wait before retrying."""
+        with self._lock:
+            now = time.time()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._roll(now)
+            next_minute = (self._minute + 1) * 60 - now
+            if priority != PRIORITY_ORDER:
+                if self._waiting_orders:
+                    return 0.05
+                if self.used_weight + weight > self.market_weight_cap:
+                    return next_minute
+            elif self.used_weight + weight > self.weight_cap:
+                return next_minute
+            if is_order:
+                if self.orders_1m + 1 > self.orders_1m_cap:
+                    return next_minute
+                if self.orders_10s + 1 > self.orders_10s_cap:
+                    return (self._ten_seconds + 1) * 10 - now
+                self.orders_10s += 1
+                self.orders_1m += 1
+            self.used_weight += weight
+            return 0
+
+    def _set_waiting(self, priority, delta):
+        if priority == PRIORITY_ORDER:
+            with self._lock:
+                self._waiting_orders += delta
+
+    def acquire(self, name, params):
+        """Blocks the calling thread until the call fits the budget."""
+        weight, priority, is_order = endpoint_limits(name, params)
+        wait = self._try_acquire(weight, priority, is_order)
+        if not wait:
+            return
+        self._set_waiting(priority, 1)
+        try:
+            while wait:
+                time.sleep(min(wait, 1.0))
+                wait = self._try_acquire(weight, priority, is_order)
+        finally:
+            self._set_waiting(priority, -1)
+
+    async def acquire_async(self, name, params):
+        """Awaitable acquire for coroutine callers; never blocks the event loop."""
+        weight, priority, is_order = endpoint_limits(name, params)
+        wait = self._try_acquire(weight, priority, is_order)
+        if not wait:
+            return
+        self._set_waiting(priority, 1)
+        try:
+            while wait:
+                await asyncio.sleep(min(wait, 1.0))
+                wait = self._try_acquire(weight, priority, is_order)
+        finally:
+            self._set_waiting(priority, -1)
+
+    # --- Feedback from responses ---
+
+    def update_from_headers(self, headers):
+        """Adopts the exchange's view of used weight and order counts when it is higher than ours."""
+        if not headers:
+            return
+        used_weight = headers.get('X-MBX-USED-WEIGHT-1M')
+        orders_10s = headers.get('X-MBX-ORDER-COUNT-10S')
+        orders_1m = headers.get('X-MBX-ORDER-COUNT-1M')
+        with self._lock:
+            self._roll(time.time())
+            if used_weight is not None:
+                self.used_weight = max(self.used_weight, int(used_weight))
+            if orders_10s is not None:
+                self.orders_10s = max(self.orders_10s, int(orders_10s))
+            if orders_1m is not None:
+                self.orders_1m = max(self.orders_1m, int(orders_1m))
+
+    def on_rate_limited(self, status_code, retry_after=None):
+        """Blocks all admission after a 429 (rate limited) or 418 (IP ban)."""
+        try:
+            seconds = float(retry_after)
+        except (TypeError, ValueError):
+            seconds = DEFAULT_BAN_SECONDS.get(status_code, 60)
+        with self._lock:
+            already_blocked = self.blocked_until > time.time()
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+        # Concurrent in-flight requests all see the same 429; report the pause once
+        if not already_blocked:
+            print(f"[Rate Limiter] HTTP {status_code} from Binance. Pausing all requests for {seconds:.0f}s.")
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Returns the process-wide limiter, configured from settings on first use."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            settings = sys.modules['config.settings']
+            _rate_limiter = WeightRateLimiter(
+                weight_per_minute=getattr(settings, 'RATE_LIMIT_WEIGHT_PER_MINUTE', DEFAULT_WEIGHT_PER_MINUTE),
+                orders_per_10s=getattr(settings, 'RATE_LIMIT_ORDERS_PER_10S', DEFAULT_ORDERS_PER_10S),
+                orders_per_minute=getattr(settings, 'RATE_LIMIT_ORDERS_PER_MINUTE', DEFAULT_ORDERS_PER_MINUTE),
+                safety=getattr(settings, 'RATE_LIMIT_SAFETY', DEFAULT_SAFETY),
+                order_reserve=getattr(settings, 'RATE_LIMIT_ORDER_RESERVE', DEFAULT_ORDER_RESERVE),
+            )
+        return _rate_limiter
+
+
+class RateLimitedClient:
+    """
+    Wraps the synchronous client so every method call is admitted by the limiter.
+
+    python-binance keeps only the last HTTP response on the client, which
+    another thread may already have replaced. A response hook on the client's
+    requests session records each response in the thread that made it, so a
+    call reads the headers of its own response. A client without a session
+    is called under a lock instead, keeping the request and the header read
+    together.
+    """
+
+    def __init__(self, raw_client):
+        self._client = raw_client
+        self._local = threading.local()
+        self._call_lock = None
+        hooks = getattr(getattr(raw_client, 'session', None), 'hooks', None)
+        if isinstance(hooks, dict) and isinstance(hooks.get('response'), list):
+            hooks['response'].append(self._record_response)
+        else:
+            self._call_lock = threading.Lock()
+
+    def _record_response(self, response, *args, **kwargs):
+        self._local.response = response
+        return response
+
+    def _response_headers(self):
+        if self._call_lock is not None:
+            response = getattr(self._client, 'response', None)
+        else:
+            response = getattr(self._local, 'response', None)
+        return getattr(response, 'headers', None)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or not name.startswith('futures_'):
+            return attr
+
+        def call(*args, **kwargs):
+            limiter = get_rate_limiter()
+            limiter.acquire(name, kwargs)
+            self._local.response = None
+            try:
+                if self._call_lock is None:
+                    result = attr(*args, **kwargs)
+                    headers = self._response_headers()
+                else:
+                    with self._call_lock:
+                        result = attr(*args, **kwargs)
+                        headers = self._response_headers()
+            except Exception as e:
+                status_code = getattr(e, 'status_code', None)
+                response = getattr(e, 'response', None)
+                if status_code in (429, 418):
+                    headers = getattr(response, 'headers', None) or {}
+                    limiter.on_rate_limited(status_code, headers.get('Retry-After'))
+                raise
+            limiter.update_from_headers(headers)
+            return result
+        return call
+
+
+client = RateLimitedClient(_raw_client)
@@ -293,9 +293,6 @@ def reconcile_trades(symbols: list, verbose: bool = True) -> dict:
             if verbose:
                 print(f"  WARNING: Error syncing {symbol}: {e}")
 
-        # Small delay to avoid rate limiting on 25+ symbols
-        time.sleep(0.1)
-
     result = {
         'backfilled_count': backfilled,
         'skipped_count':    skipped,
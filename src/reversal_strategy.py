@@ -1,5 +1,5 @@
 from binance.enums import SIDE_BUY, SIDE_SELL
-from src.trade import place_order
+from src.entry_candidates import EntryCandidate, execute_candidate
 from data.indicators import (
     calculate_stoch, calculate_bollinger_bands, add_candlestick_patterns, detect_rsi_divergence
 )
@@ -12,10 +12,18 @@ from src.detailed_logger import log_rejected_signal, log_signal_analysis
 import pandas as pd
 import sys
 
-async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, support_4h):
+# Indicators read per timeframe role, resolved by data.indicator_pipeline
+REQUIRED_INDICATORS = {
+    'execution': ('atr', 'price_sma_50', 'rsi'),
+    'hourly': ('stoch',),
+    'primary': ('adx',),
+}
+
+def evaluate_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, support_4h):
     """
     Mean-Reversion LONG: Catches falling knives at extreme support.
     Explicitly BYPASSES the global BTC filter and the SMA 200 Trend filter.
+    Returns the EntryCandidate, or None; places no order.
     """
     
     # Optional time filter
@@ -25,14 +33,14 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
         if not is_optimal:
             if VERBOSE_LOGGING:
                 print(f"⏰ Skipping REVERSAL LONG for {symbol}: {time_reason}")
-            return False
+            return None
 
     # 1. Extreme Oversold condition on High Timeframe (1H Stochastic)
     stoch_1h_oversold = stoch_k_1h.iloc[-1] < REVERSAL_STOCH_THRESHOLD
     if not stoch_1h_oversold:
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL LONG for {symbol}: 1H Stochastic ({stoch_k_1h.iloc[-1]:.2f}) not extreme oversold (<{REVERSAL_STOCH_THRESHOLD}).")
-        return False
+        return None
 
     # 2. Extreme Oversold on Lower Timeframe (15m RSI)
     rsi_15m_oversold = df_15m['rsi'].iloc[-1] < REVERSAL_RSI_THRESHOLD
@@ -41,7 +49,7 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
     if not (rsi_15m_oversold or bullish_div):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL LONG for {symbol}: 15m RSI ({df_15m['rsi'].iloc[-1]:.2f}) not oversold and no bullish divergence.")
-        return False
+        return None
 
     # Calculate additional indicators for entry confirmation
     df_15m = calculate_bollinger_bands(df_15m, period=20)
@@ -64,7 +72,7 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
     if not (near_support or piercing_bb):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL LONG for {symbol}: Closed candle not at 4H support or piercing Lower BB.")
-        return False
+        return None
 
     # 4. Entry Trigger: Bullish Candlestick Pattern or Strong Wick Rejection (on closed candle)
     bullish_pattern = df_15m['bullish_pattern'].iloc[-2] == 1
@@ -79,7 +87,7 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
     if not (bullish_pattern or strong_rejection):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL LONG for {symbol}: Waiting for bullish candlestick pattern or wick rejection on closed candle.")
-        return False
+        return None
 
     # 5. Momentum Confirmation (Trigger Pull)
     # The current live price must break ABOVE the high of the closed rejection candle
@@ -87,7 +95,7 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
     if last_close <= closed_high:
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL LONG for {symbol}: Waiting for price ({last_close:.4f}) to break above closed rejection candle high ({closed_high:.4f}).")
-        return False
+        return None
 
     # ALL CONDITIONS MET FOR REVERSAL LONG
     # Stop loss goes below the wick of the confirmed closed candle
@@ -110,7 +118,7 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
     print(f"  15m RSI:          {df_15m['rsi'].iloc[-1]:.2f} (Divergence: {bullish_div})")
     print(f"  Trigger:          {'Bullish Pattern' if bullish_pattern else 'Wick Rejection'}")
     print(f"  Location:         {'At 4H Support' if near_support else 'Piercing Lower BB'}")
-    print(f"\n--- Trade Execution ---")
+    print(f"\n--- Trade Plan ---")
     print(f"  Entry Price:      {last_close:.4f}")
     print(f"  Stop Loss:        {stop_loss_price:.4f} (Below wick)")
     print(f"  Take Profit:      {take_profit_price:.4f} (Mean Reversion Target)")
@@ -125,22 +133,27 @@ async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bala
         'Price': float(last_close)
     }, 'LONG_REVERSAL', 'Reversal conditions met')
 
-    order_placed = await place_order(
+    # Quality: how many of the optional confluences (divergence, 4H level, BB pierce, pattern) line up
+    confluences = int(bool(bullish_div)) + int(bool(near_support)) + int(bool(piercing_bb)) + int(bool(bullish_pattern))
+    return EntryCandidate(symbol, 'reversal', dict(
         symbol=symbol, side=SIDE_BUY, usdt_balance=usdt_balance,
         reason_to_open="Extreme Mean Reversion (LONG)",
         stop_loss_price=stop_loss_price,
         take_profit_price=take_profit_price,
         atr_value=atr_value, df=df_15m,
         support_4h=support_4h, resistance_4h=None, adx_value=adx_4h
-    )
-    
-    return order_placed if order_placed is not None else False
+    ), quality=confluences)
 
 
-async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, resistance_4h):
+async def check_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, support_4h):
+    return await execute_candidate(evaluate_reversal_long_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, support_4h))
+
+
+def evaluate_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, resistance_4h):
     """
     Mean-Reversion SHORT: Catches exhaustion spikes at extreme resistance.
     Explicitly BYPASSES the global BTC filter and the SMA 200 Trend filter.
+    Returns the EntryCandidate, or None; places no order.
     """
     
     # Optional time filter
@@ -150,14 +163,14 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
         if not is_optimal:
             if VERBOSE_LOGGING:
                 print(f"⏰ Skipping REVERSAL SHORT for {symbol}: {time_reason}")
-            return False
+            return None
 
     # 1. Extreme Overbought condition on High Timeframe (1H Stochastic)
     stoch_1h_overbought = stoch_k_1h.iloc[-1] > (100 - REVERSAL_STOCH_THRESHOLD)
     if not stoch_1h_overbought:
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL SHORT for {symbol}: 1H Stochastic ({stoch_k_1h.iloc[-1]:.2f}) not extreme overbought (>{100 - REVERSAL_STOCH_THRESHOLD}).")
-        return False
+        return None
 
     # 2. Extreme Overbought on Lower Timeframe (15m RSI)
     rsi_15m_overbought = df_15m['rsi'].iloc[-1] > (100 - REVERSAL_RSI_THRESHOLD)
@@ -166,7 +179,7 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
     if not (rsi_15m_overbought or bearish_div):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL SHORT for {symbol}: 15m RSI ({df_15m['rsi'].iloc[-1]:.2f}) not overbought and no bearish divergence.")
-        return False
+        return None
 
     # Calculate additional indicators for entry confirmation
     df_15m = calculate_bollinger_bands(df_15m, period=20)
@@ -189,7 +202,7 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
     if not (near_resistance or piercing_bb):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL SHORT for {symbol}: Closed candle not at 4H resistance or piercing Upper BB.")
-        return False
+        return None
 
     # 4. Entry Trigger: Bearish Candlestick Pattern or Strong Wick Rejection (on closed candle)
     bearish_pattern = df_15m['bearish_pattern'].iloc[-2] == 1
@@ -204,7 +217,7 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
     if not (bearish_pattern or strong_rejection):
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL SHORT for {symbol}: Waiting for bearish candlestick pattern or wick rejection on closed candle.")
-        return False
+        return None
 
     # 5. Momentum Confirmation (Trigger Pull)
     # The current live price must break BELOW the low of the closed rejection candle
@@ -212,7 +225,7 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
     if last_close >= closed_low:
         if VERBOSE_LOGGING:
             print(f"Skipping REVERSAL SHORT for {symbol}: Waiting for price ({last_close:.4f}) to break below closed rejection candle low ({closed_low:.4f}).")
-        return False
+        return None
 
     # ALL CONDITIONS MET FOR REVERSAL SHORT
     # Stop loss goes above the wick of the confirmed closed candle
@@ -235,7 +248,7 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
     print(f"  15m RSI:          {df_15m['rsi'].iloc[-1]:.2f} (Divergence: {bearish_div})")
     print(f"  Trigger:          {'Bearish Pattern' if bearish_pattern else 'Wick Rejection'}")
     print(f"  Location:         {'At 4H Resistance' if near_resistance else 'Piercing Upper BB'}")
-    print(f"\n--- Trade Execution ---")
+    print(f"\n--- Trade Plan ---")
     print(f"  Entry Price:      {last_close:.4f}")
     print(f"  Stop Loss:        {stop_loss_price:.4f} (Above wick)")
     print(f"  Take Profit:      {take_profit_price:.4f} (Mean Reversion Target)")
@@ -250,13 +263,17 @@ async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_bal
         'Price': float(last_close)
     }, 'SHORT_REVERSAL', 'Reversal conditions met')
 
-    order_placed = await place_order(
+    # Quality: how many of the optional confluences (divergence, 4H level, BB pierce, pattern) line up
+    confluences = int(bool(bearish_div)) + int(bool(near_resistance)) + int(bool(piercing_bb)) + int(bool(bearish_pattern))
+    return EntryCandidate(symbol, 'reversal', dict(
         symbol=symbol, side=SIDE_SELL, usdt_balance=usdt_balance,
         reason_to_open="Extreme Mean Reversion (SHORT)",
         stop_loss_price=stop_loss_price,
         take_profit_price=take_profit_price,
         atr_value=atr_value, df=df_15m,
         support_4h=None, resistance_4h=resistance_4h, adx_value=adx_4h
-    )
-    
-    return order_placed if order_placed is not None else False
+    ), quality=confluences)
+
+
+async def check_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, resistance_4h):
+    return await execute_candidate(evaluate_reversal_short_entry(symbol, df_15m, df_4h, stoch_k_1h, usdt_balance, resistance_4h))
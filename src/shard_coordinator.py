@@ -0,0 +1,411 @@
+"""
+Shard Coordinator — one symbol universe split across several bot processes.
+
+PURPOSE:
+    A single main.py process scanning every symbol runs into the CPU of one
+    machine and the request weight of one IP. Sharding runs N bot processes,
+    on one host or several, each owning a hash partition of
+    config.symbols.symbols. The risk limits must still hold for the account
+    as a whole: MAX_CONCURRENT_TRADES, the daily drawdown breaker
+    (MAX_DAILY_LOSS_USDT), the global BOS cooldown and the consecutive-loss
+    circuit breaker.
+
+HOW IT WORKS:
+    1. SHARD_COUNT / SHARD_INDEX (or the BOT_SHARD_COUNT / BOT_SHARD_INDEX
+       environment variables, so all shards can share one settings file)
+       select the partition. A symbol belongs to shard crc32(symbol) %
+       SHARD_COUNT: stable across processes and hosts, unlike hash().
+       Each shard scans, manages and exits only its own symbols. It still
+       sees every position of the account, and counts them all against the
+       global limits.
+    2. The coordinator (python -m src.shard_coordinator) is a small threaded
+       server on COORDINATOR_ADDRESS (or BOT_COORDINATOR_ADDRESS), 'host:port'
+       for TCP or a filesystem path for a Unix socket. It speaks one JSON object per line and holds
+       the shared state: entries in flight and recently filled across
+       shards, the last BOS entry time, the day's PnL and the per-symbol
+       consecutive losses.
+    3. An entry's Reservation (src/entry_slots.py) first takes its local
+       slot, then asks the coordinator. The coordinator grants the entry only
+       if every global limit holds, checked atomically under its lock: free
+       slot, free margin, BOS cooldown, daily PnL and the symbol's loss
+       streak. Fill and release are forwarded the same way. A fill counts
+       until FILL_VISIBILITY_SECONDS have passed, i.e. until every shard's
+       account read shows the position.
+    4. A granted reservation that is never filled or released must not hold
+       its slot forever. It expires after RESERVATION_TTL_SECONDS, and it is
+       dropped when the connection that acquired it closes (e.g. the shard
+       died). A shard whose acquire failed after it was sent, for example on
+       a timeout, sends a best-effort release. A fill that arrives after its
+       reservation was dropped is still recorded, from the strategy and margin
+       the shard sends with it.
+    5. Closed trades report their PnL and win/loss to the coordinator.
+       sync_shared_state() copies the shared values into bot_state once per
+       cycle, so the existing gates in process_symbol skip early. The
+       coordinator's check at reservation time is the binding one.
+    6. If the coordinator cannot be reached, entries are refused (fail
+       closed). Position management and exits go on unaffected.
+
+    scripts/run_shards.py starts a coordinator and N shards on one machine.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import zlib
+
+DEFAULT_COORDINATOR_ADDRESS = '127.0.0.1:8765'
+DEFAULT_TIMEOUT_SECONDS = 2.0
+FILL_VISIBILITY_SECONDS = 120  # a fill is counted by the coordinator until every shard's account read shows it
+RESERVATION_TTL_SECONDS = 60   # an entry in flight longer than this is treated as abandoned
+
+
+def _settings(name, default):
+    # .get: bot_state asks for the shard before every importer has loaded the settings
+    return getattr(sys.modules.get('config.settings'), name, default)
+
+
+# --- Partitioning ---
+
+def shard_config():
+    """(index, count) of this process; count 1 means sharding is off."""
+    count = int(os.environ.get('BOT_SHARD_COUNT', _settings('SHARD_COUNT', 1)))
+    index = int(os.environ.get('BOT_SHARD_INDEX', _settings('SHARD_INDEX', 0)))
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index} of {count}")
+    return index, count
+
+
+def coordinator_address():
+    return os.environ.get('BOT_COORDINATOR_ADDRESS', _settings('COORDINATOR_ADDRESS', DEFAULT_COORDINATOR_ADDRESS))
+
+
+def is_sharded():
+    return shard_config()[1] > 1
+
+
+def shard_of(symbol, count):
+    return zlib.crc32(symbol.encode()) % count
+
+
+def owns(symbol):
+    index, count = shard_config()
+    return count == 1 or shard_of(symbol, count) == index
+
+
+def shard_symbols(symbols):
+    """The part of `symbols` this process owns."""
+    return [symbol for symbol in symbols if owns(symbol)]
+
+
+def _parse_address(address):
+    """(family, address) for socket APIs: 'host:port' is TCP, anything else a Unix socket path."""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+# --- Coordinator (server side) ---
+
+class Coordinator:
+    """The shared risk state; every operation runs under one lock."""
+
+    def __init__(self, max_trades, bos_cooldown, max_daily_loss, max_consecutive_losses, daily_pnl=0.0,
+                 reservation_ttl=RESERVATION_TTL_SECONDS, clock=time.time):
+        self.max_trades = max_trades
+        self.reservation_ttl = reservation_ttl
+        self.bos_cooldown = bos_cooldown
+        self.max_daily_loss = max_daily_loss
+        self.max_consecutive_losses = max_consecutive_losses
+        self.clock = clock
+        self.reserved = {}  # symbol -> {'shard', 'strategy', 'margin', 'at', 'connection'} of entries in flight
+        self.filled = {}    # symbol -> {'shard', 'strategy', 'margin', 'at'} of recent fills
+        self.last_bos_entry_time = 0.0
+        self.daily_pnl = daily_pnl
+        self.pnl_date = time.strftime('%Y-%m-%d', time.gmtime(clock()))
+        self.consecutive_losses = {}
+        self._lock = threading.Lock()
+
+    def _roll(self, now):
+        """
+        Drops fills every account read shows by now and abandoned reservations,
+        and resets the PnL at the UTC day change.
+        """
+        for symbol in [s for s, fill in self.filled.items() if now - fill['at'] > FILL_VISIBILITY_SECONDS]:
+            del self.filled[symbol]
+        for symbol in [s for s, entry in self.reserved.items() if now - entry['at'] > self.reservation_ttl]:
+            print(f"[Coordinator] Reservation of {symbol} by shard {self.reserved[symbol]['shard']} expired unfilled")
+            del self.reserved[symbol]
+        today = time.strftime('%Y-%m-%d', time.gmtime(now))
+        if today != self.pnl_date:
+            self.pnl_date, self.daily_pnl = today, 0.0
+
+    def acquire(self, shard, symbol, strategy=None, margin=0.0, available_margin=None, open_symbols=(), connection=None):
+        """Returns None when the entry is granted, otherwise the reason it was refused."""
+        now = self.clock()
+        with self._lock:
+            self._roll(now)
+            if self.daily_pnl <= self.max_daily_loss:
+                return f"Daily drawdown limit hit across shards ({self.daily_pnl:.2f} USDT)"
+            if self.consecutive_losses.get(symbol, 0) >= self.max_consecutive_losses:
+                return f"{symbol} circuit breaker: {self.consecutive_losses[symbol]} consecutive losses"
+            open_symbols = set(open_symbols)
+            occupied = open_symbols | self.reserved.keys() | self.filled.keys()
+            if symbol in occupied:
+                return f"{symbol} already has an open or pending entry across shards"
+            if len(occupied) >= self.max_trades:
+                return f"Max concurrent trades reached across shards ({len(occupied)}/{self.max_trades})"
+            if strategy == 'bos' and now - self.last_bos_entry_time < self.bos_cooldown:
+                return f"Global BOS cooldown active ({int(self.bos_cooldown - (now - self.last_bos_entry_time))}s remaining)"
+            if available_margin is not None:
+                committed = sum(r['margin'] for r in self.reserved.values()) + \
+                    sum(f['margin'] for s, f in self.filled.items() if s not in open_symbols)
+                if margin > available_margin - committed:
+                    return f"Insufficient margin across shards (${margin:.2f} > ${max(available_margin - committed, 0):.2f} unreserved)"
+            self.reserved[symbol] = {'shard': shard, 'strategy': strategy, 'margin': margin, 'at': now, 'connection': connection}
+            return None
+
+    def fill(self, shard, symbol, strategy=None, margin=0.0):
+        """Records a fill; `strategy` and `margin` stand in if the reservation already expired or was dropped."""
+        now = self.clock()
+        with self._lock:
+            reservation = self.reserved.get(symbol)
+            if reservation is not None and reservation['shard'] != shard:
+                return
+            if reservation is not None:
+                del self.reserved[symbol]
+                strategy, margin = reservation['strategy'], reservation['margin']
+            self.filled[symbol] = {'shard': shard, 'strategy': strategy, 'margin': margin, 'at': now}
+            if strategy == 'bos':
+                self.last_bos_entry_time = now
+
+    def release(self, shard, symbol, reserved_only=False):
+        """Frees the shard's entry for `symbol`; with `reserved_only`, only one still in flight."""
+        with self._lock:
+            for book in (self.reserved,) if reserved_only else (self.reserved, self.filled):
+                if symbol in book and book[symbol]['shard'] == shard:
+                    del book[symbol]
+
+    def drop_connection(self, connection):
+        """Frees the entries in flight that were acquired over a connection that has closed."""
+        with self._lock:
+            for symbol in [s for s, entry in self.reserved.items() if entry['connection'] == connection]:
+                print(f"[Coordinator] Dropping reservation of {symbol}: shard {self.reserved[symbol]['shard']} disconnected")
+                del self.reserved[symbol]
+
+    def add_pnl(self, amount):
+        with self._lock:
+            self._roll(self.clock())
+            self.daily_pnl += amount
+
+    def record_result(self, symbol, lost):
+        with self._lock:
+            self.consecutive_losses[symbol] = self.consecutive_losses.get(symbol, 0) + 1 if lost else 0
+
+    def state(self):
+        with self._lock:
+            self._roll(self.clock())
+            return {
+                'daily_pnl': self.daily_pnl,
+                'last_bos_entry_time': self.last_bos_entry_time,
+                'consecutive_losses': dict(self.consecutive_losses),
+                'in_flight': len(self.reserved),
+                'recent_fills': len(self.filled),
+            }
+
+    def handle(self, request):
+        """Dispatches one request dict; returns the response dict."""
+        op = request.pop('op', None)
+        if op == 'acquire':
+            refusal = self.acquire(**request)
+            return {'ok': refusal is None, 'reason': refusal}
+        if op in ('fill', 'release', 'add_pnl', 'record_result'):
+            getattr(self, op)(**request)
+            return {'ok': True}
+        if op == 'state':
+            return {'ok': True, 'state': self.state()}
+        return {'ok': False, 'reason': f"Unknown op: {op}"}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        connection = id(self)
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    if request.get('op') == 'acquire':
+                        request['connection'] = connection
+                    response = self.server.coordinator.handle(request)
+                except Exception as e:
+                    response = {'ok': False, 'reason': f"Bad request: {e}"}
+                self.wfile.write(json.dumps(response).encode() + b'\n')
+        finally:
+            self.server.coordinator.drop_connection(connection)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(address, coordinator):
+    """Serves `coordinator` on `address` until interrupted."""
+    family, bind_address = _parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_address):
+            os.unlink(bind_address)
+        server = socketserver.ThreadingUnixStreamServer(bind_address, _Handler)
+        server.daemon_threads = True
+    else:
+        server = _TCPServer(bind_address, _Handler)
+    server.coordinator = coordinator
+    print(f"[Coordinator] Listening on {address} (max {coordinator.max_trades} trades, "
+          f"daily PnL {coordinator.daily_pnl:.2f} / limit {coordinator.max_daily_loss})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+# --- Shard side ---
+
+class ShardLink:
+    """One persistent connection from a shard to the coordinator; reconnects after an error."""
+
+    def __init__(self, address, shard, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.address = address
+        self.shard = shard
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        family, address = _parse_address(self.address)
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.settimeout(self.timeout)
+        self._socket.connect(address)
+        self._reader = self._socket.makefile('rb')
+
+    def _close(self):
+        for handle in (self._reader, self._socket):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        self._socket = self._reader = None
+
+    def request(self, op, **fields):
+        """Sends one request and returns the response dict; raises OSError when the coordinator is unreachable."""
+        with self._lock:
+            sent = False
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(json.dumps(dict(fields, op=op)).encode() + b'\n')
+                sent = True
+                line = self._reader.readline()
+                if not line:
+                    raise ConnectionError("Coordinator closed the connection")
+                return json.loads(line)
+            except (OSError, ValueError) as e:
+                e.request_sent = sent  # the coordinator may have acted on a request whose reply was lost
+                self._close()
+                raise
+
+    def acquire(self, symbol, strategy, margin, available_margin, open_symbols):
+        try:
+            response = self.request('acquire', shard=self.shard, symbol=symbol, strategy=strategy, margin=margin,
+                                    available_margin=available_margin, open_symbols=sorted(open_symbols))
+        except (OSError, ValueError) as e:
+            if getattr(e, 'request_sent', False):
+                # The coordinator may have granted before the reply was lost: do not leave that grant behind
+                self.notify('release', shard=self.shard, symbol=symbol, reserved_only=True)
+            return f"Coordinator unavailable ({e})"
+        return None if response.get('ok') else response.get('reason')
+
+    def notify(self, op, **fields):
+        """Fire-and-report for fill / release / add_pnl / record_result; retried once on a fresh connection."""
+        for attempt in range(2):
+            try:
+                self.request(op, **fields)
+                return
+            except (OSError, ValueError) as e:
+                if attempt:
+                    print(f"[Coordinator] Could not send {op} {fields}: {e}")
+
+    def fill(self, symbol, strategy=None, margin=0.0):
+        self.notify('fill', shard=self.shard, symbol=symbol, strategy=strategy, margin=margin)
+
+    def release(self, symbol):
+        self.notify('release', shard=self.shard, symbol=symbol)
+
+    def add_pnl(self, amount):
+        self.notify('add_pnl', amount=amount)
+
+    def record_result(self, symbol, lost):
+        self.notify('record_result', symbol=symbol, lost=lost)
+
+    def state(self):
+        return self.request('state')['state']
+
+
+_link = None
+_link_lock = threading.Lock()
+
+
+def get_shard_link():
+    """The coordinator connection of a sharded process, or None when sharding is off."""
+    global _link
+    if not is_sharded():
+        return None
+    with _link_lock:
+        if _link is None:
+            _link = ShardLink(coordinator_address(), shard_config()[0],
+                              timeout=_settings('COORDINATOR_TIMEOUT', DEFAULT_TIMEOUT_SECONDS))
+        return _link
+
+
+def sync_shared_state(bot_state):
+    """Copies the coordinator's shared values into bot_state (once per cycle); no-op when not sharded."""
+    link = get_shard_link()
+    if link is None:
+        return
+    try:
+        state = link.state()
+    except (OSError, ValueError) as e:
+        print(f"[Coordinator] State sync failed ({e}); entries are refused until it is reachable")
+        return
+    with bot_state._pnl_lock:
+        bot_state.daily_pnl = state['daily_pnl']
+    bot_state.last_bos_entry_time = max(bot_state.last_bos_entry_time, state['last_bos_entry_time'])
+    if not isinstance(bot_state.consecutive_losses, dict):
+        bot_state.consecutive_losses = {}
+    bot_state.consecutive_losses.update(state['consecutive_losses'])
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config.settings
+    from src.state_manager import bot_state  # seeds today's PnL from logs/trade_log.csv
+
+    parser = argparse.ArgumentParser(description="Coordinator for a sharded bot deployment.")
+    parser.add_argument('--address', default=coordinator_address(),
+                        help="host:port for TCP, or a path for a Unix socket")
+    args = parser.parse_args()
+
+    serve(args.address, Coordinator(
+        max_trades=_settings('MAX_CONCURRENT_TRADES', 1),
+        bos_cooldown=_settings('BOS_GLOBAL_COOLDOWN_SECONDS', 0),
+        max_daily_loss=_settings('MAX_DAILY_LOSS_USDT', float('-inf')),
+        max_consecutive_losses=_settings('MAX_CONSECUTIVE_LOSSES', float('inf')),
+        daily_pnl=bot_state.daily_pnl,
+        reservation_ttl=_settings('COORDINATOR_RESERVATION_TTL', RESERVATION_TTL_SECONDS),
+    ))
@@ -7,9 +7,7 @@ class BotState:
         self.trading_paused = False
         self.global_btc_trend = 'NEUTRAL'
         self.breakeven_triggered = {}
-        self.cached_data_mid = {}
         self.cached_data_long = {}
-        self.last_fetch_time_mid = {}
         self.last_fetch_time_long = {}
         # Phase 1: Partial Profit Tracking
         self.partial_tp1_taken = {}  # Track if first partial profit (2R) has been taken
@@ -32,10 +30,17 @@ class BotState:
         self.initialize_daily_pnl()
         self.load_state()
 
+    @staticmethod
+    def _state_path():
+        # Shards on one host keep their own file (src/shard_coordinator.py)
+        from src.shard_coordinator import shard_config
+        index, count = shard_config()
+        return 'logs/bot_state.json' if count == 1 else f'logs/bot_state.shard{index}.json'
+
     def load_state(self):
         import os
         import json
-        state_path = 'logs/bot_state.json'
+        state_path = self._state_path()
         if os.path.exists(state_path):
             try:
                 with open(state_path, 'r', encoding='utf-8') as f:
@@ -51,7 +56,7 @@ class BotState:
 
     def save_state(self):
         import json
-        state_path = 'logs/bot_state.json'
+        state_path = self._state_path()
         try:
             data = {
                 'partial_tp1_taken': self.partial_tp1_taken,
@@ -16,17 +16,22 @@ from binance.enums import (
 
 from config.paths import LOG_FILE
 from config.secrets import API_KEY, API_SECRET
-from config.settings import VERBOSE_LOGGING, TRAILING_STOP_ATR_MULTIPLIER, EXECUTION_TIMEFRAME, INTERMEDIATE_TIMEFRAME, PRIMARY_TIMEFRAME, LEVERAGE, BINANCE_FEE_RATE
+from config.settings import VERBOSE_LOGGING, TRAILING_STOP_ATR_MULTIPLIER, EXECUTION_TIMEFRAME, PRIMARY_TIMEFRAME, LEVERAGE, BINANCE_FEE_RATE
 
-from data.get_data import get_market_price, round_price, round_quantity, get_usdt_balance, fetch_multi_timeframe_data
-from data.indicators import calculate_atr
+from data.get_data import get_market_price, round_price, round_quantity, get_usdt_balance, fetch_execution_frame
+from data.indicator_pipeline import compute_indicators
 from src.detailed_logger import log_trade_exit
 
-from config.client import client
+from src.rate_limiter import client
+from src.async_client import exchange
+from src.market_snapshot import get_account, invalidate_account
+from src.entry_slots import get_entry_slots
+from src.cycle_scheduler import record_order
+from src.shard_coordinator import get_shard_link
 
 
-def place_algo_stop_loss(symbol, side, stop_price, quantity, working_type='CONTRACT_PRICE'):
-    return client.futures_create_order(
+async def place_algo_stop_loss(symbol, side, stop_price, quantity, working_type='CONTRACT_PRICE'):
+    return await exchange.futures_create_order(
         symbol=symbol,
         side=side,
         type='STOP_MARKET',
@@ -35,8 +40,8 @@ def place_algo_stop_loss(symbol, side, stop_price, quantity, working_type='CONTR
         workingType=working_type
     )
 
-def place_algo_take_profit(symbol, side, take_profit_price, quantity, working_type='CONTRACT_PRICE'):
-    return client.futures_create_order(
+async def place_algo_take_profit(symbol, side, take_profit_price, quantity, working_type='CONTRACT_PRICE'):
+    return await exchange.futures_create_order(
         symbol=symbol,
         side=side,
         type='TAKE_PROFIT_MARKET',
@@ -105,11 +110,9 @@ async def manage_active_trades(active_positions):
         if unrealized_profit > 0:
             print(f"✅ Position for {symbol} is profitable. Managing ATR trailing stop.")
             
-            # fetch_multi_timeframe_data returns 14 values
-            df_15m, _, _, _, _, _, _, _, _, _, _, _, _, _ = await asyncio.to_thread(
-                fetch_multi_timeframe_data, symbol, EXECUTION_TIMEFRAME, INTERMEDIATE_TIMEFRAME, PRIMARY_TIMEFRAME
-            )
-            df_15m = calculate_atr(df_15m)
+            # Reuses the ATR cached by process_symbol when the bars have not changed since
+            df_15m = await asyncio.to_thread(fetch_execution_frame, symbol, EXECUTION_TIMEFRAME)
+            df_15m = compute_indicators(symbol, EXECUTION_TIMEFRAME, df_15m, ('atr',))
             atr_value = df_15m['atr'].iloc[-1]
             
             await manage_atr_trailing_stop(symbol, position_obj, atr_value)
@@ -127,7 +130,7 @@ async def move_stop_to_breakeven(symbol, entry_price, side):
         breakeven_price = round_price(symbol, entry_price)
         
         # Get current position quantity
-        position_info = await asyncio.to_thread(client.futures_position_information, symbol=symbol)
+        position_info = await exchange.futures_position_information(symbol=symbol)
         position_qty = 0
         for pos in position_info:
             qty = float(pos['positionAmt'])
@@ -146,8 +149,7 @@ async def move_stop_to_breakeven(symbol, entry_price, side):
         
         # TRY #1: ALGO API with CONTRACT_PRICE
         try:
-            sl_order = await asyncio.to_thread(
-                place_algo_stop_loss,
+            sl_order = await place_algo_stop_loss(
                 symbol,
                 stop_loss_side,
                 breakeven_price,
@@ -159,8 +161,7 @@ async def move_stop_to_breakeven(symbol, entry_price, side):
         except Exception as sl_error_1:
             # TRY #2: ALGO API with MARK_PRICE
             try:
-                sl_order = await asyncio.to_thread(
-                    place_algo_stop_loss,
+                sl_order = await place_algo_stop_loss(
                     symbol,
                     stop_loss_side,
                     breakeven_price,
@@ -197,7 +198,7 @@ async def manage_atr_trailing_stop(symbol, position_obj, atr_value):
     
     # Use python-binance to fetch open algo orders (stop losses)
     try:
-        algo_orders = await asyncio.to_thread(client.futures_get_open_algo_orders, symbol=symbol)
+        algo_orders = await exchange.futures_get_open_algo_orders(symbol=symbol)
         algo_orders = algo_orders.get('orders', algo_orders.get('items', algo_orders)) if isinstance(algo_orders, dict) else algo_orders
         if isinstance(algo_orders, list):
             for order in algo_orders:
@@ -236,7 +237,7 @@ async def update_stop_loss(symbol, new_stop_price, side):
     """
     try:
         # Fetch the existing old stop loss price before canceling
-        open_orders = await asyncio.to_thread(client.futures_get_open_orders, symbol=symbol)
+        open_orders = await exchange.futures_get_open_orders(symbol=symbol)
         old_stop_price = None
         for order in open_orders:
             if order['type'] in ('STOP_MARKET', 'ALGO'):
@@ -246,7 +247,7 @@ async def update_stop_loss(symbol, new_stop_price, side):
         if old_stop_price is None:
             # Check Algo orders if not found in standard open_orders
             try:
-                algo_orders = await asyncio.to_thread(client.futures_get_open_algo_orders, symbol=symbol)
+                algo_orders = await exchange.futures_get_open_algo_orders(symbol=symbol)
                 algo_orders = algo_orders.get('orders', algo_orders.get('items', algo_orders)) if isinstance(algo_orders, dict) else algo_orders
                 if isinstance(algo_orders, list):
                     for order in algo_orders:
@@ -262,17 +263,17 @@ async def update_stop_loss(symbol, new_stop_price, side):
         await cancel_open_orders(symbol, cancel_sl=True, cancel_tp=False)
         
         # Verify cancellation succeeded before placing new SL
-        remaining_sl = await asyncio.to_thread(client.futures_get_open_orders, symbol=symbol)
+        remaining_sl = await exchange.futures_get_open_orders(symbol=symbol)
         remaining_sl = [o for o in remaining_sl if 'STOP' in o.get('type', '')]
         if remaining_sl:
             print(f"⚠️  {len(remaining_sl)} SL order(s) still active after cancel attempt for {symbol}. Retrying...")
-            await asyncio.to_thread(client.futures_cancel_all_open_orders, symbol=symbol)
+            await exchange.futures_cancel_all_open_orders(symbol=symbol)
         
         stop_side = SIDE_SELL if side == SIDE_BUY else SIDE_BUY
         new_stop_price_rounded = round_price(symbol, new_stop_price)
         
         # Get current position quantity
-        position_info = await asyncio.to_thread(client.futures_position_information, symbol=symbol)
+        position_info = await exchange.futures_position_information(symbol=symbol)
         position_qty = 0
         for pos in position_info:
             qty = float(pos['positionAmt'])
@@ -291,8 +292,7 @@ async def update_stop_loss(symbol, new_stop_price, side):
         
         # TRY #1: ALGO API with CONTRACT_PRICE
         try:
-            sl_order = await asyncio.to_thread(
-                place_algo_stop_loss,
+            sl_order = await place_algo_stop_loss(
                 symbol,
                 stop_side,
                 new_stop_price_rounded,
@@ -304,8 +304,7 @@ async def update_stop_loss(symbol, new_stop_price, side):
         except Exception as sl_error_1:
             # TRY #2: ALGO API with MARK_PRICE
             try:
-                sl_order = await asyncio.to_thread(
-                    place_algo_stop_loss,
+                sl_order = await place_algo_stop_loss(
                     symbol,
                     stop_side,
                     new_stop_price_rounded,
@@ -322,7 +321,7 @@ async def update_stop_loss(symbol, new_stop_price, side):
             print(f"⚠️ Failed to update trailing stop for {symbol}, attempting to restore old stop-loss at {old_stop_price}...")
             if old_stop_price:
                 try:
-                    await asyncio.to_thread(place_algo_stop_loss, symbol, stop_side, round_price(symbol, old_stop_price), position_qty, 'CONTRACT_PRICE')
+                    await place_algo_stop_loss(symbol, stop_side, round_price(symbol, old_stop_price), position_qty, 'CONTRACT_PRICE')
                     print(f"✅ Successfully restored old stop loss at {old_stop_price}")
                 except Exception as restore_err:
                     print(f"❌ CRITICAL FAILURE: Could not restore old stop loss! POSITION {symbol} IS UNPROTECTED! Error: {restore_err}")
@@ -353,7 +352,7 @@ async def cancel_open_orders(symbol, cancel_sl=True, cancel_tp=True):
     try:
         if cancel_sl and cancel_tp:
             # Safe to wipe everything
-            await asyncio.to_thread(client.futures_cancel_all_open_orders, symbol=symbol)
+            await exchange.futures_cancel_all_open_orders(symbol=symbol)
             return
 
         # Need selective cancellation to avoid wiping trailing stops or tiered TPs
@@ -386,13 +385,26 @@ async def cancel_open_orders(symbol, cancel_sl=True, cancel_tp=True):
     except Exception as e:
         print(f"Error canceling open orders for {symbol}: {e}")
 
-async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, resistance_4h, adx_value, reduce_only=False, stop_loss_atr_multiplier=2.0, atr_value=None, df=None, stop_loss_price=None, take_profit_price=None):
+async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, resistance_4h, adx_value, reduce_only=False, stop_loss_atr_multiplier=2.0, atr_value=None, df=None, stop_loss_price=None, take_profit_price=None, strategy=None):
     """
     Places the main trade and then immediately places the corresponding stop-loss order.
+    Within a scan cycle the entry reserves its slot first (src/entry_slots.py);
+    `strategy` ('bos') counts it against that strategy's per-cycle limit. A
+    reservation whose order did not fill is released on every exit path.
     """
+    slots = get_entry_slots()
+    reservation = slots.reservation(symbol, strategy) if slots is not None else None
+    try:
+        return await _place_order(symbol, side, usdt_balance, reason_to_open, adx_value, stop_loss_atr_multiplier,
+                                  atr_value, df, stop_loss_price, take_profit_price, reservation)
+    finally:
+        if reservation is not None:
+            reservation.release_unless_filled()
+
+async def _place_order(symbol, side, usdt_balance, reason_to_open, adx_value, stop_loss_atr_multiplier, atr_value, df, stop_loss_price, take_profit_price, reservation):
     # Check Order Book Imbalance before proceeding
     try:
-        order_book = await asyncio.to_thread(client.futures_order_book, symbol=symbol, limit=50)
+        order_book = await exchange.futures_order_book(symbol=symbol, limit=50)
         current_price = await asyncio.to_thread(get_market_price, symbol)
         if current_price:
             bids = sum(float(qty) for price, qty in order_book['bids'] if float(price) >= current_price * 0.99)
@@ -481,8 +493,8 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
         # This prevents the -2019 "Margin is insufficient" crash
         required_margin = notional_value / LEVERAGE
         
-        # Fetch fresh available balance to ensure we have enough free margin
-        _balance_data = await asyncio.to_thread(client.futures_account_balance)
+        # Available balance from the cycle snapshot, refetched if an earlier order invalidated it
+        _positions, _balance_data = await asyncio.to_thread(get_account)
         available_balance = 0.0
         for asset in _balance_data:
             if asset['asset'] == 'USDT':
@@ -495,6 +507,16 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
             log_rejected_signal(symbol, side, {'Price': limit_price, 'Required_Margin': required_margin, 'Available': available_balance}, f"Insufficient Margin (${required_margin:.2f} > 90% of ${available_balance:.2f})")
             return False
 
+        # --- Slot reservation: the only step serialized between concurrent entries ---
+        # Counts open positions, entries still in flight and the margin they hold
+        if reservation is not None:
+            refusal = reservation.acquire(required_margin, available_balance * 0.90, _positions)
+            if refusal is not None:
+                print(f"⏸️  Entry for {symbol} not reserved: {refusal}")
+                from src.detailed_logger import log_rejected_signal
+                log_rejected_signal(symbol, side, {'Price': limit_price, 'Required_Margin': required_margin}, f"Entry slot refused: {refusal}")
+                return False
+
         # Place the main market order
         import sys
         print(f"\n{'='*70}")
@@ -507,10 +529,13 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
         print(f"{'='*70}")
         sys.stdout.flush()
         
-        order = await asyncio.to_thread(
-            client.futures_create_order,
+        order = await exchange.futures_create_order(
             symbol=symbol, side=side, type=ORDER_TYPE_MARKET, quantity=total_quantity
         )
+        invalidate_account()
+        record_order(symbol)
+        if reservation is not None:
+            reservation.fill()
         
         print(f"✅ Main order filled at ${float(order['avgPrice'])}")
         sys.stdout.flush()
@@ -555,8 +580,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
         try:
             print(f"   Attempting: Algo Order API with CONTRACT_PRICE...")
             sys.stdout.flush()
-            sl_order = await asyncio.to_thread(
-                place_algo_stop_loss,
+            sl_order = await place_algo_stop_loss(
                 symbol,
                 stop_loss_side,
                 stop_loss_price,
@@ -575,8 +599,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
             try:
                 print(f"   Attempting: Algo Order API with MARK_PRICE...")
                 sys.stdout.flush()
-                sl_order = await asyncio.to_thread(
-                    place_algo_stop_loss,
+                sl_order = await place_algo_stop_loss(
                     symbol,
                     stop_loss_side,
                     stop_loss_price,
@@ -604,14 +627,16 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
             try:
                 # Close the position that was just opened
                 close_side = SIDE_SELL if side == SIDE_BUY else SIDE_BUY
-                await asyncio.to_thread(
-                    client.futures_create_order,
+                await exchange.futures_create_order(
                     symbol=symbol,
                     side=close_side,
                     type=ORDER_TYPE_MARKET,
                     quantity=total_quantity,
                     reduceOnly=True
                 )
+                invalidate_account()
+                if reservation is not None:
+                    reservation.release()
                 print(f"✅ Position closed successfully. No unprotected position.")
                 print(f"{'='*70}\n")
                 sys.stdout.flush()
@@ -684,8 +709,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
                 sys.stdout.flush()
                 
                 try:
-                    tp_order = await asyncio.to_thread(
-                        place_algo_take_profit,
+                    tp_order = await place_algo_take_profit(
                         symbol,
                         take_profit_side,
                         tier_price,
@@ -695,8 +719,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
                     print(f"  ✅ TIER {i+1} DEPLOYED [CONTRACT_PRICE]")
                 except Exception as tp_error:
                     try:
-                        tp_order = await asyncio.to_thread(
-                            place_algo_take_profit,
+                        tp_order = await place_algo_take_profit(
                             symbol,
                             take_profit_side,
                             tier_price,
@@ -767,8 +790,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
             try:
                 print(f"   Attempting: Algo Order API with CONTRACT_PRICE...")
                 sys.stdout.flush()
-                tp_order = await asyncio.to_thread(
-                    place_algo_take_profit,
+                tp_order = await place_algo_take_profit(
                     symbol,
                     take_profit_side,
                     take_profit_price,
@@ -786,8 +808,7 @@ async def place_order(symbol, side, usdt_balance, reason_to_open, support_4h, re
                 try:
                     print(f"   Attempting: Algo Order API with MARK_PRICE...")
                     sys.stdout.flush()
-                    tp_order = await asyncio.to_thread(
-                        place_algo_take_profit,
+                    tp_order = await place_algo_take_profit(
                         symbol,
                         take_profit_side,
                         take_profit_price,
@@ -842,6 +863,7 @@ def close_position(symbol, side, quantity, reason_to_close):
         order = client.futures_create_order(
             symbol=symbol, side=side, type=ORDER_TYPE_MARKET, quantity=quantity, reduceOnly=True
         )
+        invalidate_account()
         
         exit_price = float(order.get('avgPrice', 0))
         if exit_price == 0.0:
@@ -850,8 +872,8 @@ def close_position(symbol, side, quantity, reason_to_close):
             if not exit_price:
                 exit_price = entry_price # fallback to prevent 0.0 math errors
         
-        # Fetch a fresh balance after closing — get_usdt_balance requires balance_data arg
-        _balance_data = client.futures_account_balance()
+        # Fresh balance after closing (the close invalidated the snapshot) — get_usdt_balance requires balance_data arg
+        _, _balance_data = get_account()
         new_usdt_balance = get_usdt_balance(_balance_data)
         
         # Calculate PnL and ROI
@@ -876,6 +898,10 @@ def close_position(symbol, side, quantity, reason_to_close):
         from src.state_manager import bot_state
         with bot_state._pnl_lock:
             bot_state.daily_pnl += pnl
+        shard_link = get_shard_link()
+        if shard_link is not None:
+            # The drawdown breaker is account-wide: the coordinator sums every shard's PnL
+            shard_link.add_pnl(pnl)
         bot_state.entry_reasons.pop(symbol, None)
         
         # Calculate ROI using the configured LEVERAGE (imported from settings)
@@ -937,7 +963,7 @@ async def set_margin_type(symbol, margin_type='ISOLATED'):
     occurs when orders exist and margin type is being changed).
     """
     try:
-        position_info = await asyncio.to_thread(client.futures_position_information, symbol=symbol)
+        position_info = await exchange.futures_position_information(symbol=symbol)
         
         if position_info:
             current_margin_type = position_info[0]['marginType']
@@ -949,7 +975,7 @@ async def set_margin_type(symbol, margin_type='ISOLATED'):
         print(f"⚠️  Margin type change needed for {symbol}. Cancelling all orders...")
         await cancel_open_orders(symbol, cancel_sl=True, cancel_tp=True)
         
-        await asyncio.to_thread(client.futures_change_margin_type, symbol=symbol, marginType=margin_type)
+        await exchange.futures_change_margin_type(symbol=symbol, marginType=margin_type)
         if VERBOSE_LOGGING:
             print(f"Margin type for {symbol} set to {margin_type}.")
 